@@ -4,29 +4,28 @@
 监控股票300300的价格，当价格高于13元或低于12元时发送通知
 """
 
-import yfinance as yf
-import smtplib
-from email.mime.text import MIMEText
-from email.mime.multipart import MIMEMultipart
 from datetime import datetime
 import time
 import sys
 
 def get_stock_price(symbol):
     """获取股票当前价格"""
+    # 轻量行情客户端只依赖标准库，长连接在多次轮询之间复用
+    from stock_quotes import default_client
+
     try:
-        stock = yf.Ticker(symbol)
-        hist = stock.history(period='1d')
-        if not hist.empty:
-            return hist['Close'].iloc[-1]
-        else:
-            return None
+        quote = default_client().get_quote(symbol)
+        return quote.price if quote is not None else None
     except Exception as e:
         print(f"获取 {symbol} 价格时出错: {str(e)}")
         return None
 
 def send_notification(subject, message):
     """发送邮件通知"""
+    import smtplib
+    from email.mime.text import MIMEText
+    from email.mime.multipart import MIMEMultipart
+
     try:
         # 邮件配置
         smtp_server = "smtp.qq.com"
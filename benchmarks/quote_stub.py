@@ -0,0 +1,105 @@
+"""
+本地行情桩服务器
+
+以 HTTP/1.1 长连接提供与行情接口相同格式的批量响应（/v8/finance/spark），内容来自录制的
+fixtures/spark_response.json；未录制的代码按录制记录的结构生成，使行情客户端的延迟与内存分配
+基准测试可以离线运行。
+"""
+
+import contextlib
+import copy
+import json
+import os
+import threading
+import time
+import zlib
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+FIXTURE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures', 'spark_response.json')
+
+
+def load_recorded(path=FIXTURE):
+    """读取录制的响应，返回 {代码: 结果条目}"""
+    with open(path, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+    return {result['symbol']: result for result in data['spark']['result']}
+
+
+class QuoteStubServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address=('127.0.0.1', 0), latency=0.0, recorded=None):
+        """
+        :param latency: 每个请求的模拟延迟（秒）
+        """
+        super().__init__(address, QuoteStubHandler)
+        self.latency = latency
+        self.recorded = recorded or load_recorded()
+        self._template = next(iter(self.recorded.values()))
+        self.connections = 0
+        self.requests = 0
+        self._lock = threading.Lock()
+
+    @property
+    def base_url(self):
+        host, port = self.server_address[:2]
+        return f'http://{host}:{port}'
+
+    def result_for(self, symbol):
+        if symbol in self.recorded:
+            return self.recorded[symbol]
+        # 未录制的代码：复制录制条目的结构，价格按代码确定性地变化
+        result = copy.deepcopy(self._template)
+        result['symbol'] = symbol
+        meta = result['response'][0]['meta']
+        meta['symbol'] = symbol
+        meta['regularMarketPrice'] = round(10 + zlib.crc32(symbol.encode()) % 9000 / 100, 2)
+        return result
+
+    def process_request(self, request, client_address):
+        with self._lock:
+            self.connections += 1
+        super().process_request(request, client_address)
+
+
+class QuoteStubHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    # 响应头与响应体分两次写出，关闭 Nagle 算法以免长连接上每个请求额外等待延迟确认
+    disable_nagle_algorithm = True
+
+    def do_GET(self):
+        url = urlsplit(self.path)
+        server = self.server
+        with server._lock:
+            server.requests += 1
+        if url.path.rstrip('/') != '/v8/finance/spark':
+            self.send_error(404)
+            return
+        if server.latency:
+            time.sleep(server.latency)
+        symbols = [s for s in parse_qs(url.query).get('symbols', [''])[0].split(',') if s]
+        body = json.dumps({
+            'spark': {'result': [server.result_for(symbol) for symbol in symbols], 'error': None}
+        }).encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+@contextlib.contextmanager
+def run_stub_server(latency=0.0):
+    """在后台线程启动桩服务器，退出时关闭"""
+    server = QuoteStubServer(latency=latency)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        yield server
+    finally:
+        server.shutdown()
+        server.server_close()
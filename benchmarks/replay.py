@@ -0,0 +1,115 @@
+"""
+离线回放的行情数据来源
+
+提供与 yfinance 相同的 ``Ticker(symbol).history(period)`` / ``.info`` 接口，
+返回预先生成的 K 线，使基准测试不依赖网络且结果可重复。
+"""
+
+import random
+import time
+from datetime import date, timedelta
+
+PERIOD_DAYS = {'1d': 1, '2d': 2, '5d': 5, '1mo': 22, '3mo': 66, '1y': 252}
+
+
+class _ILoc:
+    def __init__(self, getter):
+        self._getter = getter
+
+    def __getitem__(self, index):
+        return self._getter(index)
+
+
+class ReplayColumn:
+    def __init__(self, rows, column):
+        self._rows = rows
+        self._column = column
+        self.iloc = _ILoc(lambda index: rows[index][column])
+
+    def __iter__(self):
+        return (row[self._column] for row in self._rows)
+
+
+class ReplayFrame:
+    """只实现脚本用到的 DataFrame 接口：empty、len()、index、frame['Close'].iloc[i]、frame.iloc[i]、按列迭代"""
+
+    def __init__(self, rows):
+        self._rows = rows
+        self.iloc = _ILoc(lambda index: rows[index])
+        self.index = [row['Date'] for row in rows]
+
+    @property
+    def empty(self):
+        return not self._rows
+
+    def __len__(self):
+        return len(self._rows)
+
+    def __getitem__(self, column):
+        return ReplayColumn(self._rows, column)
+
+
+class ReplayTicker:
+    def __init__(self, symbol, bars, latency=0.0):
+        self.symbol = symbol
+        self._bars = bars
+        self._latency = latency
+        self.info = {'longName': f'{symbol} Replay Inc.'}
+
+    def history(self, period='1mo', start=None, end=None, interval='1d'):
+        if self._latency:
+            time.sleep(self._latency)
+        if start or end:
+            # 与 yfinance 一致：包含 start，不含 end
+            start = date.fromisoformat(start) if start else date.min
+            end = date.fromisoformat(end) if end else date.max
+            return ReplayFrame([bar for bar in self._bars if start <= bar['Date'] < end])
+        days = PERIOD_DAYS.get(period, len(self._bars))
+        return ReplayFrame(self._bars[-days:])
+
+
+class ReplayProvider:
+    """
+    以随机游走生成每只股票的 K 线，同一 seed 结果相同
+    :param latency: 每次 history() 调用的模拟网络延迟（秒）
+    """
+
+    def __init__(self, days=260, seed=0, latency=0.0):
+        self.days = days
+        self.seed = seed
+        self.latency = latency
+        self._bars = {}
+
+    def Ticker(self, symbol):
+        if symbol not in self._bars:
+            self._bars[symbol] = generate_bars(self.days, random.Random(f'{self.seed}:{symbol}'))
+        return ReplayTicker(symbol, self._bars[symbol], self.latency)
+
+
+def trading_days(count, end=None):
+    """截止到 end（默认今天）的最近 count 个工作日，按时间顺序"""
+    days = []
+    current = end or date.today()
+    while len(days) < count:
+        if current.weekday() < 5:
+            days.append(current)
+        current -= timedelta(days=1)
+    days.reverse()
+    return days
+
+
+def generate_bars(count, rng, start_price=12.0):
+    bars = []
+    close = start_price
+    for day in trading_days(count):
+        open_price = close
+        close = max(open_price * (1 + rng.gauss(0, 0.02)), 0.01)
+        bars.append({
+            'Date': day,
+            'Open': open_price,
+            'High': max(open_price, close) * (1 + abs(rng.gauss(0, 0.005))),
+            'Low': min(open_price, close) * (1 - abs(rng.gauss(0, 0.005))),
+            'Close': close,
+            'Volume': rng.randint(1_000_000, 200_000_000),
+        })
+    return bars
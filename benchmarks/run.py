@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+"""
+基准测试入口
+
+用法:
+  python -m benchmarks.run                           # 完整规模（10 万项目/任务，200 万行价格）
+  python -m benchmarks.run --quick                   # 小规模快速运行
+  python -m benchmarks.run --suite stock             # 只运行股票脚本部分
+  python -m benchmarks.run --suite startup           # 只检查命令行启动时间预算
+  python -m benchmarks.run compare old.json new.json # 比较两次结果
+"""
+
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+from datetime import datetime
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_OUTPUT_DIR = os.path.join(ROOT_DIR, 'bench_results')
+
+FULL_SCALE = {'projects': 100_000, 'tasks': 100_000, 'price_rows': 2_000_000, 'symbols': 50}
+QUICK_SCALE = {'projects': 5_000, 'tasks': 5_000, 'price_rows': 100_000, 'symbols': 10}
+
+
+def current_commit():
+    try:
+        return subprocess.check_output(
+            ['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT_DIR, stderr=subprocess.DEVNULL
+        ).decode().strip()
+    except (OSError, subprocess.CalledProcessError):
+        return 'unknown'
+
+
+def run_suites(args):
+    scale = dict(QUICK_SCALE if args.quick else FULL_SCALE)
+    for key in scale:
+        value = getattr(args, key)
+        if value is not None:
+            scale[key] = value
+
+    sys.path.insert(0, ROOT_DIR)
+    results = {}
+    with tempfile.TemporaryDirectory(prefix='moltbot-bench-') as work_dir:
+        if args.suite in ('all', 'web'):
+            from . import web
+            print("== Web / ORM ==")
+            results.update(web.run(
+                os.path.join(work_dir, 'bench.sqlite3'), scale['projects'], scale['tasks'], args.repeat, args.seed
+            ))
+        if args.suite in ('all', 'stock'):
+            from . import stocks
+            print("== 股票脚本 ==")
+            results.update(stocks.run(work_dir, scale['price_rows'], scale['symbols'], args.repeat, args.seed))
+        if args.suite in ('all', 'startup'):
+            from . import startup
+            print("== 命令行启动 ==")
+            results.update(startup.run(args.repeat, args.startup_budget))
+
+    commit = current_commit()
+    report = {
+        'commit': commit,
+        'timestamp': datetime.now().isoformat(),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'scale': scale,
+        'repeat': args.repeat,
+        'results': results,
+    }
+
+    output = args.output or os.path.join(DEFAULT_OUTPUT_DIR, f'{commit}.json')
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, 'w', encoding='utf-8') as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+    print(f"结果已保存到: {output}")
+
+    over_budget = [name for name, stats in results.items() if stats.get('within_budget') is False]
+    if over_budget:
+        print(f"启动时间超出预算: {', '.join(over_budget)}")
+        sys.exit(1)
+
+
+def compare(args):
+    """按中位数比较两次结果，变慢超过阈值的项标记为回归"""
+    with open(args.baseline, 'r', encoding='utf-8') as f:
+        baseline = json.load(f)
+    with open(args.candidate, 'r', encoding='utf-8') as f:
+        candidate = json.load(f)
+
+    print(f"{'基准项':<30} {baseline['commit']:>12} {candidate['commit']:>12} {'变化':>9}")
+    regressions = []
+    for name, stats in candidate['results'].items():
+        if name not in baseline['results'] or 'median' not in stats:
+            continue
+        old = baseline['results'][name]['median']
+        new = stats['median']
+        ratio = new / old if old else float('inf')
+        flag = ''
+        if ratio > 1 + args.threshold:
+            flag = ' 回归'
+            regressions.append(name)
+        print(f"{name:<30} {old * 1000:10.2f}ms {new * 1000:10.2f}ms {(ratio - 1) * 100:+8.1f}%{flag}")
+
+    if regressions:
+        print(f"\n{len(regressions)} 项变慢超过 {args.threshold:.0%}")
+        sys.exit(1)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Moltbot 基准测试')
+    subparsers = parser.add_subparsers(dest='command')
+
+    compare_parser = subparsers.add_parser('compare', help='比较两次基准测试结果')
+    compare_parser.add_argument('baseline', help='基准结果 JSON')
+    compare_parser.add_argument('candidate', help='待比较结果 JSON')
+    compare_parser.add_argument('--threshold', type=float, default=0.1, help='视为回归的变慢比例')
+
+    parser.add_argument('--suite', choices=['all', 'web', 'stock', 'startup'], default='all')
+    parser.add_argument('--quick', action='store_true', help='使用小规模数据')
+    parser.add_argument('--projects', type=int, help='项目数量')
+    parser.add_argument('--tasks', type=int, help='任务数量')
+    parser.add_argument('--price-rows', type=int, dest='price_rows', help='价格历史行数')
+    parser.add_argument('--symbols', type=int, help='StockMonitor 监控的股票数量')
+    parser.add_argument('--repeat', type=int, default=5, help='每项重复次数')
+    parser.add_argument('--seed', type=int, default=0, help='随机数种子')
+    parser.add_argument('--startup-budget', type=float, default=30, dest='startup_budget',
+                        help='离线命令的导入耗时预算（毫秒）')
+    parser.add_argument('--output', help='结果文件，默认 bench_results/<commit>.json')
+
+    args = parser.parse_args()
+    if args.command == 'compare':
+        compare(args)
+    else:
+        run_suites(args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+"""
+命令行启动时间基准测试
+
+以 ``python -X importtime`` 运行各个离线命令，统计模块导入总耗时并与预算比较。
+"""
+
+import os
+import re
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# 离线命令在解释器启动之外的导入耗时预算（毫秒）
+DEFAULT_BUDGET_MS = 30
+
+# 这些模块出现在离线命令的导入链中即视为回归
+HEAVY_MODULES = ('yfinance', 'pandas', 'numpy', 'requests')
+
+IMPORT_LINE = re.compile(r'^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)')
+
+
+def parse_importtime(stderr, exclude=()):
+    """
+    解析 -X importtime 输出
+    :param exclude: 不计入耗时的顶层模块（解释器启动时就会导入的模块）
+    :return: (顶层模块累计耗时之和（微秒）, 导入的模块名集合)
+    """
+    total = 0
+    modules = set()
+    for line in stderr.splitlines():
+        match = IMPORT_LINE.match(line)
+        if not match:
+            continue
+        cumulative, indent, module = int(match.group(2)), match.group(3), match.group(4)
+        modules.add(module)
+        # 缩进只有一个空格的是顶层导入，其累计耗时已包含子模块
+        if len(indent) == 1 and module not in exclude:
+            total += cumulative
+    return total, modules
+
+
+def interpreter_modules():
+    """空解释器启动时（site、编码等）导入的模块，不计入命令的导入耗时"""
+    result = subprocess.run([sys.executable, '-X', 'importtime', '-c', 'pass'], capture_output=True, text=True)
+    return parse_importtime(result.stderr)[1]
+
+
+def measure_command(args, repeat=5, exclude=()):
+    """多次运行命令，返回导入耗时与总耗时的最小值（毫秒）及导入的重量级模块"""
+    import_samples = []
+    wall_samples = []
+    heavy = set()
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = subprocess.run(
+            [sys.executable, '-X', 'importtime', 'stock_cli.py', *args],
+            cwd=ROOT_DIR, capture_output=True, text=True,
+        )
+        wall_samples.append((time.perf_counter() - started) * 1000)
+        total, modules = parse_importtime(result.stderr, exclude)
+        import_samples.append(total / 1000)
+        heavy |= {m for m in modules if m.split('.')[0] in HEAVY_MODULES}
+    return {
+        'import_ms': min(import_samples),
+        'wall_ms': min(wall_samples),
+        'heavy_modules': sorted({m.split('.')[0] for m in heavy}),
+    }
+
+
+def run(repeat=5, budget_ms=DEFAULT_BUDGET_MS):
+    """执行全部启动时间基准测试，返回 {名称: 结果}"""
+    exclude = interpreter_modules()
+    with tempfile.TemporaryDirectory(prefix='moltbot-startup-') as data_dir:
+        commands = {
+            'startup.help': ['--help'],
+            'startup.stats': ['stats', '--data-dir', data_dir],
+            'startup.latest': ['latest', '--data-dir', data_dir],
+        }
+        results = {}
+        for name, args in commands.items():
+            result = measure_command(args, repeat=repeat, exclude=exclude)
+            # 与其他基准项一致，median 以秒为单位，供 compare 使用
+            result['median'] = result['import_ms'] / 1000
+            result['budget_ms'] = budget_ms
+            result['within_budget'] = result['import_ms'] <= budget_ms and not result['heavy_modules']
+            results[name] = result
+            flag = '' if result['within_budget'] else '  超出预算'
+            print(f"  {name:<28} 导入 {result['import_ms']:7.1f} ms  总计 {result['wall_ms']:7.1f} ms{flag}")
+    return results
@@ -0,0 +1,246 @@
+"""
+股票脚本的基准测试
+
+生成大体量的历史 CSV，计时 StockDataLogger 的读写路径；
+StockMonitor 使用 ReplayProvider，不访问网络。
+"""
+
+import contextlib
+import csv
+import io
+import os
+import random
+from datetime import datetime, timedelta
+
+from .replay import ReplayProvider
+from .timing import measure
+
+CSV_HEADER = [
+    'timestamp', 'date', 'time', 'open', 'high', 'low', 'close',
+    'volume', 'price_change', 'change_percentage'
+]
+
+
+def generate_price_csv(path, row_count, rng, interval_minutes=5, closed_market_repeats=False):
+    """
+    生成 row_count 行的历史记录，时间截止到当前时刻
+    :param closed_market_repeats: 交易时段（9:30-15:00）以外重复上一条行情，模拟全天运行的定时任务
+    """
+    now = datetime.now().replace(microsecond=0)
+    start = now - timedelta(minutes=interval_minutes * row_count)
+    close = 12.0
+    previous = None
+    with open(path, 'w', newline='', encoding='utf-8') as file:
+        writer = csv.writer(file)
+        writer.writerow(CSV_HEADER)
+        for i in range(row_count):
+            moment = start + timedelta(minutes=interval_minutes * i)
+            if closed_market_repeats and previous and not '09:30' <= moment.strftime('%H:%M') <= '15:00':
+                writer.writerow([moment.isoformat(), moment.strftime('%Y-%m-%d'), moment.strftime('%H:%M:%S'), *previous])
+                continue
+            open_price = close
+            close = round(max(open_price * (1 + rng.gauss(0, 0.002)), 0.01), 2)
+            change = round(close - open_price, 2)
+            previous = [
+                open_price,
+                round(max(open_price, close) * 1.002, 2),
+                round(min(open_price, close) * 0.998, 2),
+                close,
+                rng.randint(1_000_000, 200_000_000),
+                change,
+                round(change / open_price * 100, 2),
+            ]
+            writer.writerow([moment.isoformat(), moment.strftime('%Y-%m-%d'), moment.strftime('%H:%M:%S'), *previous])
+
+
+def _quiet(func):
+    """屏蔽被测函数的打印输出"""
+    def wrapper():
+        with contextlib.redirect_stdout(io.StringIO()):
+            func()
+    return wrapper
+
+
+def run(data_dir, price_rows, symbol_count, repeat, seed_value=0):
+    """执行全部股票基准测试，返回 {名称: 统计}"""
+    from stock_data_logger import StockDataLogger
+    from stock_monitor import StockMonitor
+
+    rng = random.Random(seed_value)
+    provider = ReplayProvider(seed=seed_value)
+    symbol = 'BENCH.SZ'
+
+    logger = StockDataLogger(symbol, data_dir=data_dir, provider=provider)
+    print(f"生成 {price_rows:,} 行价格历史...")
+    generate_price_csv(logger.csv_file, price_rows, rng)
+    print(f"  文件大小 {os.path.getsize(logger.csv_file) / 1024 / 1024:.1f} MB")
+
+    symbols = [f'SYM{i:04d}' for i in range(symbol_count)]
+    monitor = StockMonitor(symbols, provider=provider)
+
+    benchmarks = {
+        'stock.log_data': logger.log_data,
+        'stock.get_latest_record': logger.get_latest_record,
+        'stock.get_statistics': logger.get_statistics,
+        'stock.get_today_records': logger.get_today_records,
+        'stock.get_all_stocks_info': monitor.get_all_stocks_info,
+    }
+
+    results = {}
+    for name, func in benchmarks.items():
+        results[name] = measure(_quiet(func), repeat=repeat)
+        print(f"  {name:<28} 中位数 {results[name]['median'] * 1000:9.2f} ms")
+
+    results.update(run_compaction(data_dir, price_rows, repeat, rng))
+    results.update(run_backfill(data_dir, symbol_count, repeat, seed_value))
+    results.update(run_tick_windows(repeat, rng))
+    results.update(run_quotes(repeat))
+    results.update(run_screener(data_dir, repeat, seed_value))
+    return results
+
+
+def run_screener(data_dir, repeat, seed_value, symbol_count=1000, days=600):
+    """对 symbol_count 只股票的日线筛选 above_ma200 + volume_spike：单进程与按 CPU 核数多进程比较"""
+    from stock_backfill import DailyBarStore
+    from stock_screener import Screener
+
+    from .replay import generate_bars
+
+    screen_dir = os.path.join(data_dir, 'screener')
+    symbols = [f'SYM{i:04d}' for i in range(symbol_count)]
+    for symbol in symbols:
+        bars = generate_bars(days, random.Random(f'{seed_value}:{symbol}'))
+        DailyBarStore(symbol, screen_dir).append([
+            [bar['Date'].isoformat(), round(bar['Open'], 2), round(bar['High'], 2), round(bar['Low'], 2),
+             round(bar['Close'], 2), bar['Volume']]
+            for bar in bars
+        ])
+
+    criteria = ['above_ma200', 'volume_spike']
+    workers = os.cpu_count() or 1
+    # 首次运行生成列式缓存，之后的计时只包含内存映射读取与计算
+    results = {'stock.screen_build_cache': measure(
+        lambda: Screener(criteria, data_dir=screen_dir, workers=workers).run(), repeat=1, warmup=0,
+    )}
+    for name, count in (('stock.screen_serial', 1), ('stock.screen_parallel', workers)):
+        results[name] = measure(lambda: Screener(criteria, data_dir=screen_dir, workers=count).run(), repeat=repeat)
+    for name in results:
+        print(f"  {name:<28} 中位数 {results[name]['median'] * 1000:9.2f} ms")
+    print(f"  （{symbol_count} 只股票，每只 {days} 个交易日，{workers} 个进程）")
+    return results
+
+
+def run_quotes(repeat, symbol_count=100, latency=0.002):
+    """
+    对本地桩服务器（每个请求 latency 秒延迟）获取 symbol_count 只股票的行情：
+    比较每只股票新建连接单独请求与长连接批量请求的耗时，并记录单轮的内存分配峰值
+    """
+    import tracemalloc
+
+    from stock_quotes import QuoteClient
+
+    from .quote_stub import run_stub_server
+
+    symbols = [f'SYM{i:04d}.SZ' for i in range(symbol_count)]
+    with run_stub_server(latency=latency) as server:
+        def per_symbol():
+            for symbol in symbols:
+                client = QuoteClient(server.base_url)
+                client.get_quote(symbol)
+                client.close()
+
+        client = QuoteClient(server.base_url)
+
+        def batched():
+            client.get_quotes(symbols)
+
+        results = {}
+        for name, func in (('stock.quotes_per_symbol', per_symbol), ('stock.quotes_batched', batched)):
+            results[name] = measure(func, repeat=repeat)
+            print(f"  {name:<28} 中位数 {results[name]['median'] * 1000:9.2f} ms")
+
+        tracemalloc.start()
+        batched()
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        # 分配量与连接数不是耗时，不带 median，compare 会跳过
+        results['stock.quotes_batched_alloc'] = {
+            'peak_bytes': peak,
+            'connections_opened': client.connections_opened,
+        }
+        client.close()
+    print(f"  批量请求单轮分配峰值 {peak / 1024:.1f} KB，共建立 {client.connections_opened} 个连接")
+    return results
+
+
+def run_tick_windows(repeat, rng, symbol_count=5000, window_seconds=3600, interval_seconds=30):
+    """守护进程一轮检查：5000 只股票各追加一条价格并读取窗口统计"""
+    from stock_window import TickWindows
+
+    symbols = [f'SYM{i:04d}' for i in range(symbol_count)]
+    windows = TickWindows(symbols, window_seconds, capacity=window_seconds // interval_seconds + 1)
+    clock = [0.0]
+
+    def cycle():
+        clock[0] += interval_seconds
+        for symbol in symbols:
+            window = windows.append(symbol, clock[0], 10 + rng.random())
+            window.drawdown_percent()
+
+    # 先填满窗口，计时的是稳定状态下的开销
+    for _ in range(window_seconds // interval_seconds + 1):
+        cycle()
+    results = {'stock.tick_window_cycle': measure(cycle, repeat=repeat)}
+    print(f"  {'stock.tick_window_cycle':<28} 中位数 {results['stock.tick_window_cycle']['median'] * 1000:9.2f} ms"
+          f"（{symbol_count} 只股票，窗口内存 {windows.memory_bytes() / 1024 / 1024:.1f} MB）")
+    return results
+
+
+def run_backfill(data_dir, symbol_count, repeat, seed_value, latency=0.02):
+    """模拟每次请求 latency 秒的网络延迟，比较串行与并行回填 10 年日线的耗时"""
+    import tempfile
+    from datetime import date
+
+    from stock_backfill import Backfill
+
+    provider = ReplayProvider(days=2600, seed=seed_value, latency=latency)
+    symbols = [f'SYM{i:04d}' for i in range(symbol_count)]
+    start = date.today().replace(year=date.today().year - 10)
+
+    def backfill(workers):
+        def func():
+            with tempfile.TemporaryDirectory(dir=data_dir) as target:
+                Backfill(symbols, start, data_dir=target, workers=workers, provider=provider).run(verbose=False)
+        return func
+
+    results = {}
+    for name, workers in (('stock.backfill_serial', 1), ('stock.backfill_parallel', 8)):
+        results[name] = measure(backfill(workers), repeat=repeat)
+        print(f"  {name:<28} 中位数 {results[name]['median'] * 1000:9.2f} ms")
+    return results
+
+
+def run_compaction(data_dir, price_rows, repeat, rng):
+    """全天定时记录的历史：比较压缩（去重 + 归档）前后的存储大小与统计耗时"""
+    from stock_data_logger import StockDataLogger
+
+    logger = StockDataLogger('BENCH_COMPACT.SZ', data_dir=data_dir)
+    generate_price_csv(logger.csv_file, price_rows, rng, closed_market_repeats=True)
+    cutoff = (datetime.now() - timedelta(days=1)).strftime('%Y-%m-%d')
+
+    results = {'stock.get_statistics_uncompacted': measure(logger.get_statistics, repeat=repeat)}
+    report = logger.compact(archive_before=cutoff)
+    results['stock.get_statistics_compacted'] = measure(logger.get_statistics, repeat=repeat)
+    # 存储大小不是耗时，不带 median，compare 会跳过
+    results['stock.compact_storage'] = {
+        'bytes_before': report['bytes_before'],
+        'bytes_after': report['bytes_after'],
+        'records_before': report['records_before'],
+        'records_after': report['records_after'],
+    }
+
+    print(f"  压缩: {report['records_before']:,} -> {report['records_after']:,} 条，"
+          f"{report['bytes_before'] / 1024 / 1024:.1f} MB -> {report['bytes_after'] / 1024 / 1024:.1f} MB")
+    for name in ('stock.get_statistics_uncompacted', 'stock.get_statistics_compacted'):
+        print(f"  {name:<28} 中位数 {results[name]['median'] * 1000:9.2f} ms")
+    return results
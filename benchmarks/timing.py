@@ -0,0 +1,23 @@
+import statistics
+import time
+
+
+def measure(func, repeat=5, warmup=1):
+    """
+    多次执行 func 并返回耗时统计（秒）
+    :param warmup: 预热次数，不计入结果
+    """
+    for _ in range(warmup):
+        func()
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        samples.append(time.perf_counter() - started)
+    return {
+        'runs': repeat,
+        'min': min(samples),
+        'median': statistics.median(samples),
+        'mean': statistics.mean(samples),
+        'max': max(samples),
+    }
@@ -0,0 +1,148 @@
+"""
+Web 视图与 ORM 路径的基准测试
+
+在独立的临时 SQLite 数据库中生成大量项目与任务，再通过 Django 测试客户端计时各个视图。
+"""
+
+import os
+import random
+from datetime import timedelta
+
+from .timing import measure
+
+SEED_BATCH_SIZE = 5000
+SEARCH_WORDS = ['数据', '分析', '报告', '爬虫', '同步', '清洗', '部署', '监控']
+
+
+def setup_django(db_path):
+    """指向临时数据库初始化 Django，并创建表结构"""
+    os.environ['DATABASE_URL'] = f'sqlite:///{db_path}'
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'project_manager.settings')
+    # 基准测试不运行 collectstatic
+    os.environ['STATICFILES_BACKEND'] = 'django.contrib.staticfiles.storage.StaticFilesStorage'
+
+    import django
+    from django.core.management import call_command
+
+    django.setup()
+    call_command('migrate', verbosity=0)
+
+
+def seed(project_count, task_count, rng):
+    """批量生成项目与任务（绕过信号，只用于构造数据）"""
+    from django.utils import timezone
+
+    from projects.models import Project, Task
+
+    statuses = [value for value, _ in Project.STATUS_CHOICES]
+    now = timezone.now()
+
+    for start in range(0, project_count, SEED_BATCH_SIZE):
+        Project.objects.bulk_create([
+            Project(
+                title=f'项目 {i} {rng.choice(SEARCH_WORDS)}',
+                description=f'{rng.choice(SEARCH_WORDS)}任务描述 {i}',
+                status=rng.choice(statuses),
+                created_at=now - timedelta(minutes=rng.randint(0, 60 * 24 * 365)),
+            )
+            for i in range(start, min(start + SEED_BATCH_SIZE, project_count))
+        ])
+
+    project_ids = list(Project.objects.values_list('pk', flat=True))
+    for start in range(0, task_count, SEED_BATCH_SIZE):
+        Task.objects.bulk_create([
+            Task(project_id=rng.choice(project_ids), title=f'任务 {i}')
+            for i in range(start, min(start + SEED_BATCH_SIZE, task_count))
+        ])
+    return project_ids
+
+
+def run(db_path, project_count, task_count, repeat, seed_value=0):
+    """执行全部 Web 基准测试，返回 {名称: 统计}"""
+    setup_django(db_path)
+
+    from django.test import Client
+
+    from projects.models import Project
+
+    rng = random.Random(seed_value)
+    print(f"生成 {project_count:,} 个项目、{task_count:,} 个任务...")
+    project_ids = seed(project_count, task_count, rng)
+
+    client = Client(HTTP_HOST='localhost')
+    middle_page = max(project_count // 10 // 2, 1)
+    detail_id = project_ids[len(project_ids) // 2]
+    statuses = [value for value, _ in Project.STATUS_CHOICES]
+
+    def status_post():
+        client.post('/', {'project_id': detail_id, 'status': rng.choice(statuses)})
+
+    def get(path, **params):
+        def request():
+            response = client.get(path, params)
+            assert response.status_code == 200, response.status_code
+        return request
+
+    benchmarks = {
+        'web.project_list': get('/'),
+        'web.search': get('/', q='分析'),
+        'web.search_with_status': get('/', q='分析', status='pending'),
+        'web.paginate_middle': get('/', page=middle_page),
+        'web.project_detail': get(f'/{detail_id}/'),
+        'web.dashboard': get('/dashboard/'),
+        'web.status_post': status_post,
+    }
+
+    results = {}
+    for name, func in benchmarks.items():
+        results[name] = measure(func, repeat=repeat)
+        print(f"  {name:<28} 中位数 {results[name]['median'] * 1000:9.2f} ms")
+    results.update(run_list_rendering(client, repeat))
+    return results
+
+
+def run_list_rendering(client, repeat, rows=100):
+    """
+    100 行列表页：整页渲染与分块流式渲染的耗时、首块耗时，以及不压缩 / gzip / brotli 的传输字节数
+    """
+    import time
+
+    from django.test import override_settings
+
+    def consume(response):
+        assert response.status_code == 200, response.status_code
+        return b''.join(response.streaming_content) if response.streaming else response.content
+
+    def buffered():
+        # 阈值调高后 100 行也整页渲染
+        with override_settings(LIST_STREAM_MIN_ROWS=rows + 1):
+            consume(client.get('/', {'per_page': rows}))
+
+    def streamed():
+        consume(client.get('/', {'per_page': rows}))
+
+    def first_chunk():
+        response = client.get('/', {'per_page': rows})
+        next(iter(response.streaming_content))
+        response.close()
+
+    results = {}
+    for name, func in (
+        ('web.list_100_buffered', buffered),
+        ('web.list_100_streamed', streamed),
+        ('web.list_100_first_chunk', first_chunk),
+    ):
+        results[name] = measure(func, repeat=repeat)
+        print(f"  {name:<28} 中位数 {results[name]['median'] * 1000:9.2f} ms")
+
+    sizes = {}
+    for encoding in ('identity', 'gzip', 'br'):
+        started = time.perf_counter()
+        body = consume(client.get('/', {'per_page': rows}, HTTP_ACCEPT_ENCODING=encoding))
+        sizes[encoding] = {'bytes': len(body), 'ms': (time.perf_counter() - started) * 1000}
+    # 字节数不是耗时，不带 median，compare 会跳过
+    results['web.list_100_bytes'] = sizes
+    print(f"  {'web.list_100_bytes':<28} " + '  '.join(
+        f"{encoding} {size['bytes'] / 1024:.1f} KB" for encoding, size in sizes.items()
+    ))
+    return results
@@ -13,4 +13,10 @@ from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'project_manager.settings')
 
-application = get_asgi_application()
+django_application = get_asgi_application()
+
+# 须在 Django 初始化之后导入
+from projects.live import DisconnectWatcher  # noqa: E402
+
+# 监听客户端断开，使 SSE 连接关闭后及时取消订阅
+application = DisconnectWatcher(django_application)
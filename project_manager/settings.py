@@ -44,22 +44,36 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
+    # 带内容哈希的静态文件以 immutable 长缓存返回，并优先发送预压缩的 .br/.gz 版本
+    'whitenoise.middleware.WhiteNoiseMiddleware',
+    # 动态响应按 Accept-Encoding 压缩（brotli / gzip），须在修改响应内容的中间件之前
+    'projects.middleware.ResponseCompressionMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    'projects.middleware.PrimaryPinningMiddleware',
 ]
 
 ROOT_URLCONF = 'project_manager.urls'
 
+# 模板加载器：默认缓存编译后的模板（生产配置）；开发时可设置 TEMPLATE_CACHE=False，修改模板无需重启
+TEMPLATE_CACHE = os.environ.get('TEMPLATE_CACHE', 'True').lower() == 'true'
+template_loaders = [
+    'django.template.loaders.filesystem.Loader',
+    'django.template.loaders.app_directories.Loader',
+]
+if TEMPLATE_CACHE:
+    template_loaders = [('django.template.loaders.cached.Loader', template_loaders)]
+
 TEMPLATES = [
     {
         'BACKEND': 'django.template.backends.django.DjangoTemplates',
         'DIRS': [],
-        'APP_DIRS': True,
         'OPTIONS': {
+            'loaders': template_loaders,
             'context_processors': [
                 'django.template.context_processors.debug',
                 'django.template.context_processors.request',
@@ -86,6 +100,64 @@ DATABASES = {
     )
 }
 
+# 只读副本：设置 DATABASE_REPLICA_URL 后，只读视图的查询路由到该库
+REPLICA_DATABASE_ALIAS = None
+if os.environ.get('DATABASE_REPLICA_URL'):
+    REPLICA_DATABASE_ALIAS = 'replica'
+    DATABASES[REPLICA_DATABASE_ALIAS] = dj_database_url.parse(
+        os.environ['DATABASE_REPLICA_URL'],
+        conn_max_age=600,
+        conn_health_checks=True,
+    )
+    # 测试时副本镜像主库，两个连接看到同一个测试数据库
+    DATABASES[REPLICA_DATABASE_ALIAS]['TEST'] = {'MIRROR': 'default'}
+
+# 通过 PgBouncer 等事务级连接池访问数据库时，服务端游标不可用
+if os.environ.get('DATABASE_POOLED', 'False').lower() == 'true':
+    for database in DATABASES.values():
+        database['DISABLE_SERVER_SIDE_CURSORS'] = True
+
+DATABASE_ROUTERS = ['projects.routers.ReplicaRouter']
+
+# 写请求后读取固定在主库的秒数，应大于副本的复制延迟
+REPLICA_PIN_SECONDS = int(os.environ.get('REPLICA_PIN_SECONDS', '5'))
+
+# 批量导入/导出每个块（事务）的记录数
+BULK_IMPORT_CHUNK_SIZE = int(os.environ.get('BULK_IMPORT_CHUNK_SIZE', '500'))
+
+# 后台大表列表页：PostgreSQL 估算行数不低于此值时直接使用估算值，不再执行精确 COUNT(*)
+ADMIN_ESTIMATED_COUNT_THRESHOLD = int(os.environ.get('ADMIN_ESTIMATED_COUNT_THRESHOLD', '10000'))
+
+# 完成或取消后超过此天数未更新的项目由 archive_projects 移入归档表
+PROJECT_ARCHIVE_AFTER_DAYS = int(os.environ.get('PROJECT_ARCHIVE_AFTER_DAYS', '180'))
+
+# 后台任务队列：run_jobs 默认工作进程数、重试退避基数（秒）、运行超时后重新入队的时间（秒）
+JOB_WORKERS = int(os.environ.get('JOB_WORKERS', '2'))
+JOB_RETRY_BASE_SECONDS = int(os.environ.get('JOB_RETRY_BASE_SECONDS', '30'))
+JOB_STALE_SECONDS = int(os.environ.get('JOB_STALE_SECONDS', '3600'))
+
+# projects 应用（如后台任务工作进程）的日志输出到控制台
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'console': {'class': 'logging.StreamHandler'},
+    },
+    'loggers': {
+        'projects': {
+            'handlers': ['console'],
+            'level': os.environ.get('PROJECTS_LOG_LEVEL', 'INFO'),
+        },
+    },
+}
+
+# 实时推送（SSE）：共享轮询间隔、心跳间隔、单个连接的最长时间（到期后客户端自动重连），以及可选推送最新价格的股票代码
+LIVE_POLL_INTERVAL = float(os.environ.get('LIVE_POLL_INTERVAL', '2'))
+LIVE_KEEPALIVE_SECONDS = int(os.environ.get('LIVE_KEEPALIVE_SECONDS', '15'))
+LIVE_MAX_CONNECTION_SECONDS = int(os.environ.get('LIVE_MAX_CONNECTION_SECONDS', '300'))
+LIVE_STOCK_SYMBOLS = [s for s in os.environ.get('LIVE_STOCK_SYMBOLS', '').split(',') if s]
+STOCK_DATA_DIR = os.environ.get('STOCK_DATA_DIR', os.path.join(BASE_DIR, 'stock_data'))
+
 
 # Password validation
 # https://docs.djangoproject.com/en/4.2/ref/settings/#auth-password-validators
@@ -124,6 +196,33 @@ USE_TZ = True
 STATIC_URL = '/static/'
 STATIC_ROOT = os.path.join(BASE_DIR, 'static')
 
+STORAGES = {
+    'default': {
+        'BACKEND': 'django.core.files.storage.FileSystemStorage',
+    },
+    # collectstatic 时生成带内容哈希的文件名以及 gzip/brotli 预压缩版本；
+    # 未运行 collectstatic 的环境（如基准测试）可通过 STATICFILES_BACKEND 覆盖
+    'staticfiles': {
+        'BACKEND': os.environ.get('STATICFILES_BACKEND', 'whitenoise.storage.CompressedManifestStaticFilesStorage'),
+    },
+}
+
+# 哈希文件名的缓存时间由 WhiteNoise 设为永久，其余文件缓存一天
+WHITENOISE_MAX_AGE = 86400
+
+# 动态响应压缩：不小于 COMPRESSION_MIN_SIZE 字节的文本响应才压缩；brotli 质量取 0-11，动态内容不宜过高
+COMPRESSION_MIN_SIZE = int(os.environ.get('COMPRESSION_MIN_SIZE', '1024'))
+COMPRESSION_BROTLI_QUALITY = int(os.environ.get('COMPRESSION_BROTLI_QUALITY', '5'))
+COMPRESSION_GZIP_LEVEL = int(os.environ.get('COMPRESSION_GZIP_LEVEL', '6'))
+# 流式响应每积累多少字节输出一次压缩数据
+COMPRESSION_STREAM_FLUSH_BYTES = int(os.environ.get('COMPRESSION_STREAM_FLUSH_BYTES', str(16 * 1024)))
+
+# 项目列表每页行数不少于此值时流式输出：先发送页头，表格行分块渲染
+LIST_STREAM_MIN_ROWS = int(os.environ.get('LIST_STREAM_MIN_ROWS', '50'))
+
+# 项目列表页内联首屏关键样式，完整样式表异步加载
+CRITICAL_CSS_INLINE = os.environ.get('CRITICAL_CSS_INLINE', 'True').lower() == 'true'
+
 MEDIA_URL = '/media/'
 MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
 
@@ -1,11 +1,33 @@
 from django.contrib import admin
-from .models import Project, Task
+from django.urls import reverse
+from django.utils import timezone
+from django.utils.html import format_html
+from .models import ArchivedProject, Job, Project, ProjectDailyRollup, ProjectEvent, Task
+from .pagination import EstimatedCountPaginator
+from .routers import read_from_replica
+
+
+class ReplicaChangeListMixin:
+    """变更列表页从只读副本读取"""
+
+    def changelist_view(self, request, extra_context=None):
+        return read_from_replica(super().changelist_view)(request, extra_context)
+
+
+class LargeTableAdminMixin(ReplicaChangeListMixin):
+    """
+    大表变更列表：从只读副本读取，总数用估算值，且不再额外统计未筛选的总行数。
+    按日期浏览使用 date_hierarchy（对应字段建有索引），不使用日期 list_filter。
+    """
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
 
 
 @admin.register(Project)
-class ProjectAdmin(admin.ModelAdmin):
-    list_display = ('title', 'status', 'created_at', 'updated_at')
-    list_filter = ('status', 'created_at', 'updated_at')
+class ProjectAdmin(LargeTableAdminMixin, admin.ModelAdmin):
+    list_display = ('title', 'status', 'created_at', 'updated_at', 'tasks_link')
+    list_filter = ('status',)
+    date_hierarchy = 'created_at'
     search_fields = ('title', 'description')
     readonly_fields = ('created_at', 'updated_at')
     
@@ -22,17 +44,26 @@ class ProjectAdmin(admin.ModelAdmin):
         }),
     )
 
+    @admin.display(description='任务')
+    def tasks_link(self, obj):
+        # 只拼接链接不查询任务数，避免每行一次查询；按项目筛选任务比按项目标题搜索快得多
+        url = reverse('admin:projects_task_changelist')
+        return format_html('<a href="{}?project__id__exact={}">查看任务</a>', url, obj.pk)
+
 
 @admin.register(Task)
-class TaskAdmin(admin.ModelAdmin):
-    list_display = ('project', 'title', 'completed', 'created_at')
-    list_filter = ('completed', 'created_at')
-    search_fields = ('project__title', 'title')
+class TaskAdmin(LargeTableAdminMixin, admin.ModelAdmin):
+    list_display = ('project', 'title', 'depth', 'completed', 'created_at')
+    list_select_related = ('project',)
+    list_filter = ('completed',)
+    date_hierarchy = 'created_at'
+    search_fields = ('title',)
+    autocomplete_fields = ('project', 'parent')
     readonly_fields = ('created_at',)
     
     fieldsets = (
         (None, {
-            'fields': ('project', 'title', 'description')
+            'fields': ('project', 'parent', 'title', 'description')
         }),
         ('任务状态', {
             'fields': ('completed',)
@@ -41,4 +72,67 @@ class TaskAdmin(admin.ModelAdmin):
             'fields': ('created_at',),
             'classes': ('collapse',)
         }),
-    )
\ No newline at end of file
+    )
+
+    def get_readonly_fields(self, request, obj=None):
+        # 移动任务需要同时改写子树的路径，只能在项目详情页中操作
+        if obj is not None:
+            return self.readonly_fields + ('project', 'parent')
+        return self.readonly_fields
+
+
+@admin.register(ProjectDailyRollup)
+class ProjectDailyRollupAdmin(admin.ModelAdmin):
+    list_display = ('date', 'created_count', 'completed_count', 'cancelled_count', 'open_count')
+    date_hierarchy = 'date'
+    readonly_fields = (
+        'date', 'created_count', 'completed_count', 'cancelled_count',
+        'open_count', 'completion_seconds_total', 'completion_histogram',
+    )
+
+
+@admin.register(ProjectEvent)
+class ProjectEventAdmin(admin.ModelAdmin):
+    list_display = ('project_id', 'old_status', 'new_status', 'created_at')
+    list_filter = ('new_status',)
+    date_hierarchy = 'created_at'
+
+    # 事件日志只追加，后台只读
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+    def has_delete_permission(self, request, obj=None):
+        return False
+
+
+@admin.register(Job)
+class JobAdmin(admin.ModelAdmin):
+    list_display = ('kind', 'status', 'priority', 'progress', 'attempts', 'project', 'created_at', 'finished_at')
+    list_filter = ('status', 'kind')
+    list_select_related = ('project',)
+    autocomplete_fields = ('project',)
+    readonly_fields = ('attempts', 'progress', 'progress_message', 'error', 'worker', 'created_at', 'started_at', 'finished_at')
+    actions = ['retry_jobs']
+
+    @admin.action(description='重新排队所选任务')
+    def retry_jobs(self, request, queryset):
+        count = queryset.exclude(status='running').update(status='queued', attempts=0, run_after=timezone.now(), error='')
+        self.message_user(request, f'已重新排队 {count} 个任务')
+
+
+@admin.register(ArchivedProject)
+class ArchivedProjectAdmin(LargeTableAdminMixin, admin.ModelAdmin):
+    list_display = ('title', 'status', 'created_at', 'updated_at', 'archived_at')
+    list_filter = ('status',)
+    date_hierarchy = 'created_at'
+    search_fields = ('title', 'description')
+
+    # 归档数据只读，恢复请使用项目详情页的"恢复项目"
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
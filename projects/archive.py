@@ -0,0 +1,81 @@
+"""
+已完成项目的冷热分离
+
+完成或取消后较久未更新的项目连同任务移到 ArchivedProject / ArchivedTask，热表及其索引只保留活跃数据，
+默认列表、计数和搜索都不再扫描历史项目。归档保留原 ID，状态日志与每日汇总不受影响。
+"""
+
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from .models import FINISHED_STATUSES, ArchivedProject, ArchivedTask, Project, Task
+
+PROJECT_FIELDS = ['id', 'title', 'description', 'status', 'created_at', 'updated_at', 'result', 'notes']
+TASK_FIELDS = ['id', 'project_id', 'parent_id', 'title', 'description', 'completed', 'created_at', 'path', 'depth']
+
+ARCHIVE_BATCH_SIZE = 500
+
+
+def archive_cutoff(days=None):
+    days = settings.PROJECT_ARCHIVE_AFTER_DAYS if days is None else days
+    return timezone.now() - timedelta(days=days)
+
+
+def archivable_projects(cutoff):
+    """可以归档的项目：已完成或已取消，且在 cutoff 之前最后更新"""
+    return Project.objects.filter(status__in=FINISHED_STATUSES, updated_at__lt=cutoff)
+
+
+def archive_projects(cutoff, batch_size=ARCHIVE_BATCH_SIZE):
+    """
+    分批把项目及其任务移入归档表，每批一个事务
+    :return: 归档的项目数
+    """
+    archived = 0
+    now = timezone.now()
+    while True:
+        with transaction.atomic():
+            # 在事务内重新按条件锁定，避免与同时进行的状态修改冲突
+            projects = list(
+                archivable_projects(cutoff).order_by('pk').select_for_update().values(*PROJECT_FIELDS)[:batch_size]
+            )
+            if not projects:
+                break
+            ids = [project['id'] for project in projects]
+            tasks = Task.objects.filter(project_id__in=ids)
+
+            ArchivedProject.objects.bulk_create(
+                [ArchivedProject(archived_at=now, **project) for project in projects]
+            )
+            # 按路径顺序写入，上级任务总在子任务之前
+            rows = tasks.order_by('project_id', 'path').values(*TASK_FIELDS).iterator(chunk_size=2000)
+            ArchivedTask.objects.bulk_create(
+                [ArchivedTask(**task) for task in rows],
+                batch_size=2000,
+            )
+            tasks.delete()
+            Project.objects.filter(pk__in=ids).delete()
+        archived += len(projects)
+    return archived
+
+
+def restore_project(pk):
+    """
+    把归档项目恢复到热表
+
+    用 bulk_create 写入，不触发 post_save 信号，因此不会被记为新建项目。
+    :return: 恢复后的 Project
+    """
+    with transaction.atomic():
+        archived = ArchivedProject.objects.select_for_update().get(pk=pk)
+        project = Project(**{field: getattr(archived, field) for field in PROJECT_FIELDS})
+        Project.objects.bulk_create([project])
+        Task.objects.bulk_create(
+            [Task(**task) for task in archived.tasks.order_by('path').values(*TASK_FIELDS)],
+            batch_size=2000,
+        )
+        archived.delete()
+    return Project.objects.get(pk=pk)
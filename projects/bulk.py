@@ -0,0 +1,262 @@
+"""
+项目批量导入/导出
+
+以流的方式解析 CSV / NDJSON 文件，按块（chunk）写入数据库；
+导出时使用 ``QuerySet.iterator()`` 逐块读取，避免把整张表载入内存。
+"""
+
+import csv
+import json
+from itertools import islice
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from .models import Project, ProjectDailyRollup, ProjectEvent, Task
+
+FORMATS = ('csv', 'ndjson')
+
+# 导出列，顺序即 CSV 表头顺序
+PROJECT_EXPORT_FIELDS = ['id', 'title', 'description', 'status', 'result', 'notes', 'created_at', 'updated_at']
+TASK_EXPORT_FIELDS = ['id', 'project_id', 'parent_id', 'title', 'description', 'completed', 'created_at']
+
+EXPORT_MODELS = {
+    'project': (Project, PROJECT_EXPORT_FIELDS),
+    'task': (Task, TASK_EXPORT_FIELDS),
+}
+
+VALID_STATUSES = {value for value, _ in Project.STATUS_CHOICES}
+
+# 导入摘要中最多列出的无效行，其余只计数
+MAX_REPORTED_ERRORS = 20
+
+# 导入时读取的字段，值须为字符串或为空
+IMPORT_FIELDS = ('title', 'description', 'status', 'result', 'notes', 'created_at')
+TITLE_MAX_LENGTH = Project._meta.get_field('title').max_length
+
+
+class Record(dict):
+    """带输入行号的记录，用于在导入摘要中报告无效行"""
+
+    def __init__(self, data, line=None):
+        super().__init__(data)
+        self.line = line
+
+
+class InvalidRecord:
+    """无法解析为记录的输入行，导入时计为无效并报告行号"""
+
+    def __init__(self, line, reason):
+        self.line = line
+        self.reason = reason
+
+
+def get_chunk_size(chunk_size=None):
+    """返回有效的块大小，未指定时使用 settings.BULK_IMPORT_CHUNK_SIZE"""
+    if chunk_size is None:
+        chunk_size = getattr(settings, 'BULK_IMPORT_CHUNK_SIZE', 500)
+    if chunk_size < 1:
+        raise ValueError('chunk_size 必须大于 0')
+    return chunk_size
+
+
+def guess_format(filename):
+    """根据文件扩展名推断格式"""
+    name = (filename or '').lower()
+    if name.endswith(('.ndjson', '.jsonl')):
+        return 'ndjson'
+    return 'csv'
+
+
+def iter_records(lines, fmt):
+    """
+    把文本行迭代器解析为字典记录的迭代器
+    :param lines: 可迭代的文本行（已打开的文件或解码后的上传文件）
+    :param fmt: 'csv' 或 'ndjson'
+    """
+    if fmt == 'csv':
+        return _iter_csv(lines)
+    if fmt == 'ndjson':
+        return _iter_ndjson(lines)
+    raise ValueError(f'不支持的格式: {fmt}')
+
+
+def _iter_csv(lines):
+    reader = csv.DictReader(lines)
+    for row in reader:
+        yield Record(row, reader.line_num)
+
+
+def _iter_ndjson(lines):
+    for number, line in enumerate(lines, 1):
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            record = json.loads(line)
+        except json.JSONDecodeError as e:
+            yield InvalidRecord(number, f'JSON 格式错误（{e.msg}）')
+            continue
+        if isinstance(record, dict):
+            yield Record(record, number)
+        else:
+            yield InvalidRecord(number, '不是 JSON 对象')
+
+
+def _chunked(iterable, size):
+    iterator = iter(iterable)
+    while True:
+        chunk = list(islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def _parse_created_at(value):
+    """解析创建时间；无法识别的格式使用当前时间，格式正确但日期不存在时抛出 ValueError"""
+    if not value:
+        return timezone.now()
+    parsed = parse_datetime(value)
+    if parsed is None:
+        return timezone.now()
+    if timezone.is_naive(parsed):
+        parsed = timezone.make_aware(parsed)
+    return parsed
+
+
+def _invalid_reason(record):
+    """检查记录能否导入，返回无效原因；可以导入时返回 None"""
+    for field in IMPORT_FIELDS:
+        value = record.get(field)
+        if value is not None and not isinstance(value, str):
+            return f'{field} 不是字符串'
+    title = (record.get('title') or '').strip()
+    if not title:
+        return '缺少标题'
+    if len(title) > TITLE_MAX_LENGTH:
+        return f'标题超过 {TITLE_MAX_LENGTH} 个字符'
+    try:
+        _parse_created_at(record.get('created_at'))
+    except ValueError:
+        return 'created_at 不是有效的时间'
+    return None
+
+
+def _add_invalid(summary, line, reason):
+    summary['invalid'] += 1
+    if len(summary['errors']) < MAX_REPORTED_ERRORS:
+        summary['errors'].append(f'第 {line} 行: {reason}' if line else reason)
+
+
+def _build_project(record, title):
+    status = record.get('status') or 'pending'
+    if status not in VALID_STATUSES:
+        status = 'pending'
+    return Project(
+        title=title,
+        description=record.get('description') or '',
+        status=status,
+        result=record.get('result') or '',
+        notes=record.get('notes') or '',
+        created_at=_parse_created_at(record.get('created_at')),
+    )
+
+
+def import_projects(records, chunk_size=None, progress=None):
+    """
+    分块批量导入项目
+
+    每个块在一个事务中用 ``bulk_create`` 写入；标题与数据库中已有的项目
+    或同一块内先出现的记录重复时跳过。
+    :param progress: 可选回调，每个块提交后以当前计数字典调用
+    :return: 包含 created / skipped / invalid 计数的字典，errors 列出前 MAX_REPORTED_ERRORS 个无效记录及原因
+    """
+    chunk_size = get_chunk_size(chunk_size)
+    summary = {'created': 0, 'skipped': 0, 'invalid': 0, 'errors': []}
+
+    for chunk in _chunked(records, chunk_size):
+        valid = []
+        for record in chunk:
+            if isinstance(record, InvalidRecord):
+                _add_invalid(summary, record.line, record.reason)
+                continue
+            reason = _invalid_reason(record)
+            if reason is not None:
+                _add_invalid(summary, getattr(record, 'line', None), reason)
+                continue
+            valid.append(record)
+
+        titles = {record['title'].strip() for record in valid}
+
+        with transaction.atomic():
+            # 本块内的去重集合：先装入数据库中已存在的标题
+            seen = set(Project.objects.filter(title__in=titles).values_list('title', flat=True))
+            new_projects = []
+            for record in valid:
+                title = record['title'].strip()
+                if title in seen:
+                    summary['skipped'] += 1
+                    continue
+                seen.add(title)
+                new_projects.append(_build_project(record, title))
+
+            Project.objects.bulk_create(new_projects, batch_size=chunk_size)
+            # bulk_create 不触发 post_save，在同一事务中批量写入事件日志并更新每日汇总
+            ProjectEvent.objects.bulk_create(
+                [ProjectEvent(project=project, new_status=project.status) for project in new_projects],
+                batch_size=chunk_size,
+            )
+            ProjectDailyRollup.objects.record_transitions(
+                (project, None, project.status, None) for project in new_projects
+            )
+            summary['created'] += len(new_projects)
+
+        if progress is not None:
+            progress(summary)
+
+    return summary
+
+
+class _Echo:
+    """只实现 write() 的伪缓冲区，让 csv.writer 直接返回每一行"""
+
+    def write(self, value):
+        return value
+
+
+def _serialize(value):
+    if hasattr(value, 'isoformat'):
+        return value.isoformat()
+    return value
+
+
+def export_rows(model_name, fmt, chunk_size=None, using=None):
+    """
+    逐行导出整张表，返回文本行的生成器
+    :param model_name: 'project' 或 'task'
+    :param fmt: 'csv' 或 'ndjson'
+    :param using: 读取的数据库别名，默认由路由决定
+    """
+    if model_name not in EXPORT_MODELS:
+        raise ValueError(f'不支持的导出对象: {model_name}')
+    if fmt not in FORMATS:
+        raise ValueError(f'不支持的格式: {fmt}')
+
+    model, fields = EXPORT_MODELS[model_name]
+    rows = (
+        model.objects.using(using).order_by('pk')
+        .values_list(*fields)
+        .iterator(chunk_size=get_chunk_size(chunk_size))
+    )
+
+    if fmt == 'csv':
+        writer = csv.writer(_Echo())
+        yield writer.writerow(fields)
+        for row in rows:
+            yield writer.writerow([_serialize(value) for value in row])
+    else:
+        for row in rows:
+            record = {field: _serialize(value) for field, value in zip(fields, row)}
+            yield json.dumps(record, ensure_ascii=False) + '\n'
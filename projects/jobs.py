@@ -0,0 +1,219 @@
+"""
+基于数据库的后台任务队列
+
+耗时操作（删除大量任务的项目、批量导入、重建统计）通过 enqueue() 写入 Job 表后立即返回，
+由 ``python manage.py run_jobs`` 启动的工作进程按优先级领取执行。失败的任务按指数退避重试。
+"""
+
+import codecs
+import logging
+import os
+import socket
+import time
+import traceback
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.files.storage import default_storage
+from django.db import IntegrityError, close_old_connections, transaction
+from django.db.models import F
+from django.utils import timezone
+
+from .bulk import import_projects, iter_records
+from .metrics import rebuild_rollups
+from .models import Job, Project, Task
+
+logger = logging.getLogger(__name__)
+
+HANDLERS = {}
+
+# 删除项目时每批删除的任务数
+DELETE_BATCH_SIZE = 1000
+
+
+def register(kind):
+    """注册任务处理函数，处理函数以 (job, **payload) 调用"""
+    def decorator(func):
+        HANDLERS[kind] = func
+        return func
+    return decorator
+
+
+def enqueue(kind, payload=None, priority=0, project=None, max_attempts=3, unique=False):
+    """
+    创建后台任务并立即返回
+    :param unique: 已有同类的排队或运行中任务时不再创建并返回 None，由 Job 上的条件唯一约束保证，并发请求也不会重复入队
+    """
+    if kind not in HANDLERS:
+        raise ValueError(f'未知的任务类型: {kind}')
+    fields = {
+        'kind': kind,
+        'payload': payload or {},
+        'priority': priority,
+        'project': project,
+        'max_attempts': max_attempts,
+    }
+    if not unique:
+        return Job.objects.create(**fields)
+    try:
+        with transaction.atomic():
+            return Job.objects.create(**fields)
+    except IntegrityError:
+        return None
+
+
+def report_progress(job, percent, message=''):
+    """更新任务进度，只写进度字段"""
+    job.progress = max(0, min(int(percent), 100))
+    job.progress_message = message[:200]
+    Job.objects.filter(pk=job.pk).update(progress=job.progress, progress_message=job.progress_message)
+
+
+def default_worker_name():
+    return f'{socket.gethostname()}:{os.getpid()}'
+
+
+def claim_next(worker_name):
+    """
+    领取下一个到期任务
+
+    用带状态条件的 UPDATE 领取，多个工作进程同时竞争同一任务时只有一个会成功，不依赖行锁。
+    """
+    now = timezone.now()
+    candidates = (
+        Job.objects.filter(status='queued', run_after__lte=now)
+        .order_by('-priority', 'run_after', 'pk')
+        .values_list('pk', flat=True)[:10]
+    )
+    for pk in candidates:
+        claimed = Job.objects.filter(pk=pk, status='queued').update(
+            status='running',
+            worker=worker_name,
+            started_at=now,
+            attempts=F('attempts') + 1,
+        )
+        if claimed:
+            return Job.objects.get(pk=pk)
+    return None
+
+
+def requeue_stale(timeout_seconds=None):
+    """把运行超时（通常是工作进程崩溃）的任务放回队列"""
+    timeout_seconds = timeout_seconds or getattr(settings, 'JOB_STALE_SECONDS', 3600)
+    cutoff = timezone.now() - timedelta(seconds=timeout_seconds)
+    return Job.objects.filter(status='running', started_at__lt=cutoff).update(status='queued', worker='')
+
+
+def execute(job):
+    """执行一个已领取的任务，返回是否成功"""
+    handler = HANDLERS.get(job.kind)
+    try:
+        if handler is None:
+            raise ValueError(f'未知的任务类型: {job.kind}')
+        handler(job, **job.payload)
+    except Exception:
+        error = traceback.format_exc()
+        now = timezone.now()
+        if job.attempts < job.max_attempts:
+            delay = getattr(settings, 'JOB_RETRY_BASE_SECONDS', 30) * 2 ** (job.attempts - 1)
+            Job.objects.filter(pk=job.pk).update(
+                status='queued', error=error, worker='', run_after=now + timedelta(seconds=delay)
+            )
+        else:
+            Job.objects.filter(pk=job.pk).update(status='failed', error=error, finished_at=now)
+        logger.warning('任务 %s 执行失败（第 %s 次）: %s', job, job.attempts, error.splitlines()[-1])
+        return False
+
+    Job.objects.filter(pk=job.pk).update(status='succeeded', progress=100, finished_at=timezone.now())
+    return True
+
+
+def run_pending(worker_name=None, limit=None):
+    """执行所有已到期的任务后返回，返回执行的任务数"""
+    worker_name = worker_name or default_worker_name()
+    count = 0
+    while limit is None or count < limit:
+        job = claim_next(worker_name)
+        if job is None:
+            break
+        execute(job)
+        count += 1
+    return count
+
+
+def work(worker_name=None, poll_interval=2.0, should_stop=lambda: False):
+    """
+    工作进程主循环：持续领取并执行任务，队列为空时等待 poll_interval 秒
+
+    领取或执行过程中的数据库错误（连接断开、锁超时等）只记录日志，关闭失效连接后等待下一轮，
+    不让工作进程退出；因此中断、停留在运行中的任务由 requeue_stale() 在超时后重新排队。
+    """
+    worker_name = worker_name or default_worker_name()
+    logger.info('工作进程 %s 已启动', worker_name)
+    requeue_stale()
+    while not should_stop():
+        try:
+            job = claim_next(worker_name)
+            if job is not None:
+                logger.info('[%s] 开始执行 %s', worker_name, job)
+                execute(job)
+                continue
+        except Exception:
+            logger.exception('[%s] 工作进程出错，%s 秒后重试', worker_name, poll_interval)
+            close_old_connections()
+        time.sleep(poll_interval)
+
+
+@register('delete_project')
+def delete_project(job, project_id):
+    """分批删除项目的任务后删除项目，避免一次级联删除长时间占用事务"""
+    tasks = Task.objects.filter(project_id=project_id)
+    total = tasks.count()
+    deleted = 0
+    while True:
+        ids = list(tasks.values_list('pk', flat=True)[:DELETE_BATCH_SIZE])
+        if not ids:
+            break
+        Task.objects.filter(pk__in=ids).delete()
+        deleted += len(ids)
+        report_progress(job, deleted * 90 / total, f'已删除 {deleted}/{total} 个任务')
+
+    project = Project.objects.filter(pk=project_id).first()
+    if project is not None:
+        project.delete()
+    report_progress(job, 100, '项目已删除')
+
+
+@register('import_projects')
+def import_projects_file(job, path, format):
+    """导入已上传的文件；按标题去重，重试时已导入的记录会被跳过"""
+    size = default_storage.size(path) or 1
+    read = 0
+
+    def counted(lines):
+        nonlocal read
+        for line in lines:
+            read += len(line)
+            yield line
+
+    def on_chunk(summary):
+        # 进度按已读取的字节数估算，完成前最多显示 99%
+        report_progress(
+            job,
+            min(read * 100 / size, 99),
+            f"已新增 {summary['created']}，跳过 {summary['skipped']}，无效 {summary['invalid']}",
+        )
+
+    with default_storage.open(path, 'rb') as file:
+        records = iter_records(codecs.iterdecode(counted(file), 'utf-8-sig'), format)
+        summary = import_projects(records, progress=on_chunk)
+    default_storage.delete(path)
+    message = f"导入完成：新增 {summary['created']}，重复跳过 {summary['skipped']}，无效 {summary['invalid']}"
+    if summary['errors']:
+        message += f"（{summary['errors'][0]}）"
+    report_progress(job, 100, message)
+
+
+@register('rebuild_project_metrics')
+def rebuild_project_metrics(job):
+    rebuild_rollups()
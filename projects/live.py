@@ -0,0 +1,208 @@
+"""
+Server-Sent Events 实时推送
+
+每个 ASGI 工作进程只有一个 ChangeFeed：它轮询 ProjectEvent 日志（以及可选的股票最新价格），
+再把变化分发给所有已连接客户端的队列。数据库轮询次数与连接数无关。
+
+Django 4.2 在发送流式响应期间不会读取 ASGI 的 receive 通道，客户端断开后生成器不会结束；
+DisconnectWatcher 在请求体读完后继续监听 http.disconnect，供推送循环及时退出。
+"""
+
+import asyncio
+import json
+import logging
+import os
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+
+from .models import Project, ProjectEvent
+
+logger = logging.getLogger(__name__)
+
+STATUS_LABELS = dict(Project.STATUS_CHOICES)
+
+# 放在 ASGI scope 中的断开事件（asyncio.Event）
+DISCONNECTED_SCOPE_KEY = 'moltbot.disconnected'
+
+
+def format_sse(event, data):
+    """按 SSE 协议格式化一条消息"""
+    return f'event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n'
+
+
+class ChangeFeed:
+    def __init__(self, poll_interval=None, queue_size=100, batch_size=500):
+        self.poll_interval = poll_interval or getattr(settings, 'LIVE_POLL_INTERVAL', 2)
+        self.queue_size = queue_size
+        self.batch_size = batch_size
+        self._subscribers = set()
+        self._task = None
+        self._last_event_id = None
+        self._last_prices = {}
+
+    def subscribe(self):
+        """注册一个客户端，返回其消息队列；第一个客户端连接时启动轮询"""
+        queue = asyncio.Queue(maxsize=self.queue_size)
+        self._subscribers.add(queue)
+        if self._task is None or self._task.done():
+            self._task = asyncio.ensure_future(self._run())
+        return queue
+
+    def unsubscribe(self, queue):
+        """移除客户端；没有客户端时停止轮询，下次有客户端连接时从最新事件重新开始"""
+        self._subscribers.discard(queue)
+        if not self._subscribers and self._task is not None:
+            self._task.cancel()
+            self._task = None
+            self._last_event_id = None
+
+    def publish(self, message):
+        for queue in self._subscribers:
+            if queue.full():
+                # 慢客户端丢弃最旧的消息，不阻塞其他客户端
+                queue.get_nowait()
+            queue.put_nowait(message)
+
+    async def _run(self):
+        while True:
+            try:
+                await self.poll_once()
+            except Exception:
+                logger.exception('实时推送轮询出错')
+            await asyncio.sleep(self.poll_interval)
+
+    async def poll_once(self):
+        """执行一次轮询并分发所有新消息"""
+        for message in await sync_to_async(self._fetch_project_changes)():
+            self.publish(message)
+        for message in await sync_to_async(self._fetch_price_changes)():
+            self.publish(message)
+
+    def _fetch_project_changes(self):
+        if self._last_event_id is None:
+            # 首次轮询只记录位置，客户端此前的状态已由页面渲染
+            self._last_event_id = ProjectEvent.objects.order_by('-pk').values_list('pk', flat=True).first() or 0
+            return []
+
+        events = list(
+            ProjectEvent.objects.filter(pk__gt=self._last_event_id)
+            .order_by('pk')
+            .values('pk', 'project_id', 'old_status', 'new_status', 'created_at')[:self.batch_size]
+        )
+        if not events:
+            return []
+        self._last_event_id = events[-1]['pk']
+
+        titles = dict(
+            Project.objects.filter(pk__in={event['project_id'] for event in events}).values_list('pk', 'title')
+        )
+        messages = []
+        for event in events:
+            if event['project_id'] not in titles:
+                continue
+            messages.append(format_sse('project', {
+                'id': event['project_id'],
+                'title': titles[event['project_id']],
+                'created': not event['old_status'],
+                'status': event['new_status'],
+                'status_label': STATUS_LABELS.get(event['new_status'], event['new_status']),
+                'updated_at': event['created_at'].isoformat(),
+            }))
+        return messages
+
+    def _fetch_price_changes(self):
+        symbols = getattr(settings, 'LIVE_STOCK_SYMBOLS', [])
+        if not symbols:
+            return []
+
+        from stock_data_logger import StockDataLogger
+
+        messages = []
+        for symbol in symbols:
+            path = os.path.join(settings.STOCK_DATA_DIR, f'{symbol}_historical_data.csv')
+            if not os.path.exists(path):
+                continue
+            latest = StockDataLogger(symbol, data_dir=settings.STOCK_DATA_DIR).get_latest_record()
+            if latest is None or self._last_prices.get(symbol) == latest['timestamp']:
+                continue
+            self._last_prices[symbol] = latest['timestamp']
+            messages.append(format_sse('price', {
+                'symbol': symbol,
+                'close': latest['close'],
+                'change_percentage': latest['change_percentage'],
+                'timestamp': latest['timestamp'],
+            }))
+        return messages
+
+
+change_feed = ChangeFeed()
+
+
+class DisconnectWatcher:
+    """
+    ASGI 包装：请求体读完后在后台继续调用 receive，收到 http.disconnect 时设置
+    scope[DISCONNECTED_SCOPE_KEY]；请求处理结束后停止监听
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] != 'http':
+            return await self.app(scope, receive, send)
+
+        disconnected = asyncio.Event()
+        scope[DISCONNECTED_SCOPE_KEY] = disconnected
+        watcher = None
+
+        async def watch():
+            while True:
+                message = await receive()
+                if message['type'] == 'http.disconnect':
+                    disconnected.set()
+                    return
+
+        async def receive_body():
+            nonlocal watcher
+            message = await receive()
+            if message['type'] == 'http.disconnect':
+                disconnected.set()
+            elif not message.get('more_body', False) and watcher is None:
+                watcher = asyncio.ensure_future(watch())
+            return message
+
+        try:
+            await self.app(scope, receive_body, send)
+        finally:
+            if watcher is not None:
+                watcher.cancel()
+
+
+async def stream_changes(feed, disconnected, keepalive, max_age):
+    """
+    单个客户端的推送循环：转发 feed 的消息，空闲时发送心跳
+    客户端断开或连接达到 max_age 秒后结束并取消订阅，EventSource 会按 retry 间隔自动重连。
+    """
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + max_age
+    queue = feed.subscribe()
+    try:
+        yield 'retry: 3000\n\n'
+        while not disconnected.is_set():
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                break
+            get = asyncio.ensure_future(queue.get())
+            closed = asyncio.ensure_future(disconnected.wait())
+            done, pending = await asyncio.wait(
+                {get, closed}, timeout=min(keepalive, remaining), return_when=asyncio.FIRST_COMPLETED
+            )
+            for task in pending:
+                task.cancel()
+            if get in done:
+                yield get.result()
+            elif not done:
+                yield ': keep-alive\n\n'
+    finally:
+        feed.unsubscribe(queue)
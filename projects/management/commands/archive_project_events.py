@@ -0,0 +1,83 @@
+import gzip
+import json
+import os
+import shutil
+import tempfile
+from datetime import timedelta
+from itertools import groupby
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.utils import timezone
+
+from projects.models import ProjectEvent
+
+EVENT_FIELDS = ['id', 'project_id', 'old_status', 'new_status', 'created_at']
+
+
+class Command(BaseCommand):
+    help = '把旧的项目事件按月归档为 gzip 压缩的 NDJSON 文件，并从数据库中移除'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--older-than-days', type=int, default=180, help='归档早于多少天的事件')
+        parser.add_argument('--output-dir', default='event_archive', help='归档文件目录')
+        parser.add_argument('--dry-run', action='store_true', help='只统计，不写文件也不删除')
+
+    def handle(self, *args, **options):
+        if options['older_than_days'] < 1:
+            raise CommandError('--older-than-days 必须大于 0')
+
+        cutoff = timezone.now() - timedelta(days=options['older_than_days'])
+        events = ProjectEvent.objects.archive_before(cutoff)
+
+        if options['dry_run']:
+            self.stdout.write(f'将归档 {events.count()} 条早于 {cutoff:%Y-%m-%d} 的事件')
+            return
+
+        output_dir = options['output_dir']
+        os.makedirs(output_dir, exist_ok=True)
+
+        archived = 0
+        # (临时文件, 分区文件)；事务提交后才把临时文件追加到分区文件
+        staged = []
+        committed = []
+        try:
+            with transaction.atomic():
+                rows = events.select_for_update().values_list(*EVENT_FIELDS).iterator(chunk_size=2000)
+                # 每个月一个分区文件，本次归档的事件先写入同目录下的临时文件
+                for month, month_rows in groupby(rows, key=lambda row: row[-1].strftime('%Y-%m')):
+                    path = os.path.join(output_dir, f'project_events_{month}.ndjson.gz')
+                    fd, temp_path = tempfile.mkstemp(dir=output_dir, prefix=f'project_events_{month}.', suffix='.tmp')
+                    os.close(fd)
+                    staged.append((temp_path, path))
+                    with gzip.open(temp_path, 'wt', encoding='utf-8') as file:
+                        for row in month_rows:
+                            record = dict(zip(EVENT_FIELDS, row))
+                            record['created_at'] = record['created_at'].isoformat()
+                            file.write(json.dumps(record, ensure_ascii=False) + '\n')
+                            archived += 1
+                        file.flush()
+                        os.fsync(file.fileno())
+
+                # 临时文件落盘后再删除；ProjectEvent.delete() 禁止逐条删除，这里直接批量删除
+                events.delete()
+                transaction.on_commit(lambda: committed.append(True) or self.publish(staged))
+        except BaseException:
+            # 事务回滚时丢弃临时文件，重新运行不会重复归档；已提交时保留未追加完的临时文件以便恢复
+            if not committed:
+                for temp_path, _ in staged:
+                    if os.path.exists(temp_path):
+                        os.remove(temp_path)
+            raise
+
+        self.stdout.write(self.style.SUCCESS(f'共归档 {archived} 条事件'))
+
+    def publish(self, staged):
+        """把临时文件作为新的 gzip 成员追加到分区文件末尾"""
+        for temp_path, path in staged:
+            with open(temp_path, 'rb') as source, open(path, 'ab') as target:
+                shutil.copyfileobj(source, target)
+                target.flush()
+                os.fsync(target.fileno())
+            os.remove(temp_path)
+            self.stdout.write(f'已写入 {path}')
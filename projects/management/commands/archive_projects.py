@@ -0,0 +1,25 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from projects.archive import ARCHIVE_BATCH_SIZE, archivable_projects, archive_cutoff, archive_projects
+
+
+class Command(BaseCommand):
+    help = '把完成或取消较久的项目及其任务移入归档表'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--older-than-days', type=int,
+                            help='归档最后更新早于多少天的项目，默认 settings.PROJECT_ARCHIVE_AFTER_DAYS')
+        parser.add_argument('--batch-size', type=int, default=ARCHIVE_BATCH_SIZE, help='每个事务归档的项目数')
+        parser.add_argument('--dry-run', action='store_true', help='只统计，不移动数据')
+
+    def handle(self, *args, **options):
+        if options['older_than_days'] is not None and options['older_than_days'] < 1:
+            raise CommandError('--older-than-days 必须大于 0')
+
+        cutoff = archive_cutoff(options['older_than_days'])
+        if options['dry_run']:
+            self.stdout.write(f'将归档 {archivable_projects(cutoff).count()} 个在 {cutoff:%Y-%m-%d} 之前结束的项目')
+            return
+
+        archived = archive_projects(cutoff, batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(f'已归档 {archived} 个项目'))
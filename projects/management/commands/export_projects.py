@@ -0,0 +1,27 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from projects.bulk import EXPORT_MODELS, FORMATS, export_rows
+
+
+class Command(BaseCommand):
+    help = '以 CSV / NDJSON 流式导出项目或任务表'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--model', choices=sorted(EXPORT_MODELS), default='project', help='导出对象')
+        parser.add_argument('--format', choices=FORMATS, default='csv', help='导出格式')
+        parser.add_argument('--output', help='输出文件路径，默认输出到标准输出')
+        parser.add_argument('--chunk-size', type=int, help='每次从数据库读取的记录数')
+
+    def handle(self, *args, **options):
+        rows = export_rows(options['model'], options['format'], chunk_size=options['chunk_size'])
+        output = options['output']
+
+        try:
+            if output:
+                with open(output, 'w', encoding='utf-8', newline='') as file:
+                    file.writelines(rows)
+            else:
+                for row in rows:
+                    self.stdout.write(row, ending='')
+        except OSError as e:
+            raise CommandError(f'无法写入文件 {output}: {e}')
@@ -0,0 +1,30 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from projects.bulk import FORMATS, guess_format, import_projects, iter_records
+
+
+class Command(BaseCommand):
+    help = '从 CSV / NDJSON 文件流式批量导入项目'
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='要导入的文件路径')
+        parser.add_argument('--format', choices=FORMATS, help='文件格式，默认根据扩展名推断')
+        parser.add_argument('--chunk-size', type=int, help='每个事务写入的记录数')
+
+    def handle(self, *args, **options):
+        path = options['path']
+        fmt = options['format'] or guess_format(path)
+
+        try:
+            with open(path, 'r', encoding='utf-8-sig', newline='') as file:
+                summary = import_projects(iter_records(file, fmt), chunk_size=options['chunk_size'])
+        except OSError as e:
+            raise CommandError(f'无法读取文件 {path}: {e}')
+        except ValueError as e:
+            raise CommandError(str(e))
+
+        for error in summary['errors']:
+            self.stderr.write(f'无效记录 {error}')
+        self.stdout.write(self.style.SUCCESS(
+            f"导入完成：新增 {summary['created']}，重复跳过 {summary['skipped']}，无效 {summary['invalid']}"
+        ))
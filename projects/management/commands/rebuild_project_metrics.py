@@ -0,0 +1,12 @@
+from django.core.management.base import BaseCommand
+
+from projects.metrics import rebuild_rollups
+from projects.models import ProjectDailyRollup
+
+
+class Command(BaseCommand):
+    help = '根据当前项目表重建每日统计汇总'
+
+    def handle(self, *args, **options):
+        rebuild_rollups()
+        self.stdout.write(self.style.SUCCESS(f'已重建 {ProjectDailyRollup.objects.count()} 天的统计汇总'))
@@ -0,0 +1,60 @@
+import multiprocessing
+import signal
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import connections
+
+
+def _worker_main(index, poll_interval):
+    """子进程入口；以 spawn 方式启动时需要重新初始化 Django"""
+    import django
+    django.setup()
+
+    from projects.jobs import default_worker_name, work
+
+    # 收到停止信号后执行完当前任务再退出
+    stopping = []
+    signal.signal(signal.SIGINT, lambda *args: stopping.append(True))
+    signal.signal(signal.SIGTERM, lambda *args: stopping.append(True))
+    work(f'{default_worker_name()}#{index}', poll_interval, should_stop=lambda: bool(stopping))
+
+
+class Command(BaseCommand):
+    help = '启动后台任务工作进程'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, help='工作进程数，默认 settings.JOB_WORKERS')
+        parser.add_argument('--poll-interval', type=float, default=2.0, help='队列为空时的轮询间隔（秒）')
+        parser.add_argument('--once', action='store_true', help='执行完当前到期的任务后退出')
+
+    def handle(self, *args, **options):
+        from projects.jobs import requeue_stale, run_pending
+
+        if options['once']:
+            requeue_stale()
+            count = run_pending()
+            self.stdout.write(self.style.SUCCESS(f'已执行 {count} 个任务'))
+            return
+
+        workers = options['workers'] or getattr(settings, 'JOB_WORKERS', 1)
+        # 子进程不能复用父进程的数据库连接
+        connections.close_all()
+        processes = [
+            multiprocessing.Process(target=_worker_main, args=(index, options['poll_interval']))
+            for index in range(workers)
+        ]
+        for process in processes:
+            process.start()
+        self.stdout.write(f'已启动 {workers} 个工作进程，按 Ctrl+C 停止')
+
+        def stop(*args):
+            for process in processes:
+                if process.is_alive():
+                    process.terminate()
+
+        signal.signal(signal.SIGINT, stop)
+        signal.signal(signal.SIGTERM, stop)
+        for process in processes:
+            process.join()
+        self.stdout.write('工作进程已停止')
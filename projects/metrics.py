@@ -0,0 +1,109 @@
+"""
+项目吞吐量指标
+
+所有指标只读取 ProjectDailyRollup，计算量与天数成正比。
+"""
+
+from collections import Counter
+from datetime import timedelta
+from itertools import chain
+
+from django.db import transaction
+from django.db.models import Sum
+from django.utils import timezone
+
+from .models import ArchivedProject, Project, ProjectDailyRollup, bucket_midpoint_seconds
+
+REBUILD_CHUNK_SIZE = 2000
+
+
+def histogram_median_seconds(histogram):
+    """由耗时直方图估算中位数（秒），无数据时返回 None"""
+    total = sum(histogram.values())
+    if not total:
+        return None
+    middle = (total + 1) / 2
+    seen = 0
+    for bucket in sorted(histogram):
+        seen += histogram[bucket]
+        if seen >= middle:
+            return bucket_midpoint_seconds(bucket)
+    return None
+
+
+def get_dashboard_metrics(days=30, today=None):
+    """
+    汇总最近 ``days`` 天的吞吐量指标
+    :return: 包含每日明细与汇总值的字典
+    """
+    today = today or timezone.localdate()
+    start = today - timedelta(days=days - 1)
+
+    rollups = {
+        rollup.date: rollup
+        for rollup in ProjectDailyRollup.objects.filter(date__gte=start, date__lte=today)
+    }
+    daily = []
+    histogram = Counter()
+    for offset in range(days):
+        date = start + timedelta(days=offset)
+        rollup = rollups.get(date)
+        if rollup is None:
+            daily.append({'date': date, 'created': 0, 'completed': 0, 'cancelled': 0})
+            continue
+        daily.append({
+            'date': date,
+            'created': rollup.created_count,
+            'completed': rollup.completed_count,
+            'cancelled': rollup.cancelled_count,
+        })
+        histogram.update({int(bucket): count for bucket, count in rollup.completion_histogram.items()})
+
+    # 积压年龄：open_count 按创建日期归档，跨全部天数加权
+    backlog_count = 0
+    backlog_age_days = 0
+    for date, open_count in ProjectDailyRollup.objects.filter(open_count__gt=0).values_list('date', 'open_count'):
+        backlog_count += open_count
+        backlog_age_days += open_count * (today - date).days
+    oldest = ProjectDailyRollup.objects.filter(open_count__gt=0).order_by('date').values_list('date', flat=True).first()
+
+    totals = ProjectDailyRollup.objects.filter(date__gte=start, date__lte=today).aggregate(
+        created=Sum('created_count'),
+        completed=Sum('completed_count'),
+        cancelled=Sum('cancelled_count'),
+        completion_seconds=Sum('completion_seconds_total'),
+    )
+    completed = totals['completed'] or 0
+
+    return {
+        'days': days,
+        'daily': daily,
+        'created_total': totals['created'] or 0,
+        'completed_total': completed,
+        'cancelled_total': totals['cancelled'] or 0,
+        'mean_completion_seconds': (totals['completion_seconds'] or 0) / completed if completed else None,
+        'median_completion_seconds': histogram_median_seconds(histogram),
+        'backlog_count': backlog_count,
+        'backlog_mean_age_days': backlog_age_days / backlog_count if backlog_count else None,
+        'backlog_oldest_age_days': (today - oldest).days if oldest else None,
+    }
+
+
+def rebuild_rollups():
+    """
+    根据当前项目表与归档表重建全部汇总
+
+    用于首次启用或数据修复。历史状态变化未被记录，已完成项目以 updated_at 作为完成时间。
+    """
+    with transaction.atomic():
+        ProjectDailyRollup.objects.all().delete()
+        transitions = []
+        for project in chain(
+            Project.objects.only('created_at', 'updated_at', 'status').iterator(chunk_size=REBUILD_CHUNK_SIZE),
+            ArchivedProject.objects.only('created_at', 'updated_at', 'status').iterator(chunk_size=REBUILD_CHUNK_SIZE),
+        ):
+            transitions.append((project, None, project.status, project.updated_at))
+            if len(transitions) >= REBUILD_CHUNK_SIZE:
+                ProjectDailyRollup.objects.record_transitions(transitions)
+                transitions = []
+        ProjectDailyRollup.objects.record_transitions(transitions)
@@ -0,0 +1,151 @@
+import zlib
+
+from django.conf import settings
+from django.utils.cache import patch_vary_headers
+
+from .routers import PRIMARY_PIN_COOKIE, get_replica_alias
+
+try:
+    import brotli
+except ImportError:  # 未安装 whitenoise[brotli] 时只使用 gzip
+    brotli = None
+
+# 只压缩这些类型的响应，图片、压缩包等本身已压缩
+COMPRESSIBLE_TYPES = (
+    'text/', 'application/json', 'application/javascript', 'application/xml',
+    'application/x-ndjson', 'image/svg+xml',
+)
+
+
+class PrimaryPinningMiddleware:
+    """
+    写请求之后在一段时间内把客户端的读取固定在主库
+
+    复制存在延迟，POST 之后重定向到列表页时若从副本读取，可能看不到刚写入的数据。
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        response = self.get_response(request)
+        if get_replica_alias() and request.method not in ('GET', 'HEAD', 'OPTIONS'):
+            response.set_cookie(
+                PRIMARY_PIN_COOKIE,
+                '1',
+                max_age=getattr(settings, 'REPLICA_PIN_SECONDS', 5),
+                httponly=True,
+                samesite='Lax',
+            )
+        return response
+
+
+class ResponseCompressionMiddleware:
+    """
+    按 Accept-Encoding 用 brotli（优先）或 gzip 压缩动态响应
+
+    只压缩文本类响应，且不小于 settings.COMPRESSION_MIN_SIZE 字节；静态文件已由 WhiteNoise 预压缩，
+    本中间件放在 WhiteNoise 之后，不会处理它们。流式响应逐块压缩：第一块立即发出，使浏览器尽早开始解析，
+    之后每积累 COMPRESSION_STREAM_FLUSH_BYTES 字节输出一次。异步流（SSE）需要逐条推送，不压缩。
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        response = self.get_response(request)
+        if not self._compressible(response):
+            return response
+
+        patch_vary_headers(response, ('Accept-Encoding',))
+        encoding = accepted_encoding(request)
+        if encoding is None:
+            return response
+
+        if response.streaming:
+            response.streaming_content = self._compress_stream(response.streaming_content, encoding)
+            del response.headers['Content-Length']
+        else:
+            compressor = Compressor(encoding)
+            content = compressor.compress(response.content) + compressor.finish()
+            if len(content) >= len(response.content):
+                return response
+            response.content = content
+            response.headers['Content-Length'] = str(len(content))
+
+        # 与 Django 的 GZipMiddleware 一致：压缩后内容与未压缩版本不同，强 ETag 改为弱 ETag
+        etag = response.get('ETag')
+        if etag and etag.startswith('"'):
+            response.headers['ETag'] = 'W/' + etag
+        response.headers['Content-Encoding'] = encoding
+        return response
+
+    def _compressible(self, response):
+        if response.has_header('Content-Encoding'):
+            return False
+        content_type = response.get('Content-Type', '').split(';', 1)[0].strip().lower()
+        if content_type == 'text/event-stream' or not content_type.startswith(COMPRESSIBLE_TYPES):
+            return False
+        if response.streaming:
+            return not response.is_async
+        return len(response.content) >= getattr(settings, 'COMPRESSION_MIN_SIZE', 1024)
+
+    def _compress_stream(self, chunks, encoding):
+        compressor = Compressor(encoding)
+        flush_bytes = getattr(settings, 'COMPRESSION_STREAM_FLUSH_BYTES', 16 * 1024)
+        first = True
+        pending = 0
+        for chunk in chunks:
+            if isinstance(chunk, str):
+                chunk = chunk.encode(settings.DEFAULT_CHARSET)
+            data = compressor.compress(chunk)
+            pending += len(chunk)
+            if first or pending >= flush_bytes:
+                data += compressor.flush()
+                first = False
+                pending = 0
+            if data:
+                yield data
+        yield compressor.finish()
+
+
+def accepted_encoding(request):
+    """从 Accept-Encoding 中选出支持的压缩方式，brotli 优先；都不接受时返回 None"""
+    qualities = {}
+    for part in request.META.get('HTTP_ACCEPT_ENCODING', '').split(','):
+        name, _, params = part.partition(';')
+        quality = 1.0
+        params = params.strip().replace(' ', '')
+        if params.startswith('q='):
+            try:
+                quality = float(params[2:])
+            except ValueError:
+                quality = 0.0
+        qualities[name.strip().lower()] = quality
+    if brotli is not None and qualities.get('br', 0) > 0:
+        return 'br'
+    if qualities.get('gzip', 0) > 0:
+        return 'gzip'
+    return None
+
+
+class Compressor:
+    """brotli / gzip 增量压缩的统一接口：compress() 追加数据，flush() 输出已压缩的部分，finish() 结束"""
+
+    def __init__(self, encoding):
+        if encoding == 'br':
+            self._brotli = brotli.Compressor(quality=getattr(settings, 'COMPRESSION_BROTLI_QUALITY', 5))
+            self._zlib = None
+        else:
+            self._brotli = None
+            # wbits=31 输出带 gzip 头的数据
+            self._zlib = zlib.compressobj(getattr(settings, 'COMPRESSION_GZIP_LEVEL', 6), zlib.DEFLATED, 31)
+
+    def compress(self, data):
+        return self._brotli.process(data) if self._brotli else self._zlib.compress(data)
+
+    def flush(self):
+        return self._brotli.flush() if self._brotli else self._zlib.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self):
+        return self._brotli.finish() if self._brotli else self._zlib.flush()
@@ -0,0 +1,31 @@
+# Generated by Django 4.2.27 on 2026-10-19 14:37
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('projects', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ProjectDailyRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField(unique=True, verbose_name='日期')),
+                ('created_count', models.IntegerField(default=0, verbose_name='新建数')),
+                ('completed_count', models.IntegerField(default=0, verbose_name='完成数')),
+                ('cancelled_count', models.IntegerField(default=0, verbose_name='取消数')),
+                ('open_count', models.IntegerField(default=0, verbose_name='当日创建且仍未关闭数')),
+                ('completion_seconds_total', models.BigIntegerField(default=0, verbose_name='完成耗时合计(秒)')),
+                ('completion_histogram', models.JSONField(default=dict, verbose_name='完成耗时分布')),
+            ],
+            options={
+                'verbose_name': '每日项目统计',
+                'verbose_name_plural': '每日项目统计',
+                'ordering': ['-date'],
+            },
+        ),
+    ]
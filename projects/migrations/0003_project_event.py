@@ -0,0 +1,31 @@
+# Generated by Django 4.2.27 on 2026-10-19 14:37
+
+from django.db import migrations, models
+import django.db.models.deletion
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('projects', '0002_project_daily_rollup'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ProjectEvent',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('old_status', models.CharField(blank=True, choices=[('pending', '待处理'), ('in_progress', '处理中'), ('completed', '已完成'), ('cancelled', '已取消')], max_length=20, verbose_name='原状态')),
+                ('new_status', models.CharField(choices=[('pending', '待处理'), ('in_progress', '处理中'), ('completed', '已完成'), ('cancelled', '已取消')], max_length=20, verbose_name='新状态')),
+                ('created_at', models.DateTimeField(default=django.utils.timezone.now, verbose_name='发生时间')),
+                ('project', models.ForeignKey(db_constraint=False, on_delete=django.db.models.deletion.DO_NOTHING, related_name='events', to='projects.project', verbose_name='所属项目')),
+            ],
+            options={
+                'verbose_name': '项目事件',
+                'verbose_name_plural': '项目事件',
+                'ordering': ['-created_at'],
+                'indexes': [models.Index(fields=['project', 'created_at'], name='projectevent_project_time'), models.Index(fields=['created_at'], name='projectevent_time')],
+            },
+        ),
+    ]
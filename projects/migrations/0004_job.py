@@ -0,0 +1,42 @@
+# Generated by Django 4.2.27 on 2026-10-19 14:47
+
+from django.db import migrations, models
+import django.db.models.deletion
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('projects', '0003_project_event'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Job',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(max_length=50, verbose_name='类型')),
+                ('payload', models.JSONField(blank=True, default=dict, verbose_name='参数')),
+                ('status', models.CharField(choices=[('queued', '排队中'), ('running', '运行中'), ('succeeded', '已完成'), ('failed', '失败')], default='queued', max_length=20, verbose_name='状态')),
+                ('priority', models.IntegerField(default=0, verbose_name='优先级')),
+                ('attempts', models.PositiveIntegerField(default=0, verbose_name='已尝试次数')),
+                ('max_attempts', models.PositiveIntegerField(default=3, verbose_name='最大尝试次数')),
+                ('progress', models.PositiveSmallIntegerField(default=0, verbose_name='进度(%)')),
+                ('progress_message', models.CharField(blank=True, max_length=200, verbose_name='进度说明')),
+                ('error', models.TextField(blank=True, verbose_name='错误信息')),
+                ('worker', models.CharField(blank=True, max_length=100, verbose_name='工作进程')),
+                ('run_after', models.DateTimeField(default=django.utils.timezone.now, verbose_name='最早执行时间')),
+                ('created_at', models.DateTimeField(default=django.utils.timezone.now, verbose_name='创建时间')),
+                ('started_at', models.DateTimeField(blank=True, null=True, verbose_name='开始时间')),
+                ('finished_at', models.DateTimeField(blank=True, null=True, verbose_name='结束时间')),
+                ('project', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='jobs', to='projects.project', verbose_name='相关项目')),
+            ],
+            options={
+                'verbose_name': '后台任务',
+                'verbose_name_plural': '后台任务',
+                'ordering': ['-created_at'],
+                'indexes': [models.Index(fields=['status', '-priority', 'run_after'], name='job_queue')],
+            },
+        ),
+    ]
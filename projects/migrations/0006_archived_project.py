@@ -0,0 +1,49 @@
+# Generated by Django 4.2.27 on 2026-10-19 14:56
+
+from django.db import migrations, models
+import django.db.models.deletion
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('projects', '0005_admin_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ArchivedProject',
+            fields=[
+                ('id', models.BigIntegerField(primary_key=True, serialize=False)),
+                ('title', models.CharField(max_length=200, verbose_name='项目标题')),
+                ('description', models.TextField(blank=True, verbose_name='项目描述')),
+                ('status', models.CharField(choices=[('pending', '待处理'), ('in_progress', '处理中'), ('completed', '已完成'), ('cancelled', '已取消')], max_length=20, verbose_name='状态')),
+                ('created_at', models.DateTimeField(verbose_name='创建时间')),
+                ('updated_at', models.DateTimeField(verbose_name='更新时间')),
+                ('result', models.TextField(blank=True, verbose_name='处理结果')),
+                ('notes', models.TextField(blank=True, verbose_name='备注')),
+                ('archived_at', models.DateTimeField(default=django.utils.timezone.now, verbose_name='归档时间')),
+            ],
+            options={
+                'verbose_name': '已归档项目',
+                'verbose_name_plural': '已归档项目',
+                'ordering': ['-created_at'],
+            },
+        ),
+        migrations.CreateModel(
+            name='ArchivedTask',
+            fields=[
+                ('id', models.BigIntegerField(primary_key=True, serialize=False)),
+                ('title', models.CharField(max_length=200, verbose_name='任务标题')),
+                ('description', models.TextField(blank=True, verbose_name='任务描述')),
+                ('completed', models.BooleanField(default=False, verbose_name='是否完成')),
+                ('created_at', models.DateTimeField(verbose_name='创建时间')),
+                ('project', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='tasks', to='projects.archivedproject', verbose_name='所属项目')),
+            ],
+            options={
+                'verbose_name': '已归档任务',
+                'verbose_name_plural': '已归档任务',
+            },
+        ),
+    ]
@@ -0,0 +1,73 @@
+# Generated by Django 4.2.27 on 2026-10-19 15:20
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+SEGMENT_WIDTH = 6
+SEGMENT_LIMIT = 10 ** SEGMENT_WIDTH
+SEGMENT_STEP = 1000
+
+
+def assign_root_paths(apps, schema_editor):
+    """已有任务都成为各自项目的顶层任务，按创建顺序分配路径"""
+    db = schema_editor.connection.alias
+    for model_name in ('Task', 'ArchivedTask'):
+        model = apps.get_model('projects', model_name)
+        project_ids = model.objects.using(db).order_by().values_list('project_id', flat=True).distinct()
+        for project_id in project_ids.iterator():
+            tasks = list(model.objects.using(db).filter(project_id=project_id).order_by('created_at', 'pk').only('pk'))
+            step = min(SEGMENT_STEP, (SEGMENT_LIMIT - 1) // (len(tasks) + 1))
+            for index, task in enumerate(tasks):
+                task.path = f'{step * (index + 1):0{SEGMENT_WIDTH}d}'
+            model.objects.using(db).bulk_update(tasks, ['path'], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('projects', '0006_archived_project'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='task',
+            name='parent',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='children', to='projects.task', verbose_name='上级任务'),
+        ),
+        migrations.AddField(
+            model_name='task',
+            name='path',
+            field=models.CharField(default='', editable=False, max_length=252, verbose_name='树路径'),
+            preserve_default=False,
+        ),
+        migrations.AddField(
+            model_name='task',
+            name='depth',
+            field=models.PositiveSmallIntegerField(default=0, editable=False, verbose_name='层级'),
+        ),
+        migrations.AddField(
+            model_name='archivedtask',
+            name='parent',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='children', to='projects.archivedtask', verbose_name='上级任务'),
+        ),
+        migrations.AddField(
+            model_name='archivedtask',
+            name='path',
+            field=models.CharField(default='', editable=False, max_length=252, verbose_name='树路径'),
+            preserve_default=False,
+        ),
+        migrations.AddField(
+            model_name='archivedtask',
+            name='depth',
+            field=models.PositiveSmallIntegerField(default=0, editable=False, verbose_name='层级'),
+        ),
+        migrations.RunPython(assign_root_paths, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='task',
+            index=models.Index(fields=['project', 'path'], name='task_tree'),
+        ),
+        migrations.AddIndex(
+            model_name='archivedtask',
+            index=models.Index(fields=['project', 'path'], name='archivedtask_tree'),
+        ),
+    ]
@@ -0,0 +1,47 @@
+# Generated by Django 4.2.27 on 2026-10-19 15:30
+
+from django.db import migrations, models
+
+ACTIVE_STATUSES = ('queued', 'running')
+
+
+def fail_duplicate_jobs(apps, schema_editor):
+    """添加约束前，把重复入队的同类活跃任务（保留最早的一个）标记为失败"""
+    Job = apps.get_model('projects', 'Job')
+    db = schema_editor.connection.alias
+    seen = set()
+    duplicates = []
+    active = Job.objects.using(db).filter(
+        kind__in=('delete_project', 'rebuild_project_metrics'), status__in=ACTIVE_STATUSES
+    ).order_by('pk')
+    for pk, kind, project_id in active.values_list('pk', 'kind', 'project_id'):
+        if kind == 'delete_project':
+            if project_id is None:
+                # 项目已删除（外键为 NULL）的任务不受唯一约束限制
+                continue
+            key = (kind, project_id)
+        else:
+            key = (kind,)
+        if key in seen:
+            duplicates.append(pk)
+        seen.add(key)
+    Job.objects.using(db).filter(pk__in=duplicates).update(status='failed', error='重复入队的任务')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('projects', '0007_task_tree'),
+    ]
+
+    operations = [
+        migrations.RunPython(fail_duplicate_jobs, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='job',
+            constraint=models.UniqueConstraint(condition=models.Q(('kind', 'delete_project'), ('status__in', ('queued', 'running'))), fields=('kind', 'project'), name='job_one_active_delete'),
+        ),
+        migrations.AddConstraint(
+            model_name='job',
+            constraint=models.UniqueConstraint(condition=models.Q(('kind', 'rebuild_project_metrics'), ('status__in', ('queued', 'running'))), fields=('kind',), name='job_one_active_rebuild'),
+        ),
+    ]
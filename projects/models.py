@@ -1,6 +1,18 @@
-from django.db import models
+import math
+from collections import Counter, defaultdict
+
+from django.core.exceptions import ValidationError
+from django.db import models, router, transaction
+from django.db.models import Case, Count, F, Max, OuterRef, Subquery, Value, When
+from django.db.models.functions import Coalesce, Concat, Substr
+from django.db.models.lookups import Exact
 from django.utils import timezone
 
+from . import tasktree
+
+OPEN_STATUSES = ('pending', 'in_progress')
+FINISHED_STATUSES = ('completed', 'cancelled')
+
 
 class Project(models.Model):
     STATUS_CHOICES = [
@@ -23,25 +35,503 @@ class Project(models.Model):
     result = models.TextField(verbose_name='处理结果', blank=True)
     notes = models.TextField(verbose_name='备注', blank=True)
 
+    is_archived = False
+
     class Meta:
         verbose_name = '项目'
         verbose_name_plural = '项目'
         ordering = ['-created_at']
+        indexes = [
+            # 默认排序与后台 date_hierarchy 使用
+            models.Index(fields=['-created_at'], name='project_created'),
+            models.Index(fields=['status', '-created_at'], name='project_status_created'),
+        ]
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        # 记录载入时的状态，保存时据此判断是否发生状态变化；新建对象为 None
+        self._loaded_status = None
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._loaded_status = instance.__dict__.get('status')
+        return instance
+
+    def refresh_from_db(self, using=None, fields=None):
+        super().refresh_from_db(using=using, fields=fields)
+        if fields is None or 'status' in fields:
+            self._loaded_status = self.status
 
     def __str__(self):
         return self.title
 
+    def save(self, *args, **kwargs):
+        # 项目与其统计汇总在同一事务中写入（见 signals.py）
+        using = kwargs.get('using') or router.db_for_write(type(self), instance=self)
+        with transaction.atomic(using=using):
+            super().save(*args, **kwargs)
+        self._loaded_status = self.status
+
+
+class TaskQuerySet(models.QuerySet):
+    def subtree(self, task):
+        """task 及其全部后代，按先序排列；一次 (project, path) 索引范围查询"""
+        low, high = tasktree.subtree_range(task.path)
+        return self.filter(project_id=task.project_id, path__gte=low, path__lte=high).order_by('path')
+
+    def children_of(self, project_id, parent=None):
+        """直接子任务，按兄弟顺序排列；parent 为 None 时为顶层任务"""
+        return self.filter(project_id=project_id, parent=parent).order_by('path')
+
+    def with_rollup(self):
+        """
+        附加子树（含自身）的任务数 subtree_count 与已完成数 subtree_completed
+
+        在数据库中用关联子查询计算，每个子查询同样是 (project, path) 索引上的范围扫描。
+        """
+        subtree = self.model._default_manager.filter(
+            project_id=OuterRef('project_id'),
+            path__gte=OuterRef('path'),
+            path__lte=Concat(
+                OuterRef('path'), Value(tasktree.SUBTREE_UPPER_SUFFIX), output_field=models.CharField()
+            ),
+        ).order_by().values('project_id')
+        return self.annotate(
+            subtree_count=Coalesce(Subquery(subtree.annotate(count=Count('pk')).values('count')), 0),
+            subtree_completed=Coalesce(
+                Subquery(subtree.filter(completed=True).annotate(count=Count('pk')).values('count')), 0
+            ),
+        )
+
+
+class TaskManager(models.Manager.from_queryset(TaskQuerySet)):
+    """
+    任务树的修改
+
+    同一项目内的树修改先锁定项目行，按顺序执行，避免并发插入得到相同的路径。
+    """
+
+    def _lock_project(self, project_id):
+        list(Project.objects.using(self.db).select_for_update().filter(pk=project_id).values_list('pk'))
+
+    def _child_keys(self, project_id, parent, exclude=None):
+        children = self.children_of(project_id, parent)
+        if exclude is not None:
+            children = children.exclude(pk=exclude.pk)
+        return [tasktree.last_key(path) for path in children.values_list('path', flat=True)]
+
+    def _rebalance(self, project_id, parent, extra=0):
+        """重新均匀分配 parent 下各子任务的段，并为 extra 个新任务留出位置；一条 UPDATE 改写全部后代"""
+        prefix = parent.path if parent else ''
+        old_keys = self._child_keys(project_id, parent)
+        new_keys = tasktree.spaced_keys(len(old_keys) + extra)
+        if new_keys is None:
+            raise ValueError('同一上级任务下的子任务过多')
+        start = len(prefix) + 1
+        width = tasktree.SEGMENT_WIDTH
+        mapping = [
+            When(Exact(Substr('path', start, width), tasktree.segment(old)), then=Value(tasktree.segment(new)))
+            for old, new in zip(old_keys, new_keys) if old != new
+        ]
+        if not mapping:
+            return
+        low, high = tasktree.subtree_range(prefix)
+        self.filter(project_id=project_id, path__gte=low, path__lte=high, depth__gt=parent.depth if parent else -1).update(
+            path=Concat(
+                Value(prefix),
+                Case(*mapping, default=Substr('path', start, width)),
+                Substr('path', start + width),
+                output_field=models.CharField(),
+            )
+        )
+
+    def _append_paths(self, project_id, parent, count):
+        last = self.children_of(project_id, parent).aggregate(last=Max('path'))['last']
+        keys = tasktree.spaced_keys(count, tasktree.last_key(last) if last else 0)
+        if keys is None:
+            self._rebalance(project_id, parent, extra=count)
+            keys = tasktree.spaced_keys(count, max(self._child_keys(project_id, parent), default=0))
+        prefix = parent.path if parent else ''
+        return [prefix + tasktree.segment(key) for key in keys]
+
+    def assign_paths(self, tasks):
+        """为新任务分配路径：按 (项目, 上级任务) 分组依次追加到兄弟任务之后，需在事务中调用"""
+        parent_ids = {task.parent_id for task in tasks if task.parent_id}
+        parents = {parent.pk: parent for parent in self.filter(pk__in=parent_ids).only('project_id', 'path', 'depth')}
+        groups = {}
+        for task in tasks:
+            parent = parents.get(task.parent_id)
+            if task.parent_id and parent is None:
+                raise ValueError('上级任务不存在')
+            if parent is not None and parent.project_id != task.project_id:
+                raise ValueError('上级任务必须属于同一项目')
+            if parent is not None and parent.depth + 1 >= tasktree.MAX_DEPTH:
+                raise ValueError(f'任务层级不能超过 {tasktree.MAX_DEPTH} 层')
+            groups.setdefault((task.project_id, task.parent_id), []).append(task)
+
+        for project_id in sorted({project_id for project_id, _ in groups}):
+            self._lock_project(project_id)
+        for (project_id, parent_id), members in groups.items():
+            parent = parents.get(parent_id)
+            for task, path in zip(members, self._append_paths(project_id, parent, len(members))):
+                task.path = path
+                task.depth = tasktree.depth_of(path)
+
+    def bulk_create(self, objs, *args, **kwargs):
+        objs = list(objs)
+        if all(obj.path for obj in objs):
+            return super().bulk_create(objs, *args, **kwargs)
+        with transaction.atomic(using=self.db):
+            self.assign_paths([obj for obj in objs if not obj.path])
+            return super().bulk_create(objs, *args, **kwargs)
+
+    def move(self, task, parent=None, position=None):
+        """
+        把任务连同子树移到 parent 下的第 position 位（从 0 开始，默认最后），parent 为 None 时移到顶层
+
+        只改写被移动子树的路径与层级（一条 UPDATE）；目标位置没有空隙时先重新分配该组兄弟的段。
+        """
+        with transaction.atomic(using=self.db):
+            self._lock_project(task.project_id)
+            task.refresh_from_db(fields=['path', 'depth', 'parent'])
+            if parent is not None:
+                parent.refresh_from_db(fields=['project', 'path', 'depth'])
+                if parent.project_id != task.project_id:
+                    raise ValueError('上级任务必须属于同一项目')
+                if parent.path.startswith(task.path):
+                    raise ValueError('不能把任务移到它自己的子树下')
+            new_depth = parent.depth + 1 if parent else 0
+            deepest = self.subtree(task).aggregate(deepest=Max('depth'))['deepest']
+            if deepest - task.depth + new_depth >= tasktree.MAX_DEPTH:
+                raise ValueError(f'任务层级不能超过 {tasktree.MAX_DEPTH} 层')
+
+            siblings = self._child_keys(task.project_id, parent, exclude=task)
+            position = len(siblings) if position is None else max(0, min(position, len(siblings)))
+            key = tasktree.key_between(
+                siblings[position - 1] if position else None,
+                siblings[position] if position < len(siblings) else None,
+            )
+            if key is None:
+                self._rebalance(task.project_id, parent, extra=1)
+                task.refresh_from_db(fields=['path'])
+                siblings = self._child_keys(task.project_id, parent, exclude=task)
+                key = tasktree.key_between(
+                    siblings[position - 1] if position else None,
+                    siblings[position] if position < len(siblings) else None,
+                )
+                if key is None:
+                    raise ValueError('同一上级任务下的子任务过多')
+
+            new_path = (parent.path if parent else '') + tasktree.segment(key)
+            if new_path != task.path:
+                low, high = tasktree.subtree_range(task.path)
+                self.filter(project_id=task.project_id, path__gte=low, path__lte=high).update(
+                    path=Concat(Value(new_path), Substr('path', len(task.path) + 1), output_field=models.CharField()),
+                    depth=F('depth') + (new_depth - task.depth),
+                )
+            if task.parent_id != (parent.pk if parent else None):
+                self.filter(pk=task.pk).update(parent=parent)
+            task.parent, task.path, task.depth = parent, new_path, new_depth
+        return task
+
 
 class Task(models.Model):
     project = models.ForeignKey(Project, related_name='tasks', on_delete=models.CASCADE, verbose_name='所属项目')
+    parent = models.ForeignKey(
+        'self', related_name='children', null=True, blank=True, on_delete=models.CASCADE, verbose_name='上级任务'
+    )
     title = models.CharField(max_length=200, verbose_name='任务标题')
     description = models.TextField(verbose_name='任务描述', blank=True)
     completed = models.BooleanField(default=False, verbose_name='是否完成')
     created_at = models.DateTimeField(default=timezone.now, verbose_name='创建时间')
+    # 物化路径与层级（见 tasktree.py），新建时自动分配，移动请使用 Task.objects.move()
+    path = models.CharField(max_length=tasktree.PATH_MAX_LENGTH, editable=False, verbose_name='树路径')
+    depth = models.PositiveSmallIntegerField(default=0, editable=False, verbose_name='层级')
+
+    objects = TaskManager()
 
     class Meta:
         verbose_name = '任务'
         verbose_name_plural = '任务'
+        indexes = [
+            models.Index(fields=['created_at'], name='task_created'),
+            # 整棵树或子树的查询均为此索引上的范围扫描
+            models.Index(fields=['project', 'path'], name='task_tree'),
+        ]
+
+    def __str__(self):
+        return f"{self.project.title} - {self.title}"
+
+    def clean(self):
+        if self.parent_id and self.project_id and self.parent.project_id != self.project_id:
+            raise ValidationError({'parent': '上级任务必须属于同一项目'})
+
+    def save(self, *args, **kwargs):
+        if self.path:
+            super().save(*args, **kwargs)
+            return
+        using = kwargs.get('using') or router.db_for_write(type(self), instance=self)
+        with transaction.atomic(using=using):
+            Task.objects.db_manager(using).assign_paths([self])
+            super().save(*args, **kwargs)
+
+
+class ProjectEventManager(models.Manager):
+    def archive_before(self, cutoff):
+        """返回早于 cutoff 的事件，按时间排序，供归档使用"""
+        return self.filter(created_at__lt=cutoff).order_by('created_at', 'pk')
+
+
+class ProjectEvent(models.Model):
+    """
+    项目状态变化日志（只追加）
+
+    与项目的修改在同一事务中写入。项目删除或归档后日志仍然保留，因此外键不建数据库约束。
+    """
+    project = models.ForeignKey(
+        Project,
+        related_name='events',
+        on_delete=models.DO_NOTHING,
+        db_constraint=False,
+        verbose_name='所属项目',
+    )
+    old_status = models.CharField(max_length=20, choices=Project.STATUS_CHOICES, blank=True, verbose_name='原状态')
+    new_status = models.CharField(max_length=20, choices=Project.STATUS_CHOICES, verbose_name='新状态')
+    created_at = models.DateTimeField(default=timezone.now, verbose_name='发生时间')
+
+    objects = ProjectEventManager()
+
+    class Meta:
+        verbose_name = '项目事件'
+        verbose_name_plural = '项目事件'
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['project', 'created_at'], name='projectevent_project_time'),
+            models.Index(fields=['created_at'], name='projectevent_time'),
+        ]
+
+    def __str__(self):
+        return f"{self.project_id}: {self.old_status or '-'} -> {self.new_status}"
+
+    def save(self, *args, **kwargs):
+        if not self._state.adding:
+            raise ValueError('项目事件只能追加，不能修改')
+        super().save(*args, **kwargs)
+
+    def delete(self, *args, **kwargs):
+        raise ValueError('项目事件只能追加，不能删除；请使用 archive_project_events 归档')
+
+
+def duration_bucket(seconds):
+    """完成耗时所属的直方图桶：以分钟为单位按 2 的幂分桶"""
+    minutes = max(seconds, 0) / 60
+    if minutes < 1:
+        return 0
+    return int(math.log2(minutes)) + 1
+
+
+def bucket_midpoint_seconds(bucket):
+    """直方图桶的代表值（秒），用于估算中位数"""
+    if bucket == 0:
+        return 30
+    return 60 * 2 ** (bucket - 0.5)
+
+
+class ProjectDailyRollupManager(models.Manager):
+    def record_transition(self, project, old_status, new_status, when=None):
+        """记录单个项目的一次状态变化"""
+        self.record_transitions([(project, old_status, new_status, when)])
+
+    def record_transitions(self, transitions):
+        """
+        按状态变化增量更新汇总，同一天的变化合并为一次更新
+
+        :param transitions: (project, old_status, new_status, when) 的可迭代对象；
+            新建项目的 old_status 为 None，删除项目的 new_status 为 None，
+            when 为变化发生的时间，None 表示当前时间
+        """
+        now = timezone.now()
+        deltas = defaultdict(Counter)
+        histograms = defaultdict(Counter)
+
+        for project, old_status, new_status, when in transitions:
+            when = when or now
+            close_date = timezone.localdate(when)
+            created_date = timezone.localdate(project.created_at)
+            was_open = old_status in OPEN_STATUSES
+            is_open = new_status in OPEN_STATUSES
+
+            if old_status is None:
+                deltas[created_date]['created_count'] += 1
+            if was_open != is_open:
+                deltas[created_date]['open_count'] += 1 if is_open else -1
+            if new_status == old_status:
+                continue
+            if new_status == 'cancelled':
+                deltas[close_date]['cancelled_count'] += 1
+            elif new_status == 'completed':
+                seconds = max(int((when - project.created_at).total_seconds()), 0)
+                deltas[close_date]['completed_count'] += 1
+                deltas[close_date]['completion_seconds_total'] += seconds
+                histograms[close_date][str(duration_bucket(seconds))] += 1
+
+        for date, counter in deltas.items():
+            updates = {field: F(field) + delta for field, delta in counter.items() if delta}
+            self.get_or_create(date=date)
+            if updates:
+                self.filter(date=date).update(**updates)
+
+        # JSON 字段无法用 F 表达式累加，锁定当天的行后合并
+        for date, histogram in histograms.items():
+            rollup = self.select_for_update().get(date=date)
+            for bucket, count in histogram.items():
+                rollup.completion_histogram[bucket] = rollup.completion_histogram.get(bucket, 0) + count
+            rollup.save(update_fields=['completion_histogram'])
+
+
+class ProjectDailyRollup(models.Model):
+    """
+    按天预先汇总的项目指标
+
+    由项目的状态变化增量维护，仪表盘只读取此表，查询量与天数成正比而与项目数无关。
+    created_count / open_count 归属于项目的创建日期；completed / cancelled 归属于关闭日期。
+    """
+    date = models.DateField(unique=True, verbose_name='日期')
+    created_count = models.IntegerField(default=0, verbose_name='新建数')
+    completed_count = models.IntegerField(default=0, verbose_name='完成数')
+    cancelled_count = models.IntegerField(default=0, verbose_name='取消数')
+    open_count = models.IntegerField(default=0, verbose_name='当日创建且仍未关闭数')
+    completion_seconds_total = models.BigIntegerField(default=0, verbose_name='完成耗时合计(秒)')
+    completion_histogram = models.JSONField(default=dict, verbose_name='完成耗时分布')
+
+    objects = ProjectDailyRollupManager()
+
+    class Meta:
+        verbose_name = '每日项目统计'
+        verbose_name_plural = '每日项目统计'
+        ordering = ['-date']
 
     def __str__(self):
-        return f"{self.project.title} - {self.title}"
\ No newline at end of file
+        return str(self.date)
+
+
+class Job(models.Model):
+    """
+    数据库队列中的后台任务
+
+    由 run_jobs 管理命令启动的工作进程领取并执行，见 jobs.py。
+    """
+    STATUS_CHOICES = [
+        ('queued', '排队中'),
+        ('running', '运行中'),
+        ('succeeded', '已完成'),
+        ('failed', '失败'),
+    ]
+    ACTIVE_STATUSES = ('queued', 'running')
+
+    kind = models.CharField(max_length=50, verbose_name='类型')
+    payload = models.JSONField(default=dict, blank=True, verbose_name='参数')
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='queued', verbose_name='状态')
+    priority = models.IntegerField(default=0, verbose_name='优先级')
+    project = models.ForeignKey(
+        Project,
+        related_name='jobs',
+        null=True,
+        blank=True,
+        on_delete=models.SET_NULL,
+        verbose_name='相关项目',
+    )
+    attempts = models.PositiveIntegerField(default=0, verbose_name='已尝试次数')
+    max_attempts = models.PositiveIntegerField(default=3, verbose_name='最大尝试次数')
+    progress = models.PositiveSmallIntegerField(default=0, verbose_name='进度(%)')
+    progress_message = models.CharField(max_length=200, blank=True, verbose_name='进度说明')
+    error = models.TextField(blank=True, verbose_name='错误信息')
+    worker = models.CharField(max_length=100, blank=True, verbose_name='工作进程')
+    run_after = models.DateTimeField(default=timezone.now, verbose_name='最早执行时间')
+    created_at = models.DateTimeField(default=timezone.now, verbose_name='创建时间')
+    started_at = models.DateTimeField(null=True, blank=True, verbose_name='开始时间')
+    finished_at = models.DateTimeField(null=True, blank=True, verbose_name='结束时间')
+
+    class Meta:
+        verbose_name = '后台任务'
+        verbose_name_plural = '后台任务'
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['status', '-priority', 'run_after'], name='job_queue'),
+        ]
+        constraints = [
+            # 同一项目的删除任务、统计重建任务各自最多只有一个排队或运行中，避免并发请求重复入队
+            models.UniqueConstraint(
+                fields=['kind', 'project'],
+                condition=models.Q(kind='delete_project', status__in=('queued', 'running')),
+                name='job_one_active_delete',
+            ),
+            models.UniqueConstraint(
+                fields=['kind'],
+                condition=models.Q(kind='rebuild_project_metrics', status__in=('queued', 'running')),
+                name='job_one_active_rebuild',
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.kind} #{self.pk}"
+
+    @property
+    def is_active(self):
+        return self.status in self.ACTIVE_STATUSES
+
+
+class ArchivedProject(models.Model):
+    """
+    已归档的项目（冷数据）
+
+    完成或取消较久的项目连同任务从热表移到这里（见 archive.py），保留原 ID，详情链接不变。
+    """
+    id = models.BigIntegerField(primary_key=True)
+    title = models.CharField(max_length=200, verbose_name='项目标题')
+    description = models.TextField(verbose_name='项目描述', blank=True)
+    status = models.CharField(max_length=20, choices=Project.STATUS_CHOICES, verbose_name='状态')
+    created_at = models.DateTimeField(verbose_name='创建时间')
+    updated_at = models.DateTimeField(verbose_name='更新时间')
+    result = models.TextField(verbose_name='处理结果', blank=True)
+    notes = models.TextField(verbose_name='备注', blank=True)
+    archived_at = models.DateTimeField(default=timezone.now, verbose_name='归档时间')
+
+    is_archived = True
+
+    class Meta:
+        verbose_name = '已归档项目'
+        verbose_name_plural = '已归档项目'
+        ordering = ['-created_at']
+
+    def __str__(self):
+        return self.title
+
+
+class ArchivedTask(models.Model):
+    id = models.BigIntegerField(primary_key=True)
+    project = models.ForeignKey(
+        ArchivedProject, related_name='tasks', on_delete=models.CASCADE, verbose_name='所属项目'
+    )
+    parent = models.ForeignKey(
+        'self', related_name='children', null=True, blank=True, on_delete=models.CASCADE, verbose_name='上级任务'
+    )
+    title = models.CharField(max_length=200, verbose_name='任务标题')
+    description = models.TextField(verbose_name='任务描述', blank=True)
+    completed = models.BooleanField(default=False, verbose_name='是否完成')
+    created_at = models.DateTimeField(verbose_name='创建时间')
+    path = models.CharField(max_length=tasktree.PATH_MAX_LENGTH, editable=False, verbose_name='树路径')
+    depth = models.PositiveSmallIntegerField(default=0, editable=False, verbose_name='层级')
+
+    objects = TaskQuerySet.as_manager()
+
+    class Meta:
+        verbose_name = '已归档任务'
+        verbose_name_plural = '已归档任务'
+        indexes = [
+            models.Index(fields=['project', 'path'], name='archivedtask_tree'),
+        ]
+
+    def __str__(self):
+        return self.title
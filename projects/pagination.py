@@ -0,0 +1,46 @@
+"""
+大表分页
+
+精确的 COUNT(*) 在 PostgreSQL 上需要扫描整个表（或索引），行数达到百万级时是后台列表页最慢的查询。
+这里改用查询规划器的估算行数，数据量小或数据库不支持估算时仍使用精确计数。
+"""
+
+import json
+
+from django.conf import settings
+from django.core.paginator import Paginator
+from django.db import connections
+from django.utils.functional import cached_property
+
+
+def estimate_count(queryset):
+    """
+    用 EXPLAIN 返回的估算行数代替 COUNT(*)
+    :return: 估算行数；非 PostgreSQL 数据库返回 None
+    """
+    connection = connections[queryset.db]
+    if connection.vendor != 'postgresql':
+        return None
+    sql, params = queryset.order_by().query.sql_with_params()
+    with connection.cursor() as cursor:
+        cursor.execute(f'EXPLAIN (FORMAT JSON) {sql}', params)
+        plan = cursor.fetchone()[0]
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return int(plan[0]['Plan']['Plan Rows'])
+
+
+class EstimatedCountPaginator(Paginator):
+    """
+    估算总数的分页器
+
+    估算值不低于 ADMIN_ESTIMATED_COUNT_THRESHOLD 时直接使用，否则执行精确计数。
+    估算存在误差，最后几页可能为空或无法翻到，对浏览大表而言可以接受。
+    """
+
+    @cached_property
+    def count(self):
+        estimate = estimate_count(self.object_list) if hasattr(self.object_list, 'query') else None
+        if estimate is not None and estimate >= settings.ADMIN_ESTIMATED_COUNT_THRESHOLD:
+            return estimate
+        return super().count
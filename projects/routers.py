@@ -0,0 +1,82 @@
+"""
+读写分离的数据库路由
+
+只读视图通过 ``read_from_replica`` 装饰器声明可以从只读副本读取；
+其余所有读写都走主库（default）。副本别名由 settings.REPLICA_DATABASE_ALIAS
+指定，只有在配置了 DATABASE_REPLICA_URL 时才会存在。
+"""
+
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import wraps
+
+from django.conf import settings
+
+DEFAULT_DB_ALIAS = 'default'
+
+# 写请求后设置此 cookie，期间该客户端的读取固定在主库，保证“写后读”一致
+PRIMARY_PIN_COOKIE = 'db_pin_primary'
+
+_use_replica = ContextVar('use_replica', default=False)
+
+
+def get_replica_alias():
+    """返回副本数据库别名，未配置副本时返回 None"""
+    alias = getattr(settings, 'REPLICA_DATABASE_ALIAS', None)
+    if alias and alias != DEFAULT_DB_ALIAS:
+        return alias
+    return None
+
+
+@contextmanager
+def replica_reads():
+    """在此上下文内的读取路由到副本（若已配置）"""
+    token = _use_replica.set(True)
+    try:
+        yield
+    finally:
+        _use_replica.reset(token)
+
+
+def read_from_replica(view_func):
+    """
+    视图装饰器：GET/HEAD 请求从副本读取
+
+    刚发生过写操作的客户端（带有 PRIMARY_PIN_COOKIE）仍读取主库。
+    """
+    @wraps(view_func)
+    def wrapper(request, *args, **kwargs):
+        if request.method not in ('GET', 'HEAD') or PRIMARY_PIN_COOKIE in request.COOKIES:
+            return view_func(request, *args, **kwargs)
+        with replica_reads():
+            response = view_func(request, *args, **kwargs)
+            # TemplateResponse 延迟渲染，模板中的查询也需在上下文内执行
+            if hasattr(response, 'render') and not response.is_rendered:
+                response.render()
+            return response
+    return wrapper
+
+
+class ReplicaRouter:
+    # 只有项目数据走副本；会话、认证等表始终读主库
+    replica_app_labels = {'projects'}
+
+    def db_for_read(self, model, **hints):
+        replica = get_replica_alias()
+        if replica and _use_replica.get() and model._meta.app_label in self.replica_app_labels:
+            return replica
+        return DEFAULT_DB_ALIAS
+
+    def db_for_write(self, model, **hints):
+        # 同一上下文中一旦发生写入，后续读取都回到主库
+        if _use_replica.get():
+            _use_replica.set(False)
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # 副本与主库数据相同，允许跨别名的关联
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        # 副本的表结构由复制同步，只在主库执行迁移
+        return db == DEFAULT_DB_ALIAS
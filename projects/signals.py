@@ -0,0 +1,21 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .models import Project, ProjectDailyRollup, ProjectEvent
+
+
+@receiver(post_save, sender=Project)
+def update_rollup_on_save(sender, instance, created, raw=False, **kwargs):
+    """项目新建或状态变化时追加事件日志并增量更新每日汇总"""
+    if raw:
+        return
+    old_status = None if created else instance._loaded_status
+    if created or old_status != instance.status:
+        ProjectEvent.objects.create(project=instance, old_status=old_status or '', new_status=instance.status)
+        ProjectDailyRollup.objects.record_transition(instance, old_status, instance.status)
+
+
+@receiver(post_delete, sender=Project)
+def update_rollup_on_delete(sender, instance, **kwargs):
+    """删除未关闭的项目时从积压中扣除"""
+    ProjectDailyRollup.objects.record_transition(instance, instance._loaded_status or instance.status, None)
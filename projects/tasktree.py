@@ -0,0 +1,65 @@
+"""
+任务树的物化路径
+
+每个任务的 path 由各级祖先的段依次拼接而成，每段为 SEGMENT_WIDTH 位十进制数字，表示在兄弟任务中的顺序。
+按 path 排序即为整棵树的先序遍历，某个任务的整棵子树是 (project, path) 索引上的一段连续范围，
+一次查询即可取出。段之间预留间隔，插入或移动时只需改写被移动的子树；间隔用尽时重新均匀分配一组兄弟的段。
+
+路径只包含数字，任何排序规则下字符串比较都与逐位比较一致，因此范围查询可以使用普通 B 树索引。
+"""
+
+SEGMENT_WIDTH = 6
+SEGMENT_LIMIT = 10 ** SEGMENT_WIDTH
+# 追加时相邻段的间隔，留出在中间插入的空间
+SEGMENT_STEP = 1000
+PATH_MAX_LENGTH = 252
+MAX_DEPTH = PATH_MAX_LENGTH // SEGMENT_WIDTH
+
+# 任何以 prefix 开头的路径都不大于 prefix + SUBTREE_UPPER_SUFFIX
+SUBTREE_UPPER_SUFFIX = '9' * PATH_MAX_LENGTH
+
+
+def segment(key):
+    return f'{key:0{SEGMENT_WIDTH}d}'
+
+
+def last_key(path):
+    """路径最后一段的数值"""
+    return int(path[-SEGMENT_WIDTH:])
+
+
+def parent_path(path):
+    return path[:-SEGMENT_WIDTH]
+
+
+def depth_of(path):
+    return len(path) // SEGMENT_WIDTH - 1
+
+
+def subtree_range(path):
+    """子树（含自身）路径的闭区间"""
+    return path, path + SUBTREE_UPPER_SUFFIX
+
+
+def key_between(left=None, right=None):
+    """
+    返回严格位于 left 与 right 之间的段值，没有空隙时返回 None
+    :param left: 前一个兄弟的段值，None 表示插在最前
+    :param right: 后一个兄弟的段值，None 表示追加到最后
+    """
+    low = 0 if left is None else left
+    if right is None:
+        if low + SEGMENT_STEP < SEGMENT_LIMIT:
+            return low + SEGMENT_STEP
+        right = SEGMENT_LIMIT
+    if right - low < 2:
+        return None
+    return (low + right) // 2
+
+
+def spaced_keys(count, start=0):
+    """在 start 之后为 count 个兄弟分配间隔尽量大的段值，放不下时返回 None"""
+    step = min(SEGMENT_STEP, (SEGMENT_LIMIT - 1 - start) // (count + 1))
+    if step < 1:
+        return None
+    return [start + step * (index + 1) for index in range(count)]
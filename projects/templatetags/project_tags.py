@@ -0,0 +1,52 @@
+from functools import lru_cache
+
+from django import template
+from django.conf import settings
+from django.contrib.staticfiles import finders
+from django.utils.safestring import mark_safe
+
+from ..models import Project
+
+register = template.Library()
+
+STATUS_LABELS = dict(Project.STATUS_CHOICES)
+
+
+@register.filter
+def duration(seconds):
+    """把秒数格式化为易读的时长"""
+    if seconds is None:
+        return '-'
+    seconds = int(seconds)
+    if seconds < 3600:
+        return f'{seconds // 60} 分钟'
+    if seconds < 86400:
+        return f'{seconds / 3600:.1f} 小时'
+    return f'{seconds / 86400:.1f} 天'
+
+
+@register.filter
+def status_label(status):
+    """状态值对应的显示名称；列表行为 values() 字典（含归档结果）时也可使用"""
+    return STATUS_LABELS.get(status, status)
+
+
+@register.simple_tag
+def critical_css_enabled():
+    """是否在页面中内联首屏关键样式（settings.CRITICAL_CSS_INLINE）"""
+    return getattr(settings, 'CRITICAL_CSS_INLINE', False)
+
+
+@lru_cache(maxsize=None)
+def _read_static(path):
+    absolute_path = finders.find(path)
+    if absolute_path is None:
+        raise template.TemplateSyntaxError(f'找不到静态文件: {path}')
+    with open(absolute_path, 'r', encoding='utf-8') as file:
+        return file.read()
+
+
+@register.simple_tag
+def inline_static(path):
+    """把静态文件内容直接输出到页面中（用于关键样式）"""
+    return mark_safe(_read_static(path))
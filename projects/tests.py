@@ -1,3 +1,717 @@
-from django.test import TestCase
+import asyncio
+import gzip
+import io
+import json
+import os
+import tempfile
+from datetime import timedelta
+from unittest import mock
 
-# Create your tests here.
+from asgiref.sync import async_to_sync, sync_to_async
+from django.core.files.storage import default_storage
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.contrib.sessions.models import Session
+from django.core.management import call_command
+from django.db import DatabaseError, IntegrityError, OperationalError, connection, transaction
+from django.test import SimpleTestCase, TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from . import jobs
+from .archive import archive_projects, restore_project
+from .bulk import import_projects, iter_records
+from .jobs import claim_next, enqueue, execute, report_progress, run_pending
+from .live import ChangeFeed, stream_changes
+from .metrics import rebuild_rollups
+from .models import ArchivedProject, ArchivedTask, Job, Project, ProjectDailyRollup, ProjectEvent, Task
+from .pagination import EstimatedCountPaginator, estimate_count
+from .routers import PRIMARY_PIN_COOKIE, ReplicaRouter, replica_reads
+
+# 测试不运行 collectstatic，渲染页面的测试使用不依赖哈希清单的静态文件存储
+STATIC_STORAGES = {
+    **settings.STORAGES,
+    'staticfiles': {'BACKEND': 'django.contrib.staticfiles.storage.StaticFilesStorage'},
+}
+
+
+@override_settings(REPLICA_DATABASE_ALIAS=None, STORAGES=STATIC_STORAGES)
+class BulkImportExportTests(TestCase):
+    def test_import_csv_dedupes_against_existing_and_imported_titles(self):
+        Project.objects.create(title='已存在')
+        data = io.StringIO(
+            'title,description,status\n'
+            '已存在,重复,pending\n'
+            '新项目A,描述,completed\n'
+            '新项目A,同块重复,pending\n'
+            ',缺少标题,pending\n'
+            '新项目B,,bogus\n'
+        )
+
+        summary = import_projects(iter_records(data, 'csv'), chunk_size=2)
+
+        self.assertEqual(summary, {'created': 2, 'skipped': 2, 'invalid': 1, 'errors': ['第 5 行: 缺少标题']})
+        self.assertEqual(Project.objects.get(title='新项目A').status, 'completed')
+        self.assertEqual(Project.objects.get(title='新项目B').status, 'pending')
+
+    def test_import_ndjson_reports_malformed_and_non_object_lines(self):
+        data = io.StringIO(
+            '{"title": "正常1"}\n'
+            '{"title": "缺少括号"\n'
+            '\n'
+            '[1, 2]\n'
+            '{"title": "正常2"}\n'
+        )
+
+        summary = import_projects(iter_records(data, 'ndjson'), chunk_size=2)
+
+        self.assertEqual((summary['created'], summary['invalid']), (2, 2))
+        self.assertEqual(len(summary['errors']), 2)
+        self.assertTrue(summary['errors'][0].startswith('第 2 行: JSON 格式错误'))
+        self.assertEqual(summary['errors'][1], '第 4 行: 不是 JSON 对象')
+        self.assertEqual(Project.objects.count(), 2)
+
+    def test_import_ndjson_reports_records_with_invalid_values(self):
+        records = [
+            {'title': 123},
+            {'title': '状态为列表', 'status': ['a']},
+            {'title': '时间为数字', 'created_at': 5},
+            {'title': '日期不存在', 'created_at': '2024-13-01T00:00:00'},
+            {'title': '长' * 201},
+            {'title': '长' * 200, 'status': 'completed', 'created_at': '2024-01-01T08:00:00'},
+        ]
+        data = io.StringIO(''.join(json.dumps(record, ensure_ascii=False) + '\n' for record in records))
+
+        summary = import_projects(iter_records(data, 'ndjson'))
+
+        self.assertEqual((summary['created'], summary['invalid']), (1, 5))
+        self.assertEqual(summary['errors'], [
+            '第 1 行: title 不是字符串',
+            '第 2 行: status 不是字符串',
+            '第 3 行: created_at 不是字符串',
+            '第 4 行: created_at 不是有效的时间',
+            '第 5 行: 标题超过 200 个字符',
+        ])
+        self.assertEqual(Project.objects.get().status, 'completed')
+
+    def test_import_command_lists_invalid_lines(self):
+        with tempfile.NamedTemporaryFile('w', suffix='.ndjson', delete=False, encoding='utf-8') as file:
+            file.write('{"title": "命令导入"}\nnot json\n')
+        self.addCleanup(os.unlink, file.name)
+        out, err = io.StringIO(), io.StringIO()
+
+        call_command('import_projects', file.name, stdout=out, stderr=err)
+
+        self.assertIn('新增 1', out.getvalue())
+        self.assertIn('无效 1', out.getvalue())
+        self.assertIn('第 2 行', err.getvalue())
+
+    def test_import_ndjson_upload(self):
+        lines = [json.dumps({'title': f'项目{i}', 'status': 'in_progress'}, ensure_ascii=False) for i in range(3)]
+        upload = SimpleUploadedFile('projects.ndjson', '\n'.join(lines).encode('utf-8'))
+
+        with tempfile.TemporaryDirectory() as media_root, self.settings(MEDIA_ROOT=media_root):
+            response = self.client.post(reverse('project_import'), {'file': upload})
+
+            self.assertRedirects(response, reverse('project_list'))
+            self.assertEqual(Project.objects.count(), 0)
+            self.assertEqual(run_pending(), 1)
+            self.assertEqual(os.listdir(os.path.join(media_root, 'imports')), [])
+
+        self.assertEqual(Project.objects.filter(status='in_progress').count(), 3)
+        self.assertEqual(Job.objects.get().status, 'succeeded')
+
+    def test_export_streams_tasks_as_ndjson(self):
+        project = Project.objects.create(title='导出项目')
+        Task.objects.create(project=project, title='任务1')
+
+        response = self.client.get(reverse('project_export'), {'model': 'task', 'format': 'ndjson'})
+
+        self.assertTrue(response.streaming)
+        records = [json.loads(line) for line in b''.join(response.streaming_content).decode().splitlines()]
+        self.assertEqual(records[0]['project_id'], project.pk)
+        self.assertEqual(records[0]['title'], '任务1')
+
+    def test_export_command_writes_csv(self):
+        Project.objects.create(title='命令导出')
+        out = io.StringIO()
+
+        call_command('export_projects', '--format', 'csv', stdout=out)
+
+        header, row = out.getvalue().splitlines()
+        self.assertTrue(header.startswith('id,title'))
+        self.assertIn('命令导出', row)
+
+
+@override_settings(REPLICA_DATABASE_ALIAS=None, STORAGES=STATIC_STORAGES)
+class JobQueueTests(TestCase):
+    def test_import_job_reports_progress_per_chunk(self):
+        lines = ''.join(json.dumps({'title': f'项目{i}'}, ensure_ascii=False) + '\n' for i in range(10))
+        with tempfile.TemporaryDirectory() as media_root, self.settings(MEDIA_ROOT=media_root, BULK_IMPORT_CHUNK_SIZE=2):
+            path = default_storage.save('imports/progress.ndjson', io.BytesIO(lines.encode('utf-8')))
+            enqueue('import_projects', {'path': path, 'format': 'ndjson'})
+            with mock.patch('projects.jobs.report_progress', wraps=report_progress) as progress:
+                self.assertEqual(run_pending(), 1)
+
+        percents = [call.args[1] for call in progress.call_args_list]
+        self.assertEqual(len(percents), 6)
+        self.assertTrue(0 < percents[0] < percents[3] <= 99)
+        self.assertEqual(percents[-1], 100)
+
+    def test_delete_view_enqueues_once_and_worker_deletes_in_batches(self):
+        project = Project.objects.create(title='待删除')
+        Task.objects.bulk_create([Task(project=project, title=f'任务{i}') for i in range(5)])
+
+        self.client.post(reverse('project_delete', args=[project.pk]))
+        self.client.post(reverse('project_delete', args=[project.pk]))
+        self.assertTrue(Project.objects.filter(pk=project.pk).exists())
+
+        response = self.client.get(reverse('project_detail', args=[project.pk]))
+        self.assertContains(response, 'progress-bar')
+
+        with mock.patch('projects.jobs.DELETE_BATCH_SIZE', 2):
+            self.assertEqual(run_pending(), 1)
+
+        job = Job.objects.get()
+        self.assertEqual((job.status, job.progress, job.project_id), ('succeeded', 100, None))
+        self.assertFalse(Project.objects.filter(pk=project.pk).exists())
+        self.assertEqual(Task.objects.count(), 0)
+
+    def test_worker_survives_database_errors(self):
+        job = enqueue('rebuild_project_metrics')
+        claims = iter([OperationalError('数据库已断开'), None])
+        real_claim = jobs.claim_next
+
+        def flaky_claim(worker_name):
+            outcome = next(claims, None)
+            if isinstance(outcome, Exception):
+                raise outcome
+            return real_claim(worker_name)
+
+        rounds = iter(range(3))
+        with mock.patch.object(jobs, 'claim_next', flaky_claim), \
+                mock.patch.object(jobs, 'close_old_connections') as close, \
+                mock.patch.object(jobs.time, 'sleep'), \
+                self.assertLogs('projects.jobs', level='ERROR') as logs:
+            jobs.work('w1', poll_interval=0, should_stop=lambda: next(rounds, None) is None)
+
+        self.assertIn('数据库已断开', '\n'.join(logs.output))
+        close.assert_called_once()
+        job.refresh_from_db()
+        self.assertEqual(job.status, 'succeeded')
+
+    def test_unique_enqueue_is_enforced_by_constraint(self):
+        project = Project.objects.create(title='唯一删除')
+
+        first = enqueue('delete_project', {'project_id': project.pk}, project=project, unique=True)
+        self.assertIsNone(enqueue('delete_project', {'project_id': project.pk}, project=project, unique=True))
+        self.assertIsNotNone(enqueue('rebuild_project_metrics', unique=True))
+        self.assertIsNone(enqueue('rebuild_project_metrics', unique=True))
+        # 绕过检查直接写入同样会被约束拒绝
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            Job.objects.create(kind='delete_project', project=project)
+
+        Job.objects.filter(pk=first.pk).update(status='failed')
+        self.assertIsNotNone(enqueue('delete_project', {'project_id': project.pk}, project=project, unique=True))
+        self.assertEqual(Job.objects.filter(kind='delete_project').count(), 2)
+
+    def test_claim_order_and_retry_backoff(self):
+        low = enqueue('rebuild_project_metrics')
+        high = enqueue('delete_project', {'project_id': 999}, priority=5)
+        broken = Job.objects.create(kind='missing', max_attempts=2)
+
+        self.assertEqual(claim_next('w').pk, high.pk)
+        self.assertEqual(claim_next('w').pk, low.pk)
+
+        job = claim_next('w')
+        with self.assertLogs('projects.jobs', 'WARNING') as logs:
+            self.assertFalse(execute(job))
+        self.assertIn('执行失败（第 1 次）', logs.output[0])
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.attempts), ('queued', 1))
+        self.assertGreater(job.run_after, timezone.now())
+        self.assertIsNone(claim_next('w'))
+
+        Job.objects.filter(pk=broken.pk).update(run_after=timezone.now())
+        with self.assertLogs('projects.jobs', 'WARNING'):
+            self.assertFalse(execute(claim_next('w')))
+        self.assertEqual(Job.objects.get(pk=broken.pk).status, 'failed')
+
+
+@override_settings(REPLICA_DATABASE_ALIAS='replica')
+class ReplicaRouterTests(TestCase):
+    def setUp(self):
+        self.router = ReplicaRouter()
+
+    def test_reads_use_primary_outside_read_only_views(self):
+        self.assertEqual(self.router.db_for_read(Project), 'default')
+
+    def test_read_only_block_routes_project_reads_to_replica(self):
+        with replica_reads():
+            self.assertEqual(self.router.db_for_read(Project), 'replica')
+            self.assertEqual(self.router.db_for_read(Session), 'default')
+
+    def test_write_pins_rest_of_block_to_primary(self):
+        with replica_reads():
+            self.assertEqual(self.router.db_for_write(Project), 'default')
+            self.assertEqual(self.router.db_for_read(Project), 'default')
+
+    def test_migrations_only_run_on_primary(self):
+        self.assertTrue(self.router.allow_migrate('default', 'projects'))
+        self.assertFalse(self.router.allow_migrate('replica', 'projects'))
+
+    @override_settings(REPLICA_DATABASE_ALIAS=None)
+    def test_without_replica_everything_uses_primary(self):
+        with replica_reads():
+            self.assertEqual(self.router.db_for_read(Project), 'default')
+
+    def test_post_sets_primary_pin_cookie(self):
+        Project.objects.create(title='写后读')
+        project = Project.objects.get()
+
+        response = self.client.post(reverse('project_list'), {'project_id': project.pk, 'status': 'completed'})
+
+        self.assertIn(PRIMARY_PIN_COOKIE, response.cookies)
+
+
+@override_settings(STORAGES=STATIC_STORAGES)
+class ReplicaDatabaseTests(TransactionTestCase):
+    """
+    需设置 DATABASE_REPLICA_URL，让测试在主库和副本两个连接上运行
+
+    副本连接看不到 TestCase 中未提交的数据，因此使用 TransactionTestCase。
+    """
+
+    databases = {'default', 'replica'} if settings.REPLICA_DATABASE_ALIAS else {'default'}
+
+    def setUp(self):
+        if not settings.REPLICA_DATABASE_ALIAS:
+            self.skipTest('未配置 DATABASE_REPLICA_URL')
+
+    def test_list_and_detail_read_through_replica(self):
+        project = Project.objects.create(title='副本可见')
+
+        self.assertContains(self.client.get(reverse('project_list')), '副本可见')
+        self.assertContains(self.client.get(reverse('project_detail', args=[project.pk])), '副本可见')
+
+
+@override_settings(STORAGES=STATIC_STORAGES)
+class DashboardRollupTests(TestCase):
+    def test_status_transitions_update_rollups(self):
+        project = Project.objects.create(title='统计')
+        rollup = ProjectDailyRollup.objects.get()
+        self.assertEqual((rollup.created_count, rollup.open_count), (1, 1))
+
+        project.status = 'completed'
+        project.save()
+        project.save()  # 状态未变化，不重复计数
+
+        rollup.refresh_from_db()
+        self.assertEqual((rollup.completed_count, rollup.open_count), (1, 0))
+        self.assertEqual(sum(rollup.completion_histogram.values()), 1)
+
+    def test_deleting_open_project_shrinks_backlog(self):
+        project = Project.objects.create(title='待删除')
+        project.delete()
+
+        self.assertEqual(ProjectDailyRollup.objects.get().open_count, 0)
+
+    def test_dashboard_reads_metrics(self):
+        Project.objects.create(title='进行中', status='in_progress')
+        Project.objects.create(title='已完成', status='completed')
+
+        response = self.client.get(reverse('project_dashboard'), {'days': 7})
+
+        metrics = response.context['metrics']
+        self.assertEqual(metrics['created_total'], 2)
+        self.assertEqual(metrics['completed_total'], 1)
+        self.assertEqual(metrics['backlog_count'], 1)
+        self.assertEqual(len(metrics['daily']), 7)
+        # 中位数来自分桶直方图，标明为估算值
+        self.assertContains(response, '约 ')
+
+    def test_rebuild_matches_incremental_counts(self):
+        Project.objects.create(title='A')
+        Project.objects.create(title='B', status='cancelled')
+
+        rebuild_rollups()
+
+        rollup = ProjectDailyRollup.objects.get()
+        self.assertEqual((rollup.created_count, rollup.open_count, rollup.cancelled_count), (2, 1, 1))
+
+
+class ProjectEventTests(TestCase):
+    def test_status_changes_append_events(self):
+        project = Project.objects.create(title='审计')
+        self.client.post(reverse('project_list'), {'project_id': project.pk, 'status': 'in_progress'})
+        project.refresh_from_db()
+        project.notes = '只改备注'
+        project.save()
+
+        events = list(ProjectEvent.objects.filter(project=project).order_by('pk').values_list('old_status', 'new_status'))
+        self.assertEqual(events, [('', 'pending'), ('pending', 'in_progress')])
+
+    def test_events_are_append_only_and_survive_project_delete(self):
+        project = Project.objects.create(title='删除后保留')
+        event = ProjectEvent.objects.get()
+        with self.assertRaises(ValueError):
+            event.save()
+
+        project.delete()
+        self.assertTrue(ProjectEvent.objects.filter(project_id=event.project_id).exists())
+
+    def test_archive_writes_gzip_partitions_and_removes_rows(self):
+        project = Project.objects.create(title='归档')
+        ProjectEvent.objects.create(project=project, new_status='completed', created_at=timezone.now() - timedelta(days=400))
+
+        with tempfile.TemporaryDirectory() as output_dir:
+            with self.captureOnCommitCallbacks(execute=True):
+                call_command('archive_project_events', '--older-than-days', '30', '--output-dir', output_dir, stdout=io.StringIO())
+            (name,) = os.listdir(output_dir)
+            with gzip.open(os.path.join(output_dir, name), 'rt', encoding='utf-8') as file:
+                records = [json.loads(line) for line in file]
+
+        self.assertEqual([record['new_status'] for record in records], ['completed'])
+        self.assertEqual(ProjectEvent.objects.count(), 1)
+
+    def test_archive_rollback_leaves_no_files_and_rerun_archives_once(self):
+        project = Project.objects.create(title='归档回滚')
+        ProjectEvent.objects.create(project=project, new_status='completed', created_at=timezone.now() - timedelta(days=400))
+        arguments = ('archive_project_events', '--older-than-days', '30')
+
+        with tempfile.TemporaryDirectory() as output_dir:
+            with mock.patch('django.db.models.query.QuerySet.delete', side_effect=DatabaseError('删除失败')):
+                with self.assertRaises(DatabaseError):
+                    call_command(*arguments, '--output-dir', output_dir, stdout=io.StringIO())
+            self.assertEqual(os.listdir(output_dir), [])
+            self.assertEqual(ProjectEvent.objects.count(), 2)
+
+            for _ in range(2):
+                with self.captureOnCommitCallbacks(execute=True):
+                    call_command(*arguments, '--output-dir', output_dir, stdout=io.StringIO())
+            (name,) = os.listdir(output_dir)
+            with gzip.open(os.path.join(output_dir, name), 'rt', encoding='utf-8') as file:
+                records = [json.loads(line) for line in file]
+
+        self.assertEqual([record['new_status'] for record in records], ['completed'])
+
+
+
+class ChangeFeedTests(TestCase):
+    def test_one_poll_fans_out_to_all_subscribers(self):
+        feed = ChangeFeed(poll_interval=60)
+        queues = [asyncio.Queue(), asyncio.Queue()]
+        feed._subscribers.update(queues)
+        async_to_sync(feed.poll_once)()  # 首次轮询只记录位置
+
+        project = Project.objects.create(title='实时')
+        project.status = 'completed'
+        project.save()
+        with self.assertNumQueries(2):
+            async_to_sync(feed.poll_once)()
+
+        for queue in queues:
+            messages = [queue.get_nowait() for _ in range(queue.qsize())]
+            self.assertEqual(len(messages), 2)
+            self.assertIn('"created": true', messages[0])
+            self.assertIn('"status": "completed"', messages[1])
+
+    def test_restart_after_last_client_leaves_skips_stale_events(self):
+        feed = ChangeFeed(poll_interval=60)
+
+        async def scenario():
+            queue = feed.subscribe()
+            await feed.poll_once()
+            feed.unsubscribe(queue)
+            # 没有客户端期间产生的事件
+            await sync_to_async(Project.objects.create)(title='无人订阅时创建')
+            queue = feed.subscribe()
+            await feed.poll_once()
+            feed.unsubscribe(queue)
+            return queue.qsize()
+
+        with mock.patch.object(feed, '_run', mock.AsyncMock()):
+            self.assertEqual(async_to_sync(scenario)(), 0)
+
+    def test_stream_requires_asgi(self):
+        self.assertEqual(self.client.get(reverse('project_stream')).status_code, 501)
+
+
+class StreamDisconnectTests(SimpleTestCase):
+    def test_client_disconnect_ends_stream_and_unsubscribes(self):
+        from project_manager.asgi import application
+
+        feed = ChangeFeed(poll_interval=60)
+        sent = []
+
+        async def scenario():
+            messages = asyncio.Queue()
+            await messages.put({'type': 'http.request', 'body': b'', 'more_body': False})
+
+            async def send(message):
+                sent.append(message)
+                if message['type'] == 'http.response.body' and message.get('body'):
+                    self.assertEqual(len(feed._subscribers), 1)
+                    await messages.put({'type': 'http.disconnect'})
+
+            scope = {
+                'type': 'http', 'asgi': {'version': '3.0'}, 'http_version': '1.1', 'method': 'GET',
+                'scheme': 'http', 'path': reverse('project_stream'), 'raw_path': b'', 'query_string': b'',
+                'root_path': '', 'headers': [(b'host', b'testserver')],
+                'client': ('127.0.0.1', 1), 'server': ('testserver', 80),
+            }
+            await asyncio.wait_for(application(scope, messages.get, send), timeout=5)
+
+        with mock.patch('projects.views.change_feed', feed), mock.patch.object(feed, 'poll_once', mock.AsyncMock()):
+            async_to_sync(scenario)()
+
+        self.assertEqual(sent[0]['status'], 200)
+        self.assertEqual(len(feed._subscribers), 0)
+        self.assertIsNone(feed._task)
+
+    def test_stream_ends_after_max_age(self):
+        feed = ChangeFeed(poll_interval=60)
+
+        async def consume():
+            return [chunk async for chunk in stream_changes(feed, asyncio.Event(), keepalive=0.01, max_age=0.05)]
+
+        with mock.patch.object(feed, 'poll_once', mock.AsyncMock()):
+            chunks = async_to_sync(consume)()
+
+        self.assertEqual(chunks[0], 'retry: 3000\n\n')
+        self.assertIn(': keep-alive\n\n', chunks)
+        self.assertEqual(len(feed._subscribers), 0)
+
+
+@override_settings(REPLICA_DATABASE_ALIAS=None, STORAGES=STATIC_STORAGES)
+class ProjectArchiveTests(TestCase):
+    def setUp(self):
+        old = timezone.now() - timedelta(days=400)
+        self.done = Project.objects.create(title='旧项目', status='completed', created_at=old)
+        Task.objects.create(project=self.done, title='旧任务')
+        Project.objects.filter(pk=self.done.pk).update(updated_at=old)
+        self.active = Project.objects.create(title='进行中的项目', status='in_progress', created_at=old)
+        Project.objects.filter(pk=self.active.pk).update(updated_at=old)
+
+    def test_archive_moves_old_finished_projects_and_keeps_rollups(self):
+        rollups_before = list(ProjectDailyRollup.objects.order_by('date').values())
+
+        call_command('archive_projects', '--older-than-days', '30', stdout=io.StringIO())
+
+        self.assertEqual(list(Project.objects.values_list('pk', flat=True)), [self.active.pk])
+        archived = ArchivedProject.objects.get(pk=self.done.pk)
+        self.assertEqual(archived.status, 'completed')
+        self.assertEqual(list(ArchivedTask.objects.filter(project=archived).values_list('title', flat=True)), ['旧任务'])
+        self.assertEqual(Task.objects.count(), 0)
+        self.assertEqual(list(ProjectDailyRollup.objects.order_by('date').values()), rollups_before)
+
+    def test_detail_and_search_include_archived_projects(self):
+        archive_projects(timezone.now())
+
+        response = self.client.get(reverse('project_detail', args=[self.done.pk]))
+        self.assertContains(response, '恢复项目')
+
+        response = self.client.get(reverse('project_list'), {'q': '项目'})
+        self.assertEqual([p.pk for p in response.context['projects']], [self.active.pk])
+
+        response = self.client.get(reverse('project_list'), {'q': '项目', 'archived': '1'})
+        rows = {row['pk']: row['is_archived'] for row in response.context['projects']}
+        self.assertEqual(rows, {self.active.pk: False, self.done.pk: True})
+
+    def test_restore_returns_project_without_recording_creation(self):
+        archive_projects(timezone.now())
+        events_before = ProjectEvent.objects.count()
+
+        restored = restore_project(self.done.pk)
+
+        self.assertEqual((restored.title, restored.status), ('旧项目', 'completed'))
+        self.assertEqual(restored.tasks.get().title, '旧任务')
+        self.assertFalse(ArchivedProject.objects.exists())
+        self.assertEqual(ProjectEvent.objects.count(), events_before)
+
+
+@override_settings(REPLICA_DATABASE_ALIAS=None, STORAGES=STATIC_STORAGES)
+class TaskTreeTests(TestCase):
+    def setUp(self):
+        self.project = Project.objects.create(title='任务树')
+        self.design = Task.objects.create(project=self.project, title='设计')
+        self.draft = Task.objects.create(project=self.project, parent=self.design, title='草图', completed=True)
+        self.review = Task.objects.create(project=self.project, parent=self.design, title='评审')
+        self.detail = Task.objects.create(project=self.project, parent=self.draft, title='细化', completed=True)
+        self.build = Task.objects.create(project=self.project, title='实现')
+
+    def titles(self, queryset):
+        return [(task.title, task.depth) for task in queryset]
+
+    def test_tree_and_subtree_load_in_one_query_with_rollup(self):
+        with self.assertNumQueries(1):
+            tree = list(self.project.tasks.with_rollup().order_by('path'))
+        self.assertEqual(self.titles(tree), [('设计', 0), ('草图', 1), ('细化', 2), ('评审', 1), ('实现', 0)])
+        rollup = {task.title: (task.subtree_completed, task.subtree_count) for task in tree}
+        self.assertEqual(rollup['设计'], (2, 4))
+        self.assertEqual(rollup['草图'], (2, 2))
+        self.assertEqual(rollup['实现'], (0, 1))
+
+        with self.assertNumQueries(1):
+            self.assertEqual(self.titles(Task.objects.subtree(self.draft)), [('草图', 1), ('细化', 2)])
+
+    def test_move_rewrites_only_the_moved_subtree(self):
+        build_path = self.build.path
+
+        Task.objects.move(self.draft, self.build)
+
+        tree = Task.objects.filter(project=self.project).order_by('path')
+        self.assertEqual(self.titles(tree), [('设计', 0), ('评审', 1), ('实现', 0), ('草图', 1), ('细化', 2)])
+        self.detail.refresh_from_db()
+        self.assertEqual(self.detail.path[:len(build_path)], build_path)
+        self.assertEqual(Task.objects.get(pk=self.draft.pk).parent, self.build)
+
+        Task.objects.move(self.build, None, 0)
+        self.assertEqual([task.title for task in Task.objects.children_of(self.project.pk)], ['实现', '设计'])
+
+        with self.assertRaises(ValueError):
+            Task.objects.move(self.build, self.detail)
+
+    def test_reorder_rebalances_siblings_when_gap_runs_out(self):
+        first = Task.objects.create(project=self.project, parent=self.review, title='0')
+        for i in range(1, 15):
+            task = Task.objects.create(project=self.project, parent=self.review, title=str(i))
+            Task.objects.move(task, self.review, 0)
+
+        children = Task.objects.children_of(self.project.pk, self.review)
+        self.assertEqual([task.title for task in children], [str(i) for i in range(14, 0, -1)] + ['0'])
+        first.refresh_from_db()
+        self.assertTrue(first.path.startswith(self.review.path))
+        self.assertEqual(len(set(Task.objects.values_list('path', flat=True))), Task.objects.count())
+
+    def test_bulk_create_and_archive_keep_hierarchy(self):
+        Task.objects.bulk_create([Task(project=self.project, parent=self.build, title=f'步骤{i}') for i in range(3)])
+        self.assertEqual(
+            [task.title for task in Task.objects.subtree(self.build)], ['实现', '步骤0', '步骤1', '步骤2']
+        )
+
+        Project.objects.filter(pk=self.project.pk).update(status='completed')
+        archive_projects(timezone.now())
+        archived = ArchivedTask.objects.filter(project_id=self.project.pk).order_by('path')
+        self.assertEqual(archived.get(title='细化').parent.title, '草图')
+
+        restored = restore_project(self.project.pk)
+        self.assertEqual(self.titles(restored.tasks.order_by('path'))[:3], [('设计', 0), ('草图', 1), ('细化', 2)])
+
+    def test_detail_renders_tree_and_move_view_indents(self):
+        response = self.client.post(reverse('task_move', args=[self.build.pk]), {'action': 'indent'})
+        self.assertRedirects(response, reverse('project_detail', args=[self.project.pk]))
+        self.build.refresh_from_db()
+        self.assertEqual((self.build.parent_id, self.build.depth), (self.design.pk, 1))
+
+        self.client.post(reverse('task_create', args=[self.project.pk]), {'title': '测试', 'parent': self.build.pk})
+        response = self.client.get(reverse('project_detail', args=[self.project.pk]))
+        self.assertEqual(
+            [(task.title, task.depth) for task in response.context['tasks']][-2:], [('实现', 1), ('测试', 2)]
+        )
+        self.assertContains(response, '已完成 2/6')
+
+
+@override_settings(REPLICA_DATABASE_ALIAS=None, STORAGES=STATIC_STORAGES)
+class LargeTableAdminTests(TestCase):
+    def setUp(self):
+        self.client.force_login(User.objects.create_superuser('admin', 'admin@example.com', 'password'))
+
+    def changelist_queries(self, url):
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        return len(context.captured_queries)
+
+    def test_task_changelist_query_count_does_not_grow_with_rows(self):
+        url = reverse('admin:projects_task_changelist')
+        project = Project.objects.create(title='后台')
+        Task.objects.create(project=project, title='任务0')
+        baseline = self.changelist_queries(url)
+
+        for i in range(1, 20):
+            Task.objects.create(project=Project.objects.create(title=f'后台{i}'), title=f'任务{i}')
+
+        self.assertEqual(self.changelist_queries(url), baseline)
+        self.assertEqual(self.changelist_queries(f'{url}?project__id__exact={project.pk}'), baseline)
+
+    def test_project_search_includes_description(self):
+        Project.objects.create(title='甲', description='包含关键字的描述')
+        Project.objects.create(title='乙')
+
+        response = self.client.get(reverse('admin:projects_project_changelist'), {'q': '关键字'})
+
+        self.assertContains(response, '>甲<')
+        self.assertNotContains(response, '>乙<')
+
+    def test_paginator_falls_back_to_exact_count_without_estimates(self):
+        Project.objects.bulk_create([Project(title=f'项目{i}') for i in range(3)])
+        queryset = Project.objects.all()
+
+        self.assertIsNone(estimate_count(queryset))
+        self.assertEqual(EstimatedCountPaginator(queryset, 2).count, 3)
+
+    def test_paginator_uses_estimate_above_threshold(self):
+        with mock.patch('projects.pagination.estimate_count', return_value=50_000):
+            self.assertEqual(EstimatedCountPaginator(Project.objects.all(), 100).count, 50_000)
+
+
+@override_settings(STORAGES=STATIC_STORAGES)
+class StaticAssetTests(TestCase):
+    def test_list_page_uses_vendored_assets_and_inlines_critical_css(self):
+        response = self.client.get(reverse('project_list'))
+
+        self.assertNotContains(response, 'cdn.jsdelivr.net')
+        self.assertContains(response, 'vendor/bootstrap/css/bootstrap.min.css')
+        self.assertContains(response, 'rel="preload"')
+
+    @override_settings(CRITICAL_CSS_INLINE=False)
+    def test_critical_css_can_be_disabled(self):
+        response = self.client.get(reverse('project_list'))
+
+        self.assertNotContains(response, 'rel="preload"')
+
+
+@override_settings(STORAGES=STATIC_STORAGES)
+class ResponseCompressionTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        Project.objects.bulk_create([Project(title=f'项目 {i}', status='pending') for i in range(60)])
+
+    def test_list_page_is_compressed_by_accept_encoding(self):
+        response = self.client.get(reverse('project_list'), HTTP_ACCEPT_ENCODING='gzip')
+
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertIn('Accept-Encoding', response['Vary'])
+        self.assertIn('项目 59'.encode(), gzip.decompress(response.content))
+
+        response = self.client.get(reverse('project_list'), HTTP_ACCEPT_ENCODING='gzip, br')
+        self.assertEqual(response['Content-Encoding'], 'br')
+
+    def test_small_or_unaccepted_responses_are_not_compressed(self):
+        response = self.client.get(reverse('project_list'))
+        self.assertFalse(response.has_header('Content-Encoding'))
+
+        with override_settings(COMPRESSION_MIN_SIZE=10 ** 7):
+            response = self.client.get(reverse('project_list'), HTTP_ACCEPT_ENCODING='gzip')
+        self.assertFalse(response.has_header('Content-Encoding'))
+
+    def test_long_pages_stream_rows_and_share_status_options(self):
+        short = self.client.get(reverse('project_list'), {'per_page': 10})
+        response = self.client.get(reverse('project_list'), {'per_page': 100}, HTTP_ACCEPT_ENCODING='gzip')
+
+        self.assertTrue(response.streaming)
+        html = gzip.decompress(b''.join(response.streaming_content)).decode()
+        self.assertEqual(html.count('name="project_id"'), 60)
+        self.assertIn('</html>', html)
+        # 状态选项只在 <template> 中输出一次，不随行数增加
+        self.assertEqual(html.count('<option value="cancelled"'), short.content.decode().count('<option value="cancelled"'))
+        self.assertIn(settings.CSRF_COOKIE_NAME, response.cookies)
+
+    def test_invalid_page_size_falls_back_to_default(self):
+        response = self.client.get(reverse('project_list'), {'per_page': '7'})
+
+        self.assertFalse(response.streaming)
+        self.assertEqual(response.context['per_page'], 10)
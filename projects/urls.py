@@ -4,7 +4,15 @@ from . import views
 urlpatterns = [
     path('', views.project_list, name='project_list'),
     path('create/', views.project_create, name='project_create'),
+    path('import/', views.project_import, name='project_import'),
+    path('export/', views.project_export, name='project_export'),
+    path('dashboard/', views.project_dashboard, name='project_dashboard'),
+    path('stream/', views.project_stream, name='project_stream'),
     path('<int:pk>/', views.project_detail, name='project_detail'),
     path('<int:pk>/edit/', views.project_edit, name='project_edit'),
+    path('<int:pk>/restore/', views.project_restore, name='project_restore'),
     path('<int:pk>/delete/', views.project_delete, name='project_delete'),
+    path('<int:pk>/tasks/create/', views.task_create, name='task_create'),
+    path('tasks/<int:pk>/toggle/', views.task_toggle, name='task_toggle'),
+    path('tasks/<int:pk>/move/', views.task_move, name='task_move'),
 ]
\ No newline at end of file
@@ -1,15 +1,39 @@
+import asyncio
+import os
+
 from django.shortcuts import render, get_object_or_404, redirect
+from django.conf import settings
 from django.contrib import messages
+from django.core.files.storage import default_storage
 from django.core.paginator import Paginator
-from django.db.models import Q
-from .models import Project, Task
+from django.db import router
+from django.db.models import BooleanField, Q, Value
+from django.http import Http404, HttpResponse, StreamingHttpResponse
+from django.middleware.csrf import get_token
+from django.template.loader import get_template, render_to_string
+from django.utils.safestring import mark_safe
+from .archive import restore_project
+from .bulk import EXPORT_MODELS, FORMATS, guess_format, export_rows
+from .jobs import enqueue
+from .live import DISCONNECTED_SCOPE_KEY, change_feed, stream_changes
+from .metrics import get_dashboard_metrics
+from .models import ArchivedProject, Project, ProjectEvent, Task
+from .routers import read_from_replica
+
+# 项目列表可选的每页行数，第一个为默认值
+PAGE_SIZES = (10, 25, 50, 100)
+STREAM_CHUNK_ROWS = 25
+ROWS_MARKER = mark_safe('<!--project-rows-->')
 
 
+@read_from_replica
 def project_list(request):
     """项目列表页面"""
     # 获取搜索查询参数
     query = request.GET.get('q')
     status_filter = request.GET.get('status', '')
+    # 默认只查询热表；勾选"包含已归档"时合并归档表的结果
+    include_archived = request.GET.get('archived') == '1'
     
     if request.method == 'POST':
         # 处理直接状态更新
@@ -27,19 +51,36 @@ def project_list(request):
     
     # 获取所有项目
     projects = Project.objects.all()
+    archived_projects = ArchivedProject.objects.all()
     
     # 如果有状态过滤，则应用过滤
     if status_filter:
         projects = projects.filter(status=status_filter)
+        archived_projects = archived_projects.filter(status=status_filter)
     
     # 如果有搜索查询，则进行全文检索
     if query:
-        projects = projects.filter(
+        search = (
             Q(title__icontains=query) |
             Q(description__icontains=query) |
             Q(result__icontains=query) |
             Q(notes__icontains=query)
         )
+        projects = projects.filter(search)
+        archived_projects = archived_projects.filter(search)
+    
+    archived_count = None
+    if include_archived:
+        archived_count = ArchivedProject.objects.count()
+        fields = ('pk', 'title', 'status', 'created_at', 'updated_at', 'is_archived')
+        projects = projects.order_by().annotate(
+            is_archived=Value(False, output_field=BooleanField())
+        ).values(*fields).union(
+            archived_projects.order_by().annotate(
+                is_archived=Value(True, output_field=BooleanField())
+            ).values(*fields),
+            all=True,
+        ).order_by('-created_at')
     
     # 获取所有可能的状态值用于过滤选项
     all_statuses = Project.STATUS_CHOICES
@@ -51,12 +92,18 @@ def project_list(request):
     completed_count = Project.objects.filter(status='completed').count()
     cancelled_count = Project.objects.filter(status='cancelled').count()
     
-    # 分页处理
-    paginator = Paginator(projects, 10)  # 每页显示10个项目
+    # 分页处理，每页行数只能从 PAGE_SIZES 中选择
+    try:
+        per_page = int(request.GET.get('per_page', PAGE_SIZES[0]))
+    except ValueError:
+        per_page = PAGE_SIZES[0]
+    if per_page not in PAGE_SIZES:
+        per_page = PAGE_SIZES[0]
+    paginator = Paginator(projects, per_page)
     page_number = request.GET.get('page')
     page_obj = paginator.get_page(page_number)
     
-    return render(request, 'projects/project_list.html', {
+    context = {
         'projects': page_obj,
         'query': query,
         'selected_status': status_filter,
@@ -65,14 +112,90 @@ def project_list(request):
         'pending_count': pending_count,
         'in_progress_count': in_progress_count,
         'completed_count': completed_count,
-        'cancelled_count': cancelled_count
-    })
+        'cancelled_count': cancelled_count,
+        'include_archived': include_archived,
+        'archived_count': archived_count,
+        'per_page': per_page,
+        'page_sizes': PAGE_SIZES,
+    }
+    if per_page >= settings.LIST_STREAM_MIN_ROWS:
+        return render_streamed_rows(request, 'projects/project_list.html', context, list(page_obj))
+    return render(request, 'projects/project_list.html', context)
+
+
+def render_streamed_rows(request, template_name, context, rows, chunk_rows=STREAM_CHUNK_ROWS):
+    """
+    流式输出长列表页：先发送表格之前的部分，表格行每 chunk_rows 行渲染一次，最后发送页尾
+
+    页面模板在 stream_rows 为真时只在表格行的位置输出 rows_marker，行由 _project_rows.html 渲染。
+    rows 需在视图中取出，流式输出期间不再访问数据库。
+    """
+    # CSRF Cookie 须在响应头发出之前确定
+    get_token(request)
+    page = render_to_string(
+        template_name, {**context, 'stream_rows': True, 'rows_marker': ROWS_MARKER}, request
+    )
+    head, tail = page.split(ROWS_MARKER, 1)
+    rows_template = get_template('projects/_project_rows.html')
+
+    def stream():
+        yield head
+        for start in range(0, len(rows), chunk_rows):
+            yield rows_template.render({'rows': rows[start:start + chunk_rows]}, request)
+        yield tail
+
+    return StreamingHttpResponse(stream(), content_type='text/html; charset=utf-8')
+
+
+@read_from_replica
+def project_dashboard(request):
+    """项目吞吐量仪表盘，只读取每日汇总表"""
+    if request.method == 'POST':
+        enqueue('rebuild_project_metrics', priority=-10, unique=True)
+        messages.success(request, '统计重建已提交后台处理')
+        return redirect('project_dashboard')
 
+    try:
+        days = min(max(int(request.GET.get('days', 30)), 1), 365)
+    except ValueError:
+        days = 30
+    return render(request, 'projects/project_dashboard.html', {'metrics': get_dashboard_metrics(days)})
 
+
+@read_from_replica
 def project_detail(request, pk):
-    """项目详情页面"""
-    project = get_object_or_404(Project, pk=pk)
-    return render(request, 'projects/project_detail.html', {'project': project})
+    """项目详情页面；热表中不存在时查找归档表，已归档项目的链接保持有效"""
+    project = Project.objects.filter(pk=pk).first()
+    if project is None:
+        project = get_object_or_404(ArchivedProject, pk=pk)
+        events = ProjectEvent.objects.filter(project_id=pk)[:20]
+        context = {'project': project, 'events': events}
+    else:
+        events = project.events.all()[:20]
+        jobs = project.jobs.order_by('-created_at')[:5]
+        context = {'project': project, 'events': events, 'jobs': jobs}
+
+    # 整棵任务树一次查询取出，按路径排序即为先序，完成度在数据库中汇总
+    tasks = list(project.tasks.with_rollup().order_by('path'))
+    context.update({
+        'tasks': tasks,
+        'task_total': len(tasks),
+        'task_completed': sum(task.completed for task in tasks),
+        'parent_choices': [(task.pk, '\u3000' * task.depth + task.title) for task in tasks],
+    })
+    return render(request, 'projects/project_detail.html', context)
+
+
+def project_restore(request, pk):
+    """把已归档的项目恢复到活跃项目中"""
+    if request.method != 'POST':
+        return redirect('project_detail', pk=pk)
+    try:
+        restore_project(pk)
+    except ArchivedProject.DoesNotExist:
+        raise Http404('归档项目不存在')
+    messages.success(request, '项目已从归档中恢复')
+    return redirect('project_detail', pk=pk)
 
 
 def project_create(request):
@@ -110,12 +233,120 @@ def project_edit(request, pk):
 
 
 def project_delete(request, pk):
-    """删除项目"""
+    """删除项目；任务多的项目删除耗时较长，交给后台任务执行"""
     project = get_object_or_404(Project, pk=pk)
     
     if request.method == 'POST':
-        project.delete()
-        messages.success(request, '项目删除成功！')
+        enqueue('delete_project', {'project_id': project.pk}, priority=10, project=project, unique=True)
+        messages.success(request, '项目删除已提交后台处理')
         return redirect('project_list')
     
-    return render(request, 'projects/project_confirm_delete.html', {'project': project})
\ No newline at end of file
+    return render(request, 'projects/project_confirm_delete.html', {'project': project})
+
+
+def task_create(request, pk):
+    """在项目中添加任务，可指定上级任务"""
+    project = get_object_or_404(Project, pk=pk)
+
+    if request.method == 'POST':
+        title = request.POST.get('title', '').strip()
+        parent_id = request.POST.get('parent')
+        if title:
+            parent = get_object_or_404(Task, pk=parent_id, project=project) if parent_id else None
+            Task.objects.create(project=project, parent=parent, title=title)
+            messages.success(request, '任务添加成功！')
+        else:
+            messages.error(request, '任务标题不能为空！')
+    return redirect('project_detail', pk=project.pk)
+
+
+def task_toggle(request, pk):
+    """切换任务的完成状态"""
+    task = get_object_or_404(Task, pk=pk)
+    if request.method == 'POST':
+        task.completed = not task.completed
+        task.save(update_fields=['completed'])
+    return redirect('project_detail', pk=task.project_id)
+
+
+def task_move(request, pk):
+    """调整任务在树中的位置：上移、下移、升级到上级任务之后、降级为上一个兄弟任务的子任务"""
+    task = get_object_or_404(Task.objects.select_related('parent'), pk=pk)
+
+    if request.method == 'POST':
+        action = request.POST.get('action')
+        siblings = list(Task.objects.children_of(task.project_id, task.parent).only('pk'))
+        index = [sibling.pk for sibling in siblings].index(task.pk)
+        try:
+            if action == 'up' and index > 0:
+                Task.objects.move(task, task.parent, index - 1)
+            elif action == 'down' and index < len(siblings) - 1:
+                Task.objects.move(task, task.parent, index + 1)
+            elif action == 'indent' and index > 0:
+                Task.objects.move(task, siblings[index - 1])
+            elif action == 'outdent' and task.parent is not None:
+                parent = task.parent
+                uncles = Task.objects.children_of(task.project_id, parent.parent_id).values_list('pk', flat=True)
+                Task.objects.move(task, parent.parent, list(uncles).index(parent.pk) + 1)
+        except ValueError as e:
+            messages.error(request, f'移动失败：{e}')
+    return redirect('project_detail', pk=task.project_id)
+
+
+def project_import(request):
+    """上传 CSV / NDJSON 文件批量导入项目"""
+    if request.method == 'POST':
+        upload = request.FILES.get('file')
+        if upload is None:
+            messages.error(request, '请选择要导入的文件！')
+            return render(request, 'projects/project_import.html')
+
+        fmt = request.POST.get('format') or guess_format(upload.name)
+        if fmt not in FORMATS:
+            messages.error(request, f'导入失败：不支持的格式 {fmt}')
+            return render(request, 'projects/project_import.html')
+
+        # 文件先保存到存储中，由后台任务解析导入，请求立即返回
+        path = default_storage.save(os.path.join('imports', os.path.basename(upload.name)), upload)
+        job = enqueue('import_projects', {'path': path, 'format': fmt})
+        messages.success(request, f'导入已提交后台处理（任务 #{job.pk}）')
+        return redirect('project_list')
+
+    return render(request, 'projects/project_import.html')
+
+
+@read_from_replica
+def project_export(request):
+    """流式导出项目或任务表"""
+    model_name = request.GET.get('model', 'project')
+    fmt = request.GET.get('format', 'csv')
+    if model_name not in EXPORT_MODELS or fmt not in FORMATS:
+        raise Http404('不支持的导出参数')
+
+    content_type = 'text/csv' if fmt == 'csv' else 'application/x-ndjson'
+    # 流式响应在视图返回后才迭代，需在此处确定读取的数据库
+    using = router.db_for_read(EXPORT_MODELS[model_name][0])
+    rows = export_rows(model_name, fmt, using=using)
+    response = StreamingHttpResponse(rows, content_type=f'{content_type}; charset=utf-8')
+    response['Content-Disposition'] = f'attachment; filename="{model_name}s.{fmt}"'
+    return response
+
+
+async def project_stream(request):
+    """Server-Sent Events：推送项目状态变化、新项目以及可选的股票价格"""
+    if not hasattr(request, 'scope'):
+        # WSGI 下无法保持长连接而不占用工作线程
+        return HttpResponse('实时更新需要以 ASGI 方式运行', status=501, content_type='text/plain; charset=utf-8')
+
+    # 未经 DisconnectWatcher 包装时无法得知断开，只能依靠连接时长上限结束
+    disconnected = request.scope.get(DISCONNECTED_SCOPE_KEY) or asyncio.Event()
+    stream = stream_changes(
+        change_feed,
+        disconnected,
+        keepalive=getattr(settings, 'LIVE_KEEPALIVE_SECONDS', 15),
+        max_age=getattr(settings, 'LIVE_MAX_CONNECTION_SECONDS', 300),
+    )
+    response = StreamingHttpResponse(stream, content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'
+    return response
\ No newline at end of file
@@ -0,0 +1,362 @@
+#!/usr/bin/env python3
+"""
+多股票价格提醒守护进程
+在一个进程内监控多只股票，价格突破上下阈值时发送通知。
+每只股票的状态持久化到本地 SQLite 文件，重启后从上次状态继续，不会重复发送提醒。
+"""
+
+import argparse
+import json
+import math
+import os
+import socket
+import socketserver
+import sqlite3
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+from background_stock_monitor import get_stock_price, send_notification
+from stock_window import TickWindows
+
+DEFAULT_STATE_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'stock_data', 'alert_state.sqlite3')
+DEFAULT_STATUS_SOCKET = '/tmp/stock_alert_daemon.sock'
+
+# 与 background_stock_monitor.monitor_stock 相同的默认监控对象
+DEFAULT_WATCHLIST = [
+    {'symbol': '300300.SZ', 'name': '海峡创新', 'low': 12.0, 'high': 13.0},
+]
+
+
+class WatchedSymbol:
+    __slots__ = ('symbol', 'name', 'low', 'high', 'drop_percent')
+
+    def __init__(self, symbol, low=None, high=None, name=None, drop_percent=None):
+        """
+        :param drop_percent: 价格较监控窗口内最高价下跌超过此百分比时提醒
+        """
+        self.symbol = symbol
+        self.low = low
+        self.high = high
+        self.name = name or symbol
+        self.drop_percent = drop_percent
+
+    def zone(self, price):
+        """价格所处区间：'high'、'low' 或 'normal'"""
+        if self.high is not None and price > self.high:
+            return 'high'
+        if self.low is not None and price < self.low:
+            return 'low'
+        return 'normal'
+
+
+def load_watchlist(path=None):
+    """
+    读取监控列表
+    :param path: JSON 文件，内容为 [{"symbol": ..., "low": ..., "high": ..., "name": ..., "drop_percent": ...}]
+    """
+    entries = DEFAULT_WATCHLIST
+    if path:
+        with open(path, 'r', encoding='utf-8') as f:
+            entries = json.load(f)
+    return [WatchedSymbol(**entry) for entry in entries]
+
+
+class AlertStateStore:
+    """
+    每只股票的提醒状态，保存在 SQLite 中
+
+    每次更新都是一个独立事务（WAL + synchronous=FULL），进程崩溃时不会留下半写入的状态。
+    """
+
+    def __init__(self, path):
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute('PRAGMA synchronous=FULL')
+        self._conn.execute(
+            'CREATE TABLE IF NOT EXISTS symbol_state ('
+            ' symbol TEXT PRIMARY KEY,'
+            ' last_price REAL,'
+            ' zone TEXT,'
+            ' last_check_time TEXT,'
+            ' last_notification_time TEXT)'
+        )
+
+    def load(self, symbol):
+        with self._lock:
+            row = self._conn.execute(
+                'SELECT last_price, zone, last_check_time, last_notification_time FROM symbol_state WHERE symbol = ?',
+                (symbol,),
+            ).fetchone()
+        if row is None:
+            return None
+        return {
+            'last_price': row[0],
+            'zone': row[1],
+            'last_check_time': row[2],
+            'last_notification_time': row[3],
+        }
+
+    def save(self, symbol, last_price, zone, last_check_time, last_notification_time):
+        with self._lock:
+            self._conn.execute(
+                'INSERT INTO symbol_state (symbol, last_price, zone, last_check_time, last_notification_time)'
+                ' VALUES (?, ?, ?, ?, ?)'
+                ' ON CONFLICT(symbol) DO UPDATE SET last_price = excluded.last_price, zone = excluded.zone,'
+                ' last_check_time = excluded.last_check_time,'
+                ' last_notification_time = excluded.last_notification_time',
+                (symbol, last_price, zone, last_check_time, last_notification_time),
+            )
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+class AlertDaemon:
+    def __init__(self, watchlist, state_path=DEFAULT_STATE_FILE, interval_seconds=1800, workers=4,
+                 status_socket=DEFAULT_STATUS_SOCKET, window_seconds=3600):
+        """
+        :param window_seconds: 内存中保留的价格窗口长度，用于下跌提醒和状态输出
+        """
+        self.watchlist = watchlist
+        self.interval_seconds = interval_seconds
+        # 每只股票的窗口容量按检查间隔确定，内存占用与运行时长无关
+        self.windows = TickWindows(
+            [watched.symbol for watched in watchlist],
+            window_seconds=window_seconds,
+            capacity=math.ceil(window_seconds / max(interval_seconds, 1)) + 1,
+        )
+        self._drop_alerted = set()
+        self.workers = workers
+        self.status_socket = status_socket
+        self.store = AlertStateStore(state_path)
+        self.started_at = datetime.now()
+        self._pending = 0
+        self._stats = {}
+        self._stats_lock = threading.Lock()
+        self._stop = threading.Event()
+
+    def fetch_quotes(self):
+        """每轮用批量请求一次取回所有股票的行情；失败时返回空字典，由各股票单独查询"""
+        from stock_quotes import default_client
+
+        try:
+            return default_client().get_quotes([watched.symbol for watched in self.watchlist])
+        except Exception as e:
+            print(f"批量获取行情时出错: {str(e)}")
+            return {}
+
+    def check_symbol(self, watched, quotes=None):
+        """
+        检查一只股票的价格，必要时发送提醒并保存状态
+        :param quotes: 本轮批量取回的行情 {代码: Quote}，其中没有的股票单独查询
+        """
+        started = time.monotonic()
+        try:
+            quote = (quotes or {}).get(watched.symbol.upper())
+            price = quote.price if quote is not None else get_stock_price(watched.symbol)
+            now = datetime.now()
+            if price is None:
+                print(f"[{now.strftime('%H:%M:%S')}] 无法获取 {watched.symbol} 价格，跳过此次检查")
+                return
+
+            price = float(price)
+            state = self.store.load(watched.symbol) or {}
+            zone = watched.zone(price)
+            last_notification_time = state.get('last_notification_time')
+
+            alerts = []
+            # 只在进入新的越界区间时提醒；重启后区间从持久化状态恢复，不会重复提醒
+            if zone != 'normal' and zone != state.get('zone'):
+                alerts.append(self.zone_alert(watched, price, zone, now))
+
+            window = self.windows.append(watched.symbol, now.timestamp(), price)
+            drop_alert = self.check_drop(watched, window, now)
+            if drop_alert is not None:
+                alerts.append(drop_alert)
+            if alerts:
+                last_notification_time = now.isoformat()
+
+            # 先保存新区间再发送：两步之间被中断时最多漏发这一次，重启后不会重复发送
+            self.store.save(watched.symbol, price, zone, now.isoformat(), last_notification_time)
+            for subject, message in alerts:
+                send_notification(subject, message)
+            print(f"[{now.strftime('%H:%M:%S')}] {watched.symbol} 当前价格: {price:.2f}元")
+        finally:
+            latency = time.monotonic() - started
+            with self._stats_lock:
+                self._pending -= 1
+                self._stats[watched.symbol] = {
+                    'last_tick': datetime.now().isoformat(),
+                    'latency_seconds': round(latency, 3),
+                }
+
+    def check_symbol_safely(self, watched, quotes=None):
+        """供线程池调用：单只股票的行情异常或网络错误只记录下来，不影响其他股票和后续轮次"""
+        try:
+            self.check_symbol(watched, quotes)
+        except Exception as e:
+            print(f"[{datetime.now().strftime('%H:%M:%S')}] 检查 {watched.symbol} 时出错: {str(e)}")
+
+    def check_drop(self, watched, window, now):
+        """
+        窗口内自最高价下跌超过 drop_percent 时提醒一次，回升到阈值以内后重新计算
+        :return: 需要发送的提醒 (标题, 正文)，无需提醒时为 None
+        """
+        drawdown = window.drawdown_percent()
+        if watched.drop_percent is None or drawdown is None:
+            return None
+        if drawdown > -watched.drop_percent:
+            self._drop_alerted.discard(watched.symbol)
+            return None
+        if watched.symbol in self._drop_alerted:
+            return None
+        self._drop_alerted.add(watched.symbol)
+        minutes = self.windows.window_seconds // 60
+        subject = f"股票{watched.symbol}价格提醒：{minutes}分钟内下跌{-drawdown:.1f}%"
+        message = f"""股票{watched.symbol}（{watched.name}）价格提醒
+
+当前时间: {now.strftime('%Y-%m-%d %H:%M:%S')}
+股票代码: {watched.symbol}
+当前价格: {window.last().price:.2f}元
+{minutes}分钟内最高价: {window.max():.2f}元
+跌幅: {-drawdown:.2f}%
+
+请及时关注。"""
+        return subject, message
+
+    def zone_alert(self, watched, price, zone, now):
+        """价格进入越界区间的提醒 (标题, 正文)"""
+        threshold = watched.high if zone == 'high' else watched.low
+        notification_type = f"高于{threshold:g}元" if zone == 'high' else f"低于{threshold:g}元"
+        subject = f"股票{watched.symbol}价格提醒：价格{notification_type}"
+        message = f"""股票{watched.symbol}（{watched.name}）价格提醒
+
+当前时间: {now.strftime('%Y-%m-%d %H:%M:%S')}
+股票代码: {watched.symbol}
+当前价格: {price:.2f}元
+状态: 价格{notification_type}
+
+请及时关注。"""
+        return subject, message
+
+    def status(self):
+        """返回守护进程状态，供状态套接字查询"""
+        with self._stats_lock:
+            symbols = {}
+            for watched in self.watchlist:
+                state = self.store.load(watched.symbol) or {}
+                symbols[watched.symbol] = {
+                    **state,
+                    **self._stats.get(watched.symbol, {}),
+                    'window': self.windows.get(watched.symbol).summary(),
+                }
+            return {
+                'started_at': self.started_at.isoformat(),
+                'interval_seconds': self.interval_seconds,
+                'window_seconds': self.windows.window_seconds,
+                'window_memory_bytes': self.windows.memory_bytes(),
+                'queue_depth': self._pending,
+                'symbols': symbols,
+            }
+
+    def serve_status(self):
+        """在 Unix 套接字上提供 JSON 格式的状态"""
+        daemon = self
+
+        class StatusHandler(socketserver.StreamRequestHandler):
+            def handle(self):
+                self.wfile.write(json.dumps(daemon.status(), ensure_ascii=False).encode('utf-8') + b'\n')
+
+        if os.path.exists(self.status_socket):
+            os.unlink(self.status_socket)
+        server = socketserver.ThreadingUnixStreamServer(self.status_socket, StatusHandler)
+        server.daemon_threads = True
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        return server
+
+    def run(self):
+        """持续监控，直到手动停止"""
+        print(f"开始监控 {len(self.watchlist)} 只股票，每 {self.interval_seconds} 秒检查一次")
+        print(f"状态查询: python stock_alert_daemon.py status --socket {self.status_socket}")
+        server = self.serve_status() if self.status_socket else None
+
+        try:
+            with ThreadPoolExecutor(max_workers=self.workers) as executor:
+                while not self._stop.is_set():
+                    cycle_started = time.monotonic()
+                    with self._stats_lock:
+                        self._pending += len(self.watchlist)
+                    quotes = self.fetch_quotes()
+                    list(executor.map(lambda watched: self.check_symbol_safely(watched, quotes), self.watchlist))
+                    elapsed = time.monotonic() - cycle_started
+                    self._stop.wait(max(self.interval_seconds - elapsed, 0))
+        except KeyboardInterrupt:
+            print("\n监控已手动停止")
+        finally:
+            if server is not None:
+                server.shutdown()
+                os.unlink(self.status_socket)
+            self.store.close()
+
+    def stop(self):
+        self._stop.set()
+
+
+def query_status(socket_path):
+    """连接状态套接字并返回状态字典"""
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        sock.connect(socket_path)
+        data = b''
+        while not data.endswith(b'\n'):
+            chunk = sock.recv(65536)
+            if not chunk:
+                break
+            data += chunk
+    return json.loads(data)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='多股票价格提醒守护进程')
+    subparsers = parser.add_subparsers(dest='command')
+
+    run_parser = subparsers.add_parser('run', help='启动守护进程')
+    run_parser.add_argument('--config', help='监控列表 JSON 文件，默认监控 300300.SZ')
+    run_parser.add_argument('--state', default=DEFAULT_STATE_FILE, help='状态文件路径')
+    run_parser.add_argument('--interval', type=int, default=1800, help='检查间隔（秒）')
+    run_parser.add_argument('--workers', type=int, default=4, help='并发获取价格的线程数')
+    run_parser.add_argument('--socket', default=DEFAULT_STATUS_SOCKET, help='状态查询套接字路径')
+    run_parser.add_argument('--window', type=int, default=3600, help='内存价格窗口长度（秒），用于下跌提醒')
+
+    status_parser = subparsers.add_parser('status', help='查询运行中守护进程的状态')
+    status_parser.add_argument('--socket', default=DEFAULT_STATUS_SOCKET, help='状态查询套接字路径')
+
+    args = parser.parse_args()
+
+    if args.command == 'run':
+        daemon = AlertDaemon(
+            load_watchlist(args.config),
+            state_path=args.state,
+            interval_seconds=args.interval,
+            workers=args.workers,
+            status_socket=args.socket,
+            window_seconds=args.window,
+        )
+        daemon.run()
+    elif args.command == 'status':
+        try:
+            print(json.dumps(query_status(args.socket), ensure_ascii=False, indent=2))
+        except OSError as e:
+            print(f"无法连接守护进程: {str(e)}")
+            sys.exit(1)
+    else:
+        parser.print_help()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,194 @@
+#!/usr/bin/env python3
+"""
+历史日线回填
+把日期范围切成若干块，用有界线程池跨股票并行下载。每只股票从本地已存的最后日期之后继续，
+按时间顺序追加到 <代码>_daily.csv，中断后重新运行会接着下载，不会写入重复的行。
+"""
+
+import csv
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import date, timedelta
+
+from stock_history import tail_records
+
+DAILY_HEADER = ['date', 'open', 'high', 'low', 'close', 'volume']
+
+
+def _default_provider():
+    """延迟导入 yfinance（会连带导入 pandas、requests 等），只在真正访问网络时加载"""
+    import yfinance
+    return yfinance
+
+
+def split_range(start, end, chunk_days):
+    """把 [start, end) 切成不超过 chunk_days 天的块"""
+    chunks = []
+    current = start
+    while current < end:
+        chunk_end = min(current + timedelta(days=chunk_days), end)
+        chunks.append((current, chunk_end))
+        current = chunk_end
+    return chunks
+
+
+def frame_rows(frame):
+    """把 history() 返回的 DataFrame 转为 CSV 行，日期取自索引"""
+    if frame is None or frame.empty:
+        return []
+    return [
+        [moment.strftime('%Y-%m-%d'), round(float(o), 2), round(float(h), 2), round(float(l), 2), round(float(c), 2), int(v)]
+        for moment, o, h, l, c, v in zip(
+            frame.index, frame['Open'], frame['High'], frame['Low'], frame['Close'], frame['Volume']
+        )
+    ]
+
+
+class DailyBarStore:
+    """单只股票的日线 CSV，只追加且按日期递增"""
+
+    def __init__(self, symbol, data_dir="./stock_data"):
+        self.symbol = symbol
+        self.csv_file = os.path.join(data_dir, f"{symbol}_daily.csv")
+        os.makedirs(data_dir, exist_ok=True)
+
+    def last_date(self):
+        """已存储的最后日期（YYYY-MM-DD），没有记录时为 None"""
+        records = tail_records(self.csv_file, 1)
+        return records[-1]['date'] if records else None
+
+    def append(self, rows, after=None):
+        """
+        追加晚于 after 的行并写入磁盘
+        :return: 实际写入的行数
+        """
+        rows = [row for row in rows if after is None or row[0] > after]
+        if not rows:
+            return 0
+        is_new = not os.path.exists(self.csv_file)
+        with open(self.csv_file, 'a', newline='', encoding='utf-8') as file:
+            writer = csv.writer(file)
+            if is_new:
+                writer.writerow(DAILY_HEADER)
+            writer.writerows(rows)
+            file.flush()
+            os.fsync(file.fileno())
+        return len(rows)
+
+
+class Backfill:
+    def __init__(self, symbols, start, end=None, data_dir="./stock_data", chunk_days=365,
+                 workers=8, retries=3, provider=None):
+        """
+        :param start: 没有本地数据时的起始日期（date）
+        :param end: 截止日期（不含），默认为今天
+        :param workers: 同时进行的下载数
+        :param provider: 行情数据来源，需提供 Ticker(symbol).history(start=, end=)；默认为 yfinance
+        """
+        self.symbols = [symbol.upper() for symbol in symbols]
+        self.start = start
+        self.end = end or date.today()
+        self.data_dir = data_dir
+        self.chunk_days = chunk_days
+        self.workers = workers
+        self.retries = retries
+        self.provider = provider
+
+    def download(self, symbol, start, end):
+        """下载一个块，失败时按指数退避重试"""
+        for attempt in range(1, self.retries + 1):
+            try:
+                stock = (self.provider or _default_provider()).Ticker(symbol)
+                return frame_rows(stock.history(start=start.isoformat(), end=end.isoformat(), interval='1d'))
+            except Exception:
+                if attempt == self.retries:
+                    raise
+                time.sleep(2 ** (attempt - 1))
+
+    def plan(self):
+        """每只股票从已存的最后日期之后开始，返回 {代码: (存储, 最后日期, 块列表)}"""
+        plan = {}
+        for symbol in self.symbols:
+            store = DailyBarStore(symbol, self.data_dir)
+            last = store.last_date()
+            resume = max(self.start, date.fromisoformat(last) + timedelta(days=1)) if last else self.start
+            plan[symbol] = (store, last, split_range(resume, self.end, self.chunk_days))
+        return plan
+
+    def run(self, verbose=True):
+        """
+        执行回填
+
+        所有股票的块一起提交到线程池；完成的块先缓存，只有它之前的块都已写入时才追加，
+        因此文件始终按日期有序，中断后从最后写入的日期继续即可。
+        :return: 各股票写入行数、总行数、耗时与失败的股票
+        """
+        plan = self.plan()
+        total_chunks = sum(len(chunks) for _, _, chunks in plan.values())
+        written = {symbol: 0 for symbol in plan}
+        pending = {symbol: {} for symbol in plan}
+        next_index = {symbol: 0 for symbol in plan}
+        last_dates = {symbol: last for symbol, (_, last, _) in plan.items()}
+        failed = {}
+        # 每只股票最早失败的块序号，之前的块照常写入
+        failed_index = {}
+        done = rows_total = 0
+        started = time.perf_counter()
+
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            futures = {}
+            # 按块序号交错提交，各股票同时推进
+            for index in range(max((len(chunks) for _, _, chunks in plan.values()), default=0)):
+                for symbol, (_, _, chunks) in plan.items():
+                    if index < len(chunks):
+                        future = executor.submit(self.download, symbol, *chunks[index])
+                        futures[future] = (symbol, index)
+
+            for future in as_completed(futures):
+                symbol, index = futures[future]
+                done += 1
+                try:
+                    pending[symbol][index] = future.result()
+                except Exception as e:
+                    failed.setdefault(symbol, str(e))
+                    failed_index[symbol] = min(index, failed_index.get(symbol, index))
+                    if verbose:
+                        print(f"[{done}/{total_chunks}] {symbol} 下载失败: {e}")
+                    continue
+
+                store, _, chunks = plan[symbol]
+                # 失败块之后的数据不写入，下次运行从失败处继续
+                while next_index[symbol] in pending[symbol] and next_index[symbol] < failed_index.get(symbol, len(chunks)):
+                    rows = pending[symbol].pop(next_index[symbol])
+                    count = store.append(rows, after=last_dates[symbol])
+                    if count:
+                        last_dates[symbol] = rows[-1][0]
+                    written[symbol] += count
+                    rows_total += count
+                    next_index[symbol] += 1
+
+                if verbose:
+                    elapsed = time.perf_counter() - started
+                    chunk_start, chunk_end = chunks[index]
+                    print(f"[{done}/{total_chunks}] {symbol} {chunk_start} ~ {chunk_end} "
+                          f"累计 {rows_total:,} 行，{rows_total / elapsed if elapsed else 0:,.0f} 行/秒")
+
+        elapsed = time.perf_counter() - started
+        return {
+            'written': written,
+            'rows': rows_total,
+            'chunks': total_chunks,
+            'seconds': elapsed,
+            'failed': failed,
+        }
+
+
+def print_backfill_summary(summary):
+    """打印回填结果"""
+    print(f"完成 {summary['chunks']} 个块，写入 {summary['rows']:,} 行，用时 {summary['seconds']:.1f} 秒"
+          f"（{summary['rows'] / summary['seconds'] if summary['seconds'] else 0:,.0f} 行/秒）")
+    for symbol, count in summary['written'].items():
+        print(f"  {symbol:<12} {count:>8,} 行")
+    for symbol, error in summary['failed'].items():
+        print(f"  {symbol:<12} 失败: {error}（重新运行将从已写入的日期继续）")
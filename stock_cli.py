@@ -0,0 +1,201 @@
+#!/usr/bin/env python3
+"""
+股票脚本统一命令行入口
+
+各子命令只在执行时导入对应的模块，yfinance / pandas 仅在需要访问网络的命令中加载，
+因此 stats、latest、帮助信息等离线命令启动很快，适合由 cron 频繁调用。
+
+用法:
+  python stock_cli.py log [--symbol 300300.SZ]        # 记录当前数据
+  python stock_cli.py stats                           # 显示统计信息（离线）
+  python stock_cli.py latest                          # 显示最新记录（离线）
+  python stock_cli.py compact --archive-before 2024-01-01  # 去除重复行情并归档旧记录（离线）
+  python stock_cli.py list AAPL MSFT                  # 获取指定股票的当前信息
+  python stock_cli.py continuous --interval 30        # 持续监控模式
+  python stock_cli.py historical AAPL                 # 获取历史数据
+  python stock_cli.py backfill AAPL MSFT --start 2015-01-01  # 并行回填历史日线
+  python stock_cli.py screen above_ma200 volume_spike  # 多进程按条件筛选已存日线（离线）
+  python stock_cli.py check                           # 检查 300300 价格阈值并通知
+  python stock_cli.py watch                           # 后台持续监控 300300
+"""
+
+import argparse
+import sys
+from datetime import date
+
+DEFAULT_SYMBOL = "300300.SZ"
+DEFAULT_DATA_DIR = "./stock_data"
+DEFAULT_WATCHLIST = ['AAPL', 'MSFT', 'GOOGL', 'AMZN', 'TSLA']
+
+
+def _logger(args):
+    from stock_data_logger import StockDataLogger
+    return StockDataLogger(args.symbol, data_dir=args.data_dir)
+
+
+def cmd_log(args):
+    from stock_data_logger import log_and_show
+    log_and_show(_logger(args))
+
+
+def cmd_stats(args):
+    from stock_data_logger import print_statistics
+    print_statistics(_logger(args))
+
+
+def cmd_latest(args):
+    from stock_data_logger import print_latest
+    print_latest(_logger(args))
+
+
+def cmd_compact(args):
+    report = _logger(args).compact(archive_before=args.archive_before)
+    saved = report['bytes_before'] - report['bytes_after']
+    ratio = saved / report['bytes_before'] if report['bytes_before'] else 0
+    print(f"记录数: {report['records_before']:,} -> {report['records_after']:,}"
+          f"（去除重复 {report['dropped']:,}，归档 {report['archived']:,}）")
+    print(f"存储: {report['bytes_before']:,} -> {report['bytes_after']:,} 字节（节省 {ratio:.1%}）")
+    print(f"统计耗时: {report['stats_seconds_before'] * 1000:.1f} ms -> {report['stats_seconds_after'] * 1000:.1f} ms")
+
+
+def cmd_list(args):
+    from stock_monitor import StockMonitor
+    monitor = StockMonitor(args.symbols or DEFAULT_WATCHLIST)
+    stocks_info = monitor.get_all_stocks_info()
+    monitor.print_summary(stocks_info)
+    monitor.save_to_file(stocks_info)
+
+
+def cmd_continuous(args):
+    from stock_monitor import StockMonitor
+    StockMonitor(args.symbols or DEFAULT_WATCHLIST).monitor_continuously(args.interval)
+
+
+def cmd_historical(args):
+    from stock_monitor import StockMonitor
+    monitor = StockMonitor([args.symbol])
+    hist_data = monitor.get_historical_data(args.symbol, period=args.period)
+    if hist_data is not None:
+        print(f"\n{args.symbol.upper()} 最近5个交易日数据:")
+        print(hist_data.tail())
+
+
+def cmd_backfill(args):
+    from stock_backfill import Backfill, print_backfill_summary
+    backfill = Backfill(
+        args.symbols or DEFAULT_WATCHLIST,
+        start=args.start,
+        end=args.end,
+        data_dir=args.data_dir,
+        chunk_days=args.chunk_days,
+        workers=args.workers,
+    )
+    print_backfill_summary(backfill.run())
+
+
+def cmd_screen(args):
+    from stock_screener import Screener, print_report, write_report
+    try:
+        screener = Screener(
+            args.criteria,
+            symbols=args.symbols,
+            data_dir=args.data_dir,
+            workers=args.workers,
+            params={'volume_factor': args.volume_factor},
+        )
+    except ValueError as e:
+        print(str(e))
+        sys.exit(1)
+    if not screener.symbols:
+        print(f"{args.data_dir} 中没有日线数据（*_daily.csv），请先运行 backfill")
+        return
+    report = screener.run()
+    print_report(screener.criteria, report, limit=args.limit)
+    if args.output:
+        write_report(args.output, screener.criteria, report)
+        print(f"完整结果已写入 {args.output}")
+
+
+def cmd_check(args):
+    from stock_monitor_300300 import check_price_and_notify
+    check_price_and_notify()
+
+
+def cmd_watch(args):
+    from background_stock_monitor import monitor_stock
+    monitor_stock()
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(description='股票监控与数据记录工具')
+    subparsers = parser.add_subparsers(dest='command', metavar='<命令>')
+
+    for name, func, help_text in [
+        ('log', cmd_log, '记录当前数据并显示最新记录'),
+        ('stats', cmd_stats, '显示统计信息'),
+        ('latest', cmd_latest, '显示最新记录'),
+        ('compact', cmd_compact, '去除重复行情并压缩历史记录'),
+    ]:
+        sub = subparsers.add_parser(name, help=help_text)
+        sub.add_argument('--symbol', default=DEFAULT_SYMBOL, help='股票代码')
+        sub.add_argument('--data-dir', default=DEFAULT_DATA_DIR, help='数据目录')
+        sub.set_defaults(func=func)
+        if name == 'compact':
+            sub.add_argument('--archive-before', metavar='YYYY-MM-DD',
+                             help='把该日期之前的记录移入压缩归档文件')
+
+    sub = subparsers.add_parser('list', help='获取指定股票的当前信息')
+    sub.add_argument('symbols', nargs='*', help='股票代码，默认监控常用美股')
+    sub.set_defaults(func=cmd_list)
+
+    sub = subparsers.add_parser('continuous', help='持续监控模式')
+    sub.add_argument('--interval', type=int, default=15, help='监控间隔（分钟）')
+    sub.add_argument('symbols', nargs='*', help='股票代码')
+    sub.set_defaults(func=cmd_continuous)
+
+    sub = subparsers.add_parser('historical', help='获取历史数据')
+    sub.add_argument('symbol', help='股票代码')
+    sub.add_argument('--period', default='1mo', help='时间范围，如 1mo、1y')
+    sub.set_defaults(func=cmd_historical)
+
+    sub = subparsers.add_parser('backfill', help='并行回填历史日线，从本地最后日期继续')
+    sub.add_argument('symbols', nargs='*', help='股票代码，默认监控常用美股')
+    sub.add_argument('--start', type=date.fromisoformat, default=date(2015, 1, 1),
+                     help='没有本地数据时的起始日期（YYYY-MM-DD）')
+    sub.add_argument('--end', type=date.fromisoformat, help='截止日期（不含），默认今天')
+    sub.add_argument('--chunk-days', type=int, default=365, help='每次下载的天数')
+    sub.add_argument('--workers', type=int, default=8, help='同时进行的下载数')
+    sub.add_argument('--data-dir', default=DEFAULT_DATA_DIR, help='数据目录')
+    sub.set_defaults(func=cmd_backfill)
+
+    sub = subparsers.add_parser('screen', help='多进程按条件筛选已存的历史日线并排名')
+    sub.add_argument('criteria', nargs='+', metavar='criterion',
+                     help='筛选条件，需全部满足，按第一个条件排序：above_ma200、volume_spike、new_52w_low')
+    sub.add_argument('--symbols', nargs='+', help='股票代码，默认为数据目录中所有有日线的股票')
+    sub.add_argument('--workers', type=int, help='进程数，默认为 CPU 核数')
+    sub.add_argument('--volume-factor', type=float, default=2.0, help='volume_spike 的放量倍数')
+    sub.add_argument('--limit', type=int, default=50, help='显示的结果数')
+    sub.add_argument('--output', help='把完整排名写入 CSV 文件')
+    sub.add_argument('--data-dir', default=DEFAULT_DATA_DIR, help='数据目录')
+    sub.set_defaults(func=cmd_screen)
+
+    sub = subparsers.add_parser('check', help='检查 300300 价格阈值并通知')
+    sub.set_defaults(func=cmd_check)
+
+    sub = subparsers.add_parser('watch', help='后台持续监控 300300')
+    sub.set_defaults(func=cmd_watch)
+
+    return parser
+
+
+def main(argv=None):
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    if not getattr(args, 'func', None):
+        parser.print_help()
+        return
+    args.func(args)
+
+
+if __name__ == "__main__":
+    main()
@@ -4,18 +4,37 @@
 记录股票300300的每次查询数据，用于后续分析
 """
 
-import yfinance as yf
 import csv
 import os
+import time
 from datetime import datetime
 import json
 import sys
 
+import stock_ticks
+from stock_history import records_since, records_while, tail_records
+
+# 判断行情是否变化时比较的字段
+OHLCV_FIELDS = ('open', 'high', 'low', 'close', 'volume')
+
+
+def _default_provider():
+    """延迟导入 yfinance（会连带导入 pandas、requests 等），只在真正访问网络时加载"""
+    import yfinance
+    return yfinance
+
+
 class StockDataLogger:
-    def __init__(self, symbol="300300.SZ", data_dir="./stock_data"):
+    def __init__(self, symbol="300300.SZ", data_dir="./stock_data", provider=None):
+        """
+        :param provider: 行情数据来源，需提供 Ticker(symbol)；默认为 yfinance
+        """
         self.symbol = symbol
         self.data_dir = data_dir
+        self.provider = provider
         self.csv_file = os.path.join(data_dir, f"{symbol}_historical_data.csv")
+        # compact 移出 CSV 的旧记录，见 stock_ticks.py
+        self.archive_file = os.path.join(data_dir, f"{symbol}_archive.ticks")
         self.ensure_directories()
         self.create_csv_if_not_exists()
     
@@ -37,7 +56,7 @@ class StockDataLogger:
     def get_current_data(self):
         """获取当前股票数据"""
         try:
-            stock = yf.Ticker(self.symbol)
+            stock = (self.provider or _default_provider()).Ticker(self.symbol)
             hist = stock.history(period='1d')
             
             if hist.empty:
@@ -79,14 +98,14 @@ class StockDataLogger:
             print("无法获取股票数据")
             return False
         
-        # 检查是否已经记录了今天的同一时间数据（避免重复记录）
-        today_records = self.get_today_records()
-        current_time = data['time']
-        
-        # 检查是否已有相同时间的数据
-        for record in today_records:
-            if record['time'] == current_time:
-                print(f"已在 {current_time} 记录过数据，跳过重复记录")
+        # 只与最新一条记录比较：同一时间重复运行，或休市期间行情没有变化时都不再写入
+        latest = self.get_latest_record()
+        if latest is not None:
+            if latest['date'] == data['date'] and latest['time'] == data['time']:
+                print(f"已在 {data['time']} 记录过数据，跳过重复记录")
+                return True
+            if is_unchanged(latest, data):
+                print(f"行情自 {latest['date']} {latest['time']} 起没有变化，跳过记录")
                 return True
         
         # 写入数据到CSV
@@ -118,61 +137,243 @@ class StockDataLogger:
         return True
     
     def get_today_records(self):
-        """获取今天的所有记录"""
-        records = []
-        if not os.path.exists(self.csv_file):
-            return records
-        
-        with open(self.csv_file, 'r', encoding='utf-8') as file:
-            reader = csv.DictReader(file)
-            today = datetime.now().strftime('%Y-%m-%d')
-            for row in reader:
-                if row['date'] == today:
-                    records.append(row)
-        return records
+        """获取今天的所有记录（从文件末尾向前读取，只读今天的部分）"""
+        today = datetime.now().strftime('%Y-%m-%d')
+        return records_while(self.csv_file, lambda record: record['date'] == today)
     
     def get_latest_record(self):
         """获取最新记录"""
-        if not os.path.exists(self.csv_file):
+        records = self.get_recent_records(1)
+        return records[-1] if records else None
+    
+    def get_recent_records(self, n):
+        """获取最近 n 条记录，按时间顺序排列"""
+        return tail_records(self.csv_file, n)
+    
+    def get_records_since(self, timestamp):
+        """获取 timestamp（ISO 格式）之后的所有记录"""
+        return records_since(self.csv_file, timestamp)
+    
+    def get_statistics(self):
+        """获取统计数据（归档部分只读取块摘要，CSV 部分单次流式遍历）"""
+        parts = [part for part in (self._archive_statistics(), self._csv_statistics()) if part]
+        if not parts:
             return None
         
-        with open(self.csv_file, 'r', encoding='utf-8') as file:
-            reader = csv.DictReader(file)
-            rows = list(reader)
-            if rows:
-                return rows[-1]
-        return None
+        total = sum(part['total'] for part in parts)
+        close_sum = sum(part['close_sum'] for part in parts)
+        volume_sum = sum(part['volume_sum'] for part in parts)
+        stats = {
+            'total_records': total,
+            'first_record_date': parts[0]['first_date'],
+            'last_record_date': parts[-1]['last_date'],
+            'latest_price': parts[-1]['latest_price'],
+            'highest_price': max(part['highest_price'] for part in parts),
+            'lowest_price': min(part['lowest_price'] for part in parts),
+            'avg_price': close_sum / total,
+            'highest_volume': max(part['highest_volume'] for part in parts),
+            'lowest_volume': min(part['lowest_volume'] for part in parts),
+            'avg_volume': volume_sum / total
+        }
+        
+        return stats
     
-    def get_statistics(self):
-        """获取统计数据"""
+    def _archive_statistics(self):
+        summary = stock_ticks.summarize(stock_ticks.read_summaries(self.archive_file))
+        if summary is None:
+            return None
+        return {
+            'total': summary['count'],
+            'first_date': stock_ticks.timestamp_date(summary['first_ts']),
+            'last_date': stock_ticks.timestamp_date(summary['last_ts']),
+            'latest_price': summary['last_close'] / 100,
+            'highest_price': summary['max_close'] / 100,
+            'lowest_price': summary['min_close'] / 100,
+            'close_sum': summary['close_sum'] / 100,
+            'highest_volume': summary['max_volume'],
+            'lowest_volume': summary['min_volume'],
+            'volume_sum': summary['volume_sum'],
+        }
+    
+    def _csv_statistics(self):
         if not os.path.exists(self.csv_file):
             return None
         
-        records = []
+        total = 0
+        first_row = last_row = None
+        highest_price = lowest_price = 0.0
+        highest_volume = lowest_volume = 0
+        close_sum = 0.0
+        volume_sum = 0
+        
         with open(self.csv_file, 'r', encoding='utf-8') as file:
-            reader = csv.DictReader(file)
-            records = list(reader)
+            reader = csv.reader(file)
+            header = next(reader, None)
+            if header is None:
+                return None
+            date_index = header.index('date')
+            close_index = header.index('close')
+            volume_index = header.index('volume')
+            
+            for row in reader:
+                close = float(row[close_index])
+                volume = int(row[volume_index])
+                if first_row is None:
+                    first_row = row
+                    highest_price = lowest_price = close
+                    highest_volume = lowest_volume = volume
+                if close > highest_price:
+                    highest_price = close
+                elif close < lowest_price:
+                    lowest_price = close
+                if volume > highest_volume:
+                    highest_volume = volume
+                elif volume < lowest_volume:
+                    lowest_volume = volume
+                close_sum += close
+                volume_sum += volume
+                total += 1
+                last_row = row
         
-        if not records:
+        if not total:
             return None
         
-        closes = [float(r['close']) for r in records]
-        volumes = [int(r['volume']) for r in records]
-        
-        stats = {
-            'total_records': len(records),
-            'first_record_date': records[0]['date'],
-            'last_record_date': records[-1]['date'],
-            'latest_price': float(records[-1]['close']),
-            'highest_price': max(closes),
-            'lowest_price': min(closes),
-            'avg_price': sum(closes) / len(closes),
-            'highest_volume': max(volumes),
-            'lowest_volume': min(volumes),
-            'avg_volume': sum(volumes) / len(volumes)
+        return {
+            'total': total,
+            'first_date': first_row[date_index],
+            'last_date': last_row[date_index],
+            'latest_price': float(last_row[close_index]),
+            'highest_price': highest_price,
+            'lowest_price': lowest_price,
+            'close_sum': close_sum,
+            'highest_volume': highest_volume,
+            'lowest_volume': lowest_volume,
+            'volume_sum': volume_sum,
         }
+    
+    def storage_size(self):
+        """CSV 与归档文件的总字节数"""
+        return sum(os.path.getsize(path) for path in (self.csv_file, self.archive_file) if os.path.exists(path))
+    
+    def compact(self, archive_before=None):
+        """
+        压缩历史记录
         
-        return stats
+        删除与前一条 OHLCV 完全相同的连续记录（休市期间定时任务重复写入的行）；
+        指定 archive_before（YYYY-MM-DD）时，该日期之前的记录移入差值 + varint 编码的归档文件。
+        CSV 先写入临时文件再原子替换，运行期间不要同时执行 log。
+        :return: 压缩前后的记录数、存储大小和统计耗时
+        """
+        started = time.perf_counter()
+        before = self.get_statistics()
+        stats_seconds_before = time.perf_counter() - started
+        bytes_before = self.storage_size()
+        
+        summaries = stock_ticks.read_summaries(self.archive_file)
+        # 已归档的记录不再重复写入，中途失败后可以安全地重新运行
+        archived_until = summaries[-1]['last_ts'] if summaries else -1
+        counts = {'kept': 0, 'dropped': 0}
+        temp_file = self.csv_file + '.tmp'
+        
+        with open(self.csv_file, 'r', newline='', encoding='utf-8') as source, \
+                open(temp_file, 'w', newline='', encoding='utf-8') as target:
+            reader = csv.reader(source)
+            writer = csv.writer(target)
+            header = next(reader)
+            writer.writerow(header)
+            date_index = header.index('date')
+            key_indexes = [header.index(field) for field in OHLCV_FIELDS]
+            
+            def compacted():
+                """写出保留在 CSV 中的行，返回需要归档的记录"""
+                last_key = None
+                for row in reader:
+                    key = tuple(float(row[index]) for index in key_indexes)
+                    if key == last_key:
+                        counts['dropped'] += 1
+                        continue
+                    last_key = key
+                    if archive_before and row[date_index] < archive_before:
+                        tick = stock_ticks.record_to_tick(dict(zip(header, row)))
+                        if tick[0] > archived_until:
+                            yield tick
+                        else:
+                            counts['dropped'] += 1
+                    else:
+                        writer.writerow(row)
+                        counts['kept'] += 1
+            
+            if archive_before:
+                archived = stock_ticks.append_ticks(self.archive_file, compacted())
+            else:
+                archived = sum(1 for _ in compacted())
+            target.flush()
+            os.fsync(target.fileno())
+        os.replace(temp_file, self.csv_file)
+        
+        started = time.perf_counter()
+        after = self.get_statistics()
+        stats_seconds_after = time.perf_counter() - started
+        
+        return {
+            'records_before': before['total_records'] if before else 0,
+            'records_after': after['total_records'] if after else 0,
+            'dropped': counts['dropped'],
+            'archived': archived,
+            'bytes_before': bytes_before,
+            'bytes_after': self.storage_size(),
+            'stats_seconds_before': stats_seconds_before,
+            'stats_seconds_after': stats_seconds_after,
+        }
+
+
+def is_unchanged(previous, current):
+    """两条记录的 OHLCV 是否完全相同"""
+    try:
+        return all(float(previous[field]) == float(current[field]) for field in OHLCV_FIELDS)
+    except (KeyError, TypeError, ValueError):
+        return False
+
+
+def print_statistics(logger):
+    """打印统计信息"""
+    stats = logger.get_statistics()
+    if stats:
+        print(f"股票{logger.symbol}数据统计:")
+        print(f"  总记录数: {stats['total_records']}")
+        print(f"  首次记录日期: {stats['first_record_date']}")
+        print(f"  最近记录日期: {stats['last_record_date']}")
+        print(f"  当前价格: {stats['latest_price']:.2f}元")
+        print(f"  历史最高价: {stats['highest_price']:.2f}元")
+        print(f"  历史最低价: {stats['lowest_price']:.2f}元")
+        print(f"  平均价格: {stats['avg_price']:.2f}元")
+        print(f"  最高成交量: {stats['highest_volume']:,}")
+        print(f"  最低成交量: {stats['lowest_volume']:,}")
+        print(f"  平均成交量: {int(stats['avg_volume']):,}")
+    else:
+        print("暂无统计数据")
+
+
+def print_latest(logger, title="最新记录:"):
+    """打印最新记录"""
+    latest = logger.get_latest_record()
+    if latest:
+        print(title)
+        print(f"  时间: {latest['date']} {latest['time']}")
+        print(f"  价格: {latest['close']}元")
+        print(f"  涨跌: {latest['price_change']}元 ({latest['change_percentage']}%)")
+        print(f"  成交量: {int(latest['volume']):,}")
+    else:
+        print("暂无记录")
+
+
+def log_and_show(logger):
+    """默认行为：记录数据并显示最新记录"""
+    print("记录当前股票数据...")
+    success = logger.log_data()
+    if success:
+        print_latest(logger, title="\n最新记录:")
+
 
 def main():
     logger = StockDataLogger()
@@ -182,44 +383,12 @@ def main():
         logger.log_data()
     elif len(sys.argv) > 1 and sys.argv[1] == "stats":
         # 显示统计信息
-        stats = logger.get_statistics()
-        if stats:
-            print("股票300300数据统计:")
-            print(f"  总记录数: {stats['total_records']}")
-            print(f"  首次记录日期: {stats['first_record_date']}")
-            print(f"  最近记录日期: {stats['last_record_date']}")
-            print(f"  当前价格: {stats['latest_price']:.2f}元")
-            print(f"  历史最高价: {stats['highest_price']:.2f}元")
-            print(f"  历史最低价: {stats['lowest_price']:.2f}元")
-            print(f"  平均价格: {stats['avg_price']:.2f}元")
-            print(f"  最高成交量: {stats['highest_volume']:,}")
-            print(f"  最低成交量: {stats['lowest_volume']:,}")
-            print(f"  平均成交量: {int(stats['avg_volume']):,}")
-        else:
-            print("暂无统计数据")
+        print_statistics(logger)
     elif len(sys.argv) > 1 and sys.argv[1] == "latest":
         # 显示最新记录
-        latest = logger.get_latest_record()
-        if latest:
-            print("最新记录:")
-            print(f"  时间: {latest['date']} {latest['time']}")
-            print(f"  价格: {latest['close']}元")
-            print(f"  涨跌: {latest['price_change']}元 ({latest['change_percentage']}%)")
-            print(f"  成交量: {int(latest['volume']):,}")
-        else:
-            print("暂无记录")
+        print_latest(logger)
     else:
-        # 默认行为：记录数据并显示最新记录
-        print("记录当前股票数据...")
-        success = logger.log_data()
-        if success:
-            print("\n最新记录:")
-            latest = logger.get_latest_record()
-            if latest:
-                print(f"  时间: {latest['date']} {latest['time']}")
-                print(f"  价格: {latest['close']}元")
-                print(f"  涨跌: {latest['price_change']}元 ({latest['change_percentage']}%)")
-                print(f"  成交量: {int(latest['volume']):,}")
+        log_and_show(logger)
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
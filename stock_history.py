@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""
+CSV 历史记录的尾部读取工具
+从文件末尾按块向前读取，只解析需要的最后若干行，耗时和内存与读取的行数成正比，与文件大小无关。
+要求：文件按时间顺序追加写入，且字段中不包含换行符（StockDataLogger 写入的文件满足这两点）。
+"""
+
+import csv
+import os
+
+BLOCK_SIZE = 64 * 1024
+
+
+def read_header(path):
+    """
+    读取表头
+    :return: (列名列表, 表头所占字节数)
+    """
+    with open(path, 'rb') as file:
+        first_line = file.readline()
+    header = next(csv.reader([first_line.decode('utf-8-sig').rstrip('\r\n')]), [])
+    return header, len(first_line)
+
+
+def iter_lines_reverse(path, stop=0, block_size=BLOCK_SIZE):
+    """
+    从文件末尾向前逐行返回（不含换行符），读到字节偏移 stop 为止
+    :param stop: 不读取此偏移之前的内容，通常为表头长度
+    """
+    with open(path, 'rb') as file:
+        file.seek(0, os.SEEK_END)
+        position = file.tell()
+        remainder = b''
+        while position > stop:
+            read_size = min(block_size, position - stop)
+            position -= read_size
+            file.seek(position)
+            lines = (file.read(read_size) + remainder).split(b'\n')
+            # 块的第一段可能是不完整的行，留到读取下一块时拼接
+            remainder = lines[0]
+            for line in reversed(lines[1:]):
+                line = line.rstrip(b'\r')
+                if line:
+                    yield line.decode('utf-8')
+        remainder = remainder.rstrip(b'\r')
+        if remainder:
+            yield remainder.decode('utf-8')
+
+
+def iter_records_reverse(path):
+    """从最新到最旧逐条返回记录（字典）"""
+    if not os.path.exists(path):
+        return
+    header, header_size = read_header(path)
+    for line in iter_lines_reverse(path, stop=header_size):
+        yield dict(zip(header, next(csv.reader([line]))))
+
+
+def tail_records(path, n):
+    """返回最后 n 条记录，按时间顺序排列"""
+    records = []
+    if n <= 0:
+        return records
+    for record in iter_records_reverse(path):
+        records.append(record)
+        if len(records) >= n:
+            break
+    records.reverse()
+    return records
+
+
+def records_while(path, predicate):
+    """从末尾向前读取，直到遇到不满足 predicate 的记录为止，返回按时间顺序排列的记录"""
+    records = []
+    for record in iter_records_reverse(path):
+        if not predicate(record):
+            break
+        records.append(record)
+    records.reverse()
+    return records
+
+
+def records_since(path, timestamp):
+    """返回 timestamp（ISO 格式字符串）及之后的所有记录"""
+    return records_while(path, lambda record: record['timestamp'] >= timestamp)
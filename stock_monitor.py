@@ -4,19 +4,27 @@
 用于定期监控和记录特定股票的价格变化
 """
 
-import yfinance as yf
 import json
 import os
 from datetime import datetime
 import time
 import sys
 
+
+def _default_provider():
+    """延迟导入 yfinance（会连带导入 pandas、requests 等），只在真正访问网络时加载"""
+    import yfinance
+    return yfinance
+
+
 class StockMonitor:
-    def __init__(self, symbols=None):
+    def __init__(self, symbols=None, provider=None):
         """
         初始化股票监控器
         :param symbols: 要监控的股票代码列表
+        :param provider: 行情数据来源，需提供 Ticker(symbol)；默认为 yfinance
         """
+        self.provider = provider
         if symbols is None:
             self.symbols = ['AAPL', 'MSFT', 'GOOGL', 'AMZN', 'TSLA']
         else:
@@ -31,7 +39,7 @@ class StockMonitor:
         获取单个股票的信息
         """
         try:
-            stock = yf.Ticker(symbol.upper())
+            stock = (self.provider or _default_provider()).Ticker(symbol.upper())
             hist = stock.history(period="5d")
             
             if hist.empty:
@@ -131,7 +139,7 @@ class StockMonitor:
         获取股票历史数据
         """
         try:
-            stock = yf.Ticker(symbol.upper())
+            stock = (self.provider or _default_provider()).Ticker(symbol.upper())
             hist = stock.history(period=period)
             return hist
         except Exception as e:
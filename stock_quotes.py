@@ -0,0 +1,187 @@
+#!/usr/bin/env python3
+"""
+轻量行情客户端
+直接请求行情接口的 JSON，解析为只含几个字段的 Quote 记录，不构造 DataFrame。
+连接放在连接池中保持长连接（HTTP/1.1 keep-alive）复用，多只股票合并为一次批量请求。
+只依赖标准库，导入开销很小。
+
+行情地址可通过环境变量 STOCK_QUOTE_URL 修改，基准测试用它指向本地的桩服务器（benchmarks/quote_stub.py）。
+"""
+
+import http.client
+import json
+import os
+import queue
+import threading
+from urllib.parse import urlencode, urlsplit
+
+DEFAULT_QUOTE_URL = 'https://query1.finance.yahoo.com'
+QUOTE_PATH = '/v8/finance/spark'
+# 接口单次请求支持的最大股票数
+BATCH_SIZE = 20
+USER_AGENT = 'Mozilla/5.0 (compatible; moltbot-stock/1.0)'
+
+
+class Quote:
+    __slots__ = ('symbol', 'price', 'previous_close', 'timestamp')
+
+    def __init__(self, symbol, price, previous_close=None, timestamp=None):
+        self.symbol = symbol
+        self.price = price
+        self.previous_close = previous_close
+        self.timestamp = timestamp
+
+    @property
+    def change(self):
+        return None if self.previous_close is None else self.price - self.previous_close
+
+    @property
+    def change_percent(self):
+        if not self.previous_close:
+            return None
+        return (self.price / self.previous_close - 1) * 100
+
+    def __repr__(self):
+        return f"Quote({self.symbol!r}, {self.price!r}, {self.previous_close!r}, {self.timestamp!r})"
+
+
+def _last_value(values):
+    for value in reversed(values or ()):
+        if value is not None:
+            return value
+    return None
+
+
+def parse_spark(payload):
+    """
+    解析批量行情响应，返回 {代码: Quote}
+    同时兼容两种格式：{"spark": {"result": [{"symbol", "response": [{"meta", "indicators"}]}]}}
+    以及按代码为键的 {"AAPL": {"symbol", "close", "timestamp", "previousClose"}}
+    """
+    data = json.loads(payload)
+    quotes = {}
+    if 'spark' in data:
+        for result in (data['spark'] or {}).get('result') or ():
+            for response in result.get('response') or ():
+                meta = response.get('meta') or {}
+                price = meta.get('regularMarketPrice')
+                if price is None:
+                    price = _last_value(((response.get('indicators') or {}).get('quote') or [{}])[0].get('close'))
+                if price is None:
+                    continue
+                symbol = meta.get('symbol') or result.get('symbol')
+                quotes[symbol] = Quote(
+                    symbol, float(price),
+                    meta.get('previousClose', meta.get('chartPreviousClose')),
+                    meta.get('regularMarketTime'),
+                )
+        return quotes
+
+    for symbol, entry in data.items():
+        if not isinstance(entry, dict):
+            continue
+        price = _last_value(entry.get('close'))
+        if price is None:
+            continue
+        quotes[entry.get('symbol', symbol)] = Quote(
+            entry.get('symbol', symbol), float(price),
+            entry.get('previousClose', entry.get('chartPreviousClose')),
+            _last_value(entry.get('timestamp')),
+        )
+    return quotes
+
+
+class QuoteClient:
+    """
+    带连接池的行情客户端，可在多个线程中共享
+    :param base_url: 行情服务地址，默认读取 STOCK_QUOTE_URL
+    :param pool_size: 连接池中保留的空闲长连接数
+    """
+
+    def __init__(self, base_url=None, pool_size=4, timeout=10, batch_size=BATCH_SIZE):
+        parts = urlsplit(base_url or os.environ.get('STOCK_QUOTE_URL', DEFAULT_QUOTE_URL))
+        self._connection_class = http.client.HTTPSConnection if parts.scheme == 'https' else http.client.HTTPConnection
+        self._host = parts.netloc
+        self._prefix = parts.path.rstrip('/')
+        self.timeout = timeout
+        self.batch_size = batch_size
+        self._idle = queue.LifoQueue(maxsize=pool_size)
+        self.connections_opened = 0
+        self._lock = threading.Lock()
+
+    def _connect(self):
+        with self._lock:
+            self.connections_opened += 1
+        return self._connection_class(self._host, timeout=self.timeout)
+
+    def _acquire(self):
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            return self._connect()
+
+    def _release(self, connection):
+        try:
+            self._idle.put_nowait(connection)
+        except queue.Full:
+            connection.close()
+
+    def _get(self, path):
+        """
+        发送 GET 请求并返回响应体；复用的连接已被服务端关闭时新建连接重试一次
+        重试不从连接池取连接，池中其余空闲连接可能同样已失效
+        """
+        for attempt in range(2):
+            connection = self._connect() if attempt else self._acquire()
+            try:
+                connection.request('GET', path, headers={'User-Agent': USER_AGENT, 'Accept': 'application/json'})
+                response = connection.getresponse()
+                body = response.read()
+            except (http.client.RemoteDisconnected, http.client.BadStatusLine, ConnectionError):
+                connection.close()
+                if attempt:
+                    raise
+                continue
+            except Exception:
+                connection.close()
+                raise
+            if response.will_close:
+                connection.close()
+            else:
+                self._release(connection)
+            if response.status != 200:
+                raise http.client.HTTPException(f'行情接口返回 {response.status}')
+            return body
+
+    def get_quotes(self, symbols):
+        """批量获取行情，返回 {代码: Quote}；没有数据的代码不出现在结果中"""
+        symbols = [symbol.upper() for symbol in symbols]
+        quotes = {}
+        for index in range(0, len(symbols), self.batch_size):
+            batch = symbols[index:index + self.batch_size]
+            query = urlencode({'symbols': ','.join(batch), 'range': '1d', 'interval': '1d'})
+            quotes.update(parse_spark(self._get(f'{self._prefix}{QUOTE_PATH}?{query}')))
+        return quotes
+
+    def get_quote(self, symbol):
+        return self.get_quotes([symbol]).get(symbol.upper())
+
+    def close(self):
+        while True:
+            try:
+                self._idle.get_nowait().close()
+            except queue.Empty:
+                return
+
+
+_default_client = None
+_default_client_lock = threading.Lock()
+
+
+def default_client():
+    """进程内共享的客户端，长连接在多次轮询之间复用"""
+    global _default_client
+    with _default_client_lock:
+        if _default_client is None:
+            _default_client = QuoteClient()
+        return _default_client
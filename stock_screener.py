@@ -0,0 +1,215 @@
+#!/usr/bin/env python3
+"""
+多进程选股
+对 backfill 写入的日线（<代码>_daily.csv）按条件筛选，如收盘价高于 200 日均线、放量、创 52 周新低。
+股票分块交给进程池，每个进程把日线转为列式的 .npy 缓存并以内存映射方式读取，用 numpy 向量化计算条件，
+结果在主进程合并排序。耗时随 CPU 核数近似线性下降。
+"""
+
+import csv
+import glob
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+
+BAR_DTYPE = np.dtype([
+    ('date', 'i4'), ('open', 'f8'), ('high', 'f8'), ('low', 'f8'), ('close', 'f8'), ('volume', 'i8'),
+])
+DAILY_SUFFIX = '_daily.csv'
+
+
+class Criterion:
+    """
+    一个筛选条件
+    :param metric: 计算指标的函数 metric(bars, params)，历史不足时返回 None
+    :param passes: 判断指标是否满足条件的函数 passes(value, params)
+    :param descending: 排序时指标越大越靠前
+    """
+
+    def __init__(self, name, description, metric, passes, descending=True):
+        self.name = name
+        self.description = description
+        self.metric = metric
+        self.passes = passes
+        self.descending = descending
+
+
+def _ma_gap_percent(bars, params):
+    """最新收盘价相对 N 日均线的偏离（%）"""
+    window = params['ma_days']
+    if len(bars) < window:
+        return None
+    close = bars['close']
+    ma = close[-window:].mean()
+    return float((close[-1] / ma - 1) * 100) if ma else None
+
+
+def _volume_ratio(bars, params):
+    """最新成交量相对此前 N 日平均成交量的倍数"""
+    window = params['volume_days']
+    if len(bars) < window + 1:
+        return None
+    average = bars['volume'][-window - 1:-1].mean()
+    return float(bars['volume'][-1] / average) if average else None
+
+
+def _low_distance_percent(bars, params):
+    """最新最低价相对此前 52 周最低价的距离（%），不大于 0 即创新低"""
+    window = params['low_days']
+    if len(bars) < window:
+        return None
+    previous_low = bars['low'][-window:-1].min()
+    return float((bars['low'][-1] / previous_low - 1) * 100) if previous_low else None
+
+
+CRITERIA = {
+    criterion.name: criterion for criterion in (
+        Criterion('above_ma200', '收盘价高于 200 日均线', _ma_gap_percent,
+                  lambda value, params: value > 0),
+        Criterion('volume_spike', '成交量超过近 20 日均量的指定倍数', _volume_ratio,
+                  lambda value, params: value >= params['volume_factor']),
+        Criterion('new_52w_low', '创 52 周新低', _low_distance_percent,
+                  lambda value, params: value <= 0, descending=False),
+    )
+}
+
+DEFAULT_PARAMS = {'ma_days': 200, 'volume_days': 20, 'volume_factor': 2.0, 'low_days': 252}
+
+
+def cache_path(csv_file):
+    return csv_file[:-len('.csv')] + '.npy'
+
+
+def load_bars(csv_file):
+    """
+    以内存映射方式读取日线
+    列式缓存比 CSV 旧或不存在时先从 CSV 重建，缓存先写临时文件再替换，中断不会留下损坏的缓存。
+    """
+    cache = cache_path(csv_file)
+    if not os.path.exists(cache) or os.path.getmtime(cache) < os.path.getmtime(csv_file):
+        with open(csv_file, 'r', newline='', encoding='utf-8') as file:
+            reader = csv.reader(file)
+            next(reader, None)
+            bars = np.array([
+                (int(row[0].replace('-', '')), float(row[1]), float(row[2]), float(row[3]), float(row[4]), int(float(row[5])))
+                for row in reader if row
+            ], dtype=BAR_DTYPE)
+        temp = f'{cache}.{os.getpid()}.tmp'
+        with open(temp, 'wb') as file:
+            np.save(file, bars)
+        os.replace(temp, cache)
+    return np.load(cache, mmap_mode='r')
+
+
+def screen_symbols(data_dir, symbols, criteria, params):
+    """
+    在一个进程内筛选一组股票，进程池的工作函数
+    :return: 满足全部条件的股票 [{symbol, date, close, 各条件指标}]
+    """
+    matches = []
+    for symbol in symbols:
+        csv_file = os.path.join(data_dir, f'{symbol}{DAILY_SUFFIX}')
+        try:
+            bars = load_bars(csv_file)
+        except (OSError, ValueError, IndexError):
+            continue
+        if not len(bars):
+            continue
+
+        row = {}
+        for name in criteria:
+            criterion = CRITERIA[name]
+            value = criterion.metric(bars, params)
+            if value is None or not criterion.passes(value, params):
+                break
+            row[name] = round(value, 4)
+        else:
+            date = str(int(bars['date'][-1]))
+            matches.append({
+                'symbol': symbol,
+                'date': f'{date[:4]}-{date[4:6]}-{date[6:]}',
+                'close': float(bars['close'][-1]),
+                **row,
+            })
+    return matches
+
+
+def stored_symbols(data_dir):
+    """数据目录中已有日线的股票"""
+    paths = glob.glob(os.path.join(glob.escape(data_dir), f'*{DAILY_SUFFIX}'))
+    return sorted(os.path.basename(path)[:-len(DAILY_SUFFIX)] for path in paths)
+
+
+class Screener:
+    def __init__(self, criteria, symbols=None, data_dir="./stock_data", workers=None, params=None):
+        """
+        :param criteria: 条件名列表（见 CRITERIA），股票须满足全部条件，按第一个条件的指标排序
+        :param symbols: 股票代码，默认为数据目录中所有有日线的股票
+        :param workers: 进程数，默认为 CPU 核数；为 1 时在当前进程内执行
+        """
+        unknown = [name for name in criteria if name not in CRITERIA]
+        if not criteria or unknown:
+            raise ValueError(f"未知的筛选条件: {', '.join(unknown) or '（空）'}")
+        self.criteria = list(criteria)
+        self.data_dir = data_dir
+        self.symbols = [symbol.upper() for symbol in symbols] if symbols else stored_symbols(data_dir)
+        self.workers = workers or os.cpu_count() or 1
+        self.params = {**DEFAULT_PARAMS, **(params or {})}
+
+    def chunks(self):
+        """每个进程分到若干块，块数多于进程数使负载更均衡"""
+        if not self.symbols:
+            return []
+        count = min(len(self.symbols), self.workers * 4) or 1
+        size = -(-len(self.symbols) // count)
+        return [self.symbols[index:index + size] for index in range(0, len(self.symbols), size)]
+
+    def run(self):
+        """
+        执行筛选
+        :return: 按第一个条件排序的结果、股票数与耗时
+        """
+        started = time.perf_counter()
+        matches = []
+        chunks = self.chunks()
+        # 没有日线时不启动进程池
+        if self.workers == 1 or not chunks:
+            for chunk in chunks:
+                matches.extend(screen_symbols(self.data_dir, chunk, self.criteria, self.params))
+        else:
+            with ProcessPoolExecutor(max_workers=self.workers) as executor:
+                futures = [
+                    executor.submit(screen_symbols, self.data_dir, chunk, self.criteria, self.params)
+                    for chunk in chunks
+                ]
+                for future in as_completed(futures):
+                    matches.extend(future.result())
+
+        primary = CRITERIA[self.criteria[0]]
+        matches.sort(key=lambda row: (-row[primary.name] if primary.descending else row[primary.name], row['symbol']))
+        return {
+            'matches': matches,
+            'symbols': len(self.symbols),
+            'seconds': time.perf_counter() - started,
+        }
+
+
+def print_report(criteria, report, limit=50):
+    """打印排名"""
+    print(f"筛选 {report['symbols']:,} 只股票，条件: {'、'.join(CRITERIA[name].description for name in criteria)}")
+    print(f"命中 {len(report['matches']):,} 只，用时 {report['seconds']:.2f} 秒")
+    print(f"{'排名':>4}  {'代码':<12} {'日期':<10} {'收盘价':>10}  " + '  '.join(f'{name:>14}' for name in criteria))
+    for rank, row in enumerate(report['matches'][:limit], 1):
+        print(f"{rank:>4}  {row['symbol']:<12} {row['date']:<10} {row['close']:>10.2f}  "
+              + '  '.join(f'{row[name]:>14.2f}' for name in criteria))
+
+
+def write_report(path, criteria, report):
+    """把完整排名写入 CSV"""
+    with open(path, 'w', newline='', encoding='utf-8') as file:
+        writer = csv.writer(file)
+        writer.writerow(['rank', 'symbol', 'date', 'close', *criteria])
+        for rank, row in enumerate(report['matches'], 1):
+            writer.writerow([rank, row['symbol'], row['date'], row['close'], *(row[name] for name in criteria)])
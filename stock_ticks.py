@@ -0,0 +1,224 @@
+#!/usr/bin/env python3
+"""
+价格记录的压缩归档格式
+
+归档文件以 MAGIC 开头，之后是若干按时间顺序追加的块。每个块包含：
+  - 块摘要：记录数、首末时间戳、收盘价与成交量的最小/最大值及总和、最后收盘价
+  - 负载长度与负载：每条记录各字段相对上一条记录的差值，经 zigzag 后以 varint 编码
+
+价格按分（乘以 100 的整数）存储，时间戳存为微秒整数，解码后与 StockDataLogger 写入的 CSV 文本一致。
+统计只需读取块摘要，负载直接 seek() 跳过，不必读入或解码。
+"""
+
+import os
+from datetime import datetime, timedelta
+
+MAGIC = b'STK1'
+BLOCK_ROWS = 4096
+
+EPOCH = datetime(1970, 1, 1)
+PRICE_FIELDS = ('open', 'high', 'low', 'close')
+CHANGE_FIELDS = ('price_change', 'change_percentage')
+
+# 一条记录编码为整数元组：(时间戳微秒, 开, 高, 低, 收, 成交量, 涨跌额, 涨跌幅)，价格单位为分
+CLOSE, VOLUME = 4, 5
+# 块摘要字段，顺序即编码顺序
+SUMMARY_FIELDS = (
+    'count', 'first_ts', 'last_ts', 'min_close', 'max_close',
+    'min_volume', 'max_volume', 'close_sum', 'volume_sum', 'last_close',
+)
+
+
+def _cents(value):
+    return round(float(value) * 100)
+
+
+def record_to_tick(record):
+    """CSV 记录（字典）转为整数元组"""
+    moment = datetime.fromisoformat(record['timestamp'])
+    return (
+        (moment - EPOCH) // timedelta(microseconds=1),
+        *(_cents(record[field]) for field in PRICE_FIELDS),
+        int(record['volume']),
+        *(_cents(record[field]) for field in CHANGE_FIELDS),
+    )
+
+
+def tick_to_record(tick):
+    """整数元组还原为与 CSV 相同格式的记录（字典，值为字符串）"""
+    moment = EPOCH + timedelta(microseconds=tick[0])
+    record = {
+        'timestamp': moment.isoformat(),
+        'date': moment.strftime('%Y-%m-%d'),
+        'time': moment.strftime('%H:%M:%S'),
+    }
+    for field, value in zip(PRICE_FIELDS, tick[1:5]):
+        record[field] = str(value / 100)
+    record['volume'] = str(tick[VOLUME])
+    for field, value in zip(CHANGE_FIELDS, tick[6:8]):
+        record[field] = str(value / 100)
+    return record
+
+
+def timestamp_date(ts):
+    """微秒时间戳对应的日期字符串"""
+    return (EPOCH + timedelta(microseconds=ts)).strftime('%Y-%m-%d')
+
+
+def _write_varint(out, value):
+    while value > 0x7f:
+        out.append((value & 0x7f) | 0x80)
+        value >>= 7
+    out.append(value)
+
+
+def _read_varint(data, offset):
+    result = shift = 0
+    while True:
+        byte = data[offset]
+        offset += 1
+        result |= (byte & 0x7f) << shift
+        if byte < 0x80:
+            return result, offset
+        shift += 7
+
+
+def encode_block(ticks):
+    """把一组记录编码为一个块（摘要 + 差值负载）"""
+    payload = bytearray()
+    previous = (0,) * 8
+    for tick in ticks:
+        for value, last in zip(tick, previous):
+            delta = value - last
+            _write_varint(payload, delta << 1 if delta >= 0 else (-delta << 1) - 1)
+        previous = tick
+
+    closes = [tick[CLOSE] for tick in ticks]
+    volumes = [tick[VOLUME] for tick in ticks]
+    summary = (
+        len(ticks), ticks[0][0], ticks[-1][0], min(closes), max(closes),
+        min(volumes), max(volumes), sum(closes), sum(volumes), closes[-1],
+    )
+    block = bytearray()
+    for value in summary:
+        _write_varint(block, value)
+    _write_varint(block, len(payload))
+    return bytes(block + payload)
+
+
+def _read_varint_from(file):
+    """从文件当前位置读取一个 varint，已到文件末尾时返回 None"""
+    result = shift = 0
+    while True:
+        byte = file.read(1)
+        if not byte:
+            if shift:
+                raise ValueError('价格归档文件不完整')
+            return None
+        result |= (byte[0] & 0x7f) << shift
+        if byte[0] < 0x80:
+            return result
+        shift += 7
+
+
+def _iter_blocks(file):
+    """
+    逐块返回 (摘要字典, 负载起始偏移, 负载结束偏移)
+    只读取块头，负载通过 seek() 跳过，调用方需要负载时自行 seek 到起始偏移读取
+    """
+    if file.read(len(MAGIC)) != MAGIC:
+        raise ValueError('不是有效的价格归档文件')
+    size = file.seek(0, os.SEEK_END)
+    file.seek(len(MAGIC))
+    while True:
+        first = _read_varint_from(file)
+        if first is None:
+            return
+        values = [first]
+        for _ in SUMMARY_FIELDS[1:]:
+            values.append(_read_varint_from(file))
+        length = _read_varint_from(file)
+        if None in values or length is None:
+            raise ValueError('价格归档文件不完整')
+        start = file.tell()
+        end = start + length
+        if end > size:
+            raise ValueError('价格归档文件不完整')
+        yield dict(zip(SUMMARY_FIELDS, values)), start, end
+        file.seek(end)
+
+
+def decode_block(data, start, end):
+    """解码块负载，返回整数元组列表"""
+    ticks = []
+    previous = [0] * 8
+    offset = start
+    while offset < end:
+        current = []
+        for last in previous:
+            value, offset = _read_varint(data, offset)
+            current.append(last + ((value >> 1) if not value & 1 else -((value + 1) >> 1)))
+        ticks.append(tuple(current))
+        previous = current
+    return ticks
+
+
+def read_summaries(path):
+    """返回归档中全部块的摘要，只读取块头，I/O 与内存开销只随块数增长"""
+    if not os.path.exists(path) or not os.path.getsize(path):
+        return []
+    with open(path, 'rb') as file:
+        return [summary for summary, _, _ in _iter_blocks(file)]
+
+
+def iter_ticks(path):
+    """按时间顺序返回归档中的全部记录（整数元组），每次只读入一个块的负载"""
+    if not os.path.exists(path) or not os.path.getsize(path):
+        return
+    with open(path, 'rb') as file:
+        for _, start, end in _iter_blocks(file):
+            file.seek(start)
+            yield from decode_block(file.read(end - start), 0, end - start)
+
+
+def append_ticks(path, ticks, block_rows=BLOCK_ROWS):
+    """
+    把记录按块追加到归档文件末尾并写入磁盘
+    :param ticks: 按时间顺序的整数元组，可以是生成器，每凑满 block_rows 条写出一块
+    :return: 追加的记录数
+    """
+    count = 0
+    block = []
+    with open(path, 'ab') as file:
+        if file.tell() == 0:
+            file.write(MAGIC)
+        for tick in ticks:
+            block.append(tick)
+            if len(block) >= block_rows:
+                file.write(encode_block(block))
+                count += len(block)
+                block = []
+        if block:
+            file.write(encode_block(block))
+            count += len(block)
+        file.flush()
+        os.fsync(file.fileno())
+    return count
+
+
+def summarize(summaries):
+    """合并多个块摘要"""
+    if not summaries:
+        return None
+    return {
+        'count': sum(s['count'] for s in summaries),
+        'first_ts': summaries[0]['first_ts'],
+        'last_ts': summaries[-1]['last_ts'],
+        'min_close': min(s['min_close'] for s in summaries),
+        'max_close': max(s['max_close'] for s in summaries),
+        'min_volume': min(s['min_volume'] for s in summaries),
+        'max_volume': max(s['max_volume'] for s in summaries),
+        'close_sum': sum(s['close_sum'] for s in summaries),
+        'volume_sum': sum(s['volume_sum'] for s in summaries),
+        'last_close': summaries[-1]['last_close'],
+    }
@@ -0,0 +1,226 @@
+#!/usr/bin/env python3
+"""
+内存中的实时价格窗口
+每只股票一个定长环形缓冲区，底层为 array（每条记录固定 40 字节），内存上限只取决于容量，
+不随运行时间增长。追加、过期以及窗口内最小值/最大值/总和均为均摊 O(1)：
+总和随进出窗口增减，最小值/最大值用单调队列维护。
+"""
+
+import sys
+from array import array
+
+
+class Tick:
+    __slots__ = ('timestamp', 'price', 'volume')
+
+    def __init__(self, timestamp, price, volume=0):
+        self.timestamp = timestamp
+        self.price = price
+        self.volume = volume
+
+    def __repr__(self):
+        return f"Tick({self.timestamp!r}, {self.price!r}, {self.volume!r})"
+
+
+class _MonotonicQueue:
+    """
+    窗口内价格的单调队列，存放记录序号；队首即窗口内的最小值（或最大值）
+    元素数不超过窗口容量，同样使用定长 array 存储。
+    """
+    __slots__ = ('_seqs', '_head', '_size', '_capacity', '_prefer')
+
+    def __init__(self, capacity, prefer):
+        self._seqs = array('q', bytes(8 * capacity))
+        self._head = 0
+        self._size = 0
+        self._capacity = capacity
+        # prefer(a, b) 为真时 a 优于 b，新值会淘汰队尾不优于它的值
+        self._prefer = prefer
+
+    def push(self, seq, price, prices):
+        capacity = self._capacity
+        while self._size and not self._prefer(prices[self._seqs[(self._head + self._size - 1) % capacity] % capacity], price):
+            self._size -= 1
+        self._seqs[(self._head + self._size) % capacity] = seq
+        self._size += 1
+
+    def evict(self, seq):
+        """记录 seq 离开窗口"""
+        if self._size and self._seqs[self._head] == seq:
+            self._head = (self._head + 1) % self._capacity
+            self._size -= 1
+
+    def front(self):
+        return self._seqs[self._head] if self._size else None
+
+    def clear(self):
+        self._head = self._size = 0
+
+
+def _less(a, b):
+    return a < b
+
+
+def _greater(a, b):
+    return a > b
+
+
+class TickWindow:
+    """
+    单只股票最近 window_seconds 秒内的价格
+    :param window_seconds: 窗口长度，早于 最新时间 - window_seconds 的记录被移出
+    :param capacity: 最多保留的记录数，超出时移出最旧的记录
+    """
+    __slots__ = (
+        'window_seconds', 'capacity', '_timestamps', '_prices', '_volumes',
+        '_first_seq', '_next_seq', '_price_sum', '_volume_sum', '_min', '_max',
+    )
+
+    def __init__(self, window_seconds=3600, capacity=256):
+        if capacity < 1:
+            raise ValueError('capacity 必须大于 0')
+        self.window_seconds = window_seconds
+        self.capacity = capacity
+        self._timestamps = array('d', bytes(8 * capacity))
+        self._prices = array('d', bytes(8 * capacity))
+        self._volumes = array('q', bytes(8 * capacity))
+        # 记录按递增序号编号，位置为 序号 % capacity；窗口内为 [_first_seq, _next_seq)
+        self._first_seq = 0
+        self._next_seq = 0
+        self._price_sum = 0.0
+        self._volume_sum = 0
+        self._min = _MonotonicQueue(capacity, _less)
+        self._max = _MonotonicQueue(capacity, _greater)
+
+    def __len__(self):
+        return self._next_seq - self._first_seq
+
+    def append(self, timestamp, price, volume=0):
+        """追加一条记录，timestamp 为秒（如 time.time()），必须不早于上一条"""
+        if len(self) and timestamp < self._timestamps[(self._next_seq - 1) % self.capacity]:
+            raise ValueError('记录必须按时间顺序追加')
+        if len(self) == self.capacity:
+            self._evict_oldest()
+
+        seq = self._next_seq
+        slot = seq % self.capacity
+        self._timestamps[slot] = timestamp
+        self._prices[slot] = price
+        self._volumes[slot] = volume
+        self._next_seq += 1
+        self._price_sum += price
+        self._volume_sum += volume
+        self._min.push(seq, price, self._prices)
+        self._max.push(seq, price, self._prices)
+        self.expire(timestamp)
+
+    def expire(self, now):
+        """移出早于 now - window_seconds 的记录"""
+        cutoff = now - self.window_seconds
+        while len(self) and self._timestamps[self._first_seq % self.capacity] < cutoff:
+            self._evict_oldest()
+
+    def _evict_oldest(self):
+        seq = self._first_seq
+        slot = seq % self.capacity
+        self._price_sum -= self._prices[slot]
+        self._volume_sum -= self._volumes[slot]
+        self._min.evict(seq)
+        self._max.evict(seq)
+        self._first_seq += 1
+        if not len(self):
+            # 窗口清空时归零，避免浮点累加误差长期积累
+            self._price_sum = 0.0
+            self._volume_sum = 0
+
+    def _tick(self, seq):
+        slot = seq % self.capacity
+        return Tick(self._timestamps[slot], self._prices[slot], self._volumes[slot])
+
+    def __iter__(self):
+        """从旧到新返回窗口内的记录"""
+        for seq in range(self._first_seq, self._next_seq):
+            yield self._tick(seq)
+
+    def first(self):
+        return self._tick(self._first_seq) if len(self) else None
+
+    def last(self):
+        return self._tick(self._next_seq - 1) if len(self) else None
+
+    def min(self):
+        seq = self._min.front()
+        return None if seq is None else self._prices[seq % self.capacity]
+
+    def max(self):
+        seq = self._max.front()
+        return None if seq is None else self._prices[seq % self.capacity]
+
+    def sum(self):
+        return self._price_sum
+
+    def volume_sum(self):
+        return self._volume_sum
+
+    def mean(self):
+        return self._price_sum / len(self) if len(self) else None
+
+    def change_percent(self):
+        """最新价相对窗口内最早价格的涨跌幅（%）"""
+        if len(self) < 2 or not self.first().price:
+            return None
+        return (self.last().price / self.first().price - 1) * 100
+
+    def drawdown_percent(self):
+        """最新价相对窗口内最高价的回撤（%，不大于 0），用于"一小时内下跌 5%"这类提醒"""
+        high = self.max()
+        if not len(self) or not high:
+            return None
+        return (self.last().price / high - 1) * 100
+
+    def summary(self):
+        """窗口统计，供状态输出"""
+        if not len(self):
+            return {'count': 0}
+        return {
+            'count': len(self),
+            'min': self.min(),
+            'max': self.max(),
+            'mean': round(self.mean(), 4),
+            'change_percent': self.change_percent(),
+            'drawdown_percent': self.drawdown_percent(),
+        }
+
+    def memory_bytes(self):
+        """缓冲区占用的字节数（与已追加的记录数无关）"""
+        buffers = (self._timestamps, self._prices, self._volumes, self._min._seqs, self._max._seqs)
+        return sys.getsizeof(self) + sum(sys.getsizeof(buffer) for buffer in buffers)
+
+
+class TickWindows:
+    """按股票代码管理 TickWindow，所有股票使用相同的窗口长度和容量"""
+
+    def __init__(self, symbols=(), window_seconds=3600, capacity=256):
+        self.window_seconds = window_seconds
+        self.capacity = capacity
+        self._windows = {}
+        # 预先创建，多线程分别写入不同股票时不需要加锁
+        for symbol in symbols:
+            self.get(symbol)
+
+    def get(self, symbol):
+        window = self._windows.get(symbol)
+        if window is None:
+            window = self._windows[symbol] = TickWindow(self.window_seconds, self.capacity)
+        return window
+
+    def append(self, symbol, timestamp, price, volume=0):
+        window = self.get(symbol)
+        window.append(timestamp, price, volume)
+        return window
+
+    def __len__(self):
+        return len(self._windows)
+
+    def memory_bytes(self):
+        return sum(window.memory_bytes() for window in self._windows.values())
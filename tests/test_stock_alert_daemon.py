@@ -0,0 +1,52 @@
+import io
+import os
+import tempfile
+import unittest
+from contextlib import redirect_stdout
+from unittest import mock
+
+from stock_alert_daemon import AlertDaemon, WatchedSymbol
+from stock_quotes import Quote
+
+
+class AlertDaemonTests(unittest.TestCase):
+    def setUp(self):
+        temp = tempfile.TemporaryDirectory()
+        self.addCleanup(temp.cleanup)
+        self.state_path = os.path.join(temp.name, 'alert_state.sqlite3')
+        self.watched = WatchedSymbol('AAPL', low=10.0, high=20.0)
+
+    def daemon(self, watchlist=None):
+        daemon = AlertDaemon(watchlist or [self.watched], state_path=self.state_path, status_socket=None)
+        self.addCleanup(daemon.store.close)
+        return daemon
+
+    def quotes(self, price):
+        return {'AAPL': Quote('AAPL', price, price, 0)}
+
+    def test_state_is_saved_before_notifying(self):
+        with mock.patch('stock_alert_daemon.send_notification', side_effect=SystemExit), redirect_stdout(io.StringIO()):
+            with self.assertRaises(SystemExit):
+                self.daemon().check_symbol(self.watched, self.quotes(25.0))
+
+        # 发送时进程被终止，重启后区间已记录，不会再次提醒
+        with mock.patch('stock_alert_daemon.send_notification') as send, redirect_stdout(io.StringIO()):
+            self.daemon().check_symbol(self.watched, self.quotes(25.5))
+        send.assert_not_called()
+
+    def test_one_failing_symbol_does_not_stop_the_others(self):
+        bad = WatchedSymbol('BAD', low=10.0, high=20.0)
+        daemon = self.daemon([bad, self.watched])
+
+        def fetch_quotes():
+            # 只运行一轮
+            daemon.stop()
+            return {'BAD': Quote('BAD', 'N/A'), **self.quotes(25.0)}
+
+        with mock.patch.object(daemon, 'fetch_quotes', fetch_quotes), \
+                mock.patch('stock_alert_daemon.send_notification') as send, redirect_stdout(io.StringIO()) as output:
+            daemon.run()
+
+        self.assertEqual(send.call_count, 1)
+        self.assertIn('AAPL', send.call_args[0][0])
+        self.assertIn('检查 BAD 时出错', output.getvalue())
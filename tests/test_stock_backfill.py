@@ -0,0 +1,126 @@
+import csv
+import os
+import tempfile
+import threading
+import time
+import unittest
+from datetime import timedelta
+
+from benchmarks.replay import ReplayProvider
+from stock_backfill import Backfill, frame_rows
+
+
+class ScriptedProvider:
+    """
+    包装 ReplayProvider：记录每次下载的块，可按块起始日期延迟或失败
+    :param delays: {起始日期: 秒}
+    :param failures: 下载失败的块起始日期集合
+    """
+
+    def __init__(self, replay, delays=None, failures=()):
+        self.replay = replay
+        self.delays = delays or {}
+        self.failures = set(failures)
+        self.calls = []
+        self.finished = []
+        self._lock = threading.Lock()
+
+    def Ticker(self, symbol):
+        return ScriptedTicker(self, symbol)
+
+
+class ScriptedTicker:
+    def __init__(self, provider, symbol):
+        self.provider = provider
+        self.symbol = symbol
+
+    def history(self, start=None, end=None, interval='1d'):
+        provider = self.provider
+        with provider._lock:
+            provider.calls.append((self.symbol, start, end))
+        time.sleep(provider.delays.get(start, 0))
+        if start in provider.failures:
+            raise ConnectionError(f'下载 {start} 失败')
+        frame = provider.replay.Ticker(self.symbol).history(start=start, end=end, interval=interval)
+        with provider._lock:
+            provider.finished.append((self.symbol, start))
+        return frame
+
+
+class BackfillTests(unittest.TestCase):
+    def setUp(self):
+        temp = tempfile.TemporaryDirectory()
+        self.addCleanup(temp.cleanup)
+        self.data_dir = temp.name
+        self.replay = ReplayProvider(days=120, seed=7)
+        bars = self.replay.Ticker('AAPL')._bars
+        self.start = bars[0]['Date']
+        self.end = bars[-1]['Date'] + timedelta(days=1)
+
+    def backfill(self, provider, end=None, symbols=('AAPL',), **kwargs):
+        options = {'chunk_days': 30, 'workers': 4, 'retries': 1}
+        options.update(kwargs)
+        return Backfill(symbols, self.start, end or self.end, data_dir=self.data_dir, provider=provider, **options)
+
+    def expected_rows(self, symbol, end=None):
+        frame = self.replay.Ticker(symbol).history(start=self.start.isoformat(), end=(end or self.end).isoformat())
+        return [[str(value) for value in row] for row in frame_rows(frame)]
+
+    def stored_rows(self, symbol):
+        with open(os.path.join(self.data_dir, f'{symbol}_daily.csv'), newline='', encoding='utf-8') as file:
+            reader = csv.reader(file)
+            self.assertEqual(next(reader), ['date', 'open', 'high', 'low', 'close', 'volume'])
+            return list(reader)
+
+    def test_resumes_after_last_stored_date(self):
+        middle = self.start + timedelta(days=80)
+        first = self.backfill(self.replay, end=middle).run(verbose=False)
+        self.assertEqual(self.stored_rows('AAPL'), self.expected_rows('AAPL', end=middle))
+
+        provider = ScriptedProvider(self.replay)
+        second = self.backfill(provider).run(verbose=False)
+
+        # 第二次只下载最后日期之后的部分，两次合计与一次完整回填相同
+        last_stored = self.expected_rows('AAPL', end=middle)[-1][0]
+        self.assertTrue(all(start > last_stored for _, start, _ in provider.calls))
+        self.assertEqual(self.stored_rows('AAPL'), self.expected_rows('AAPL'))
+        self.assertEqual(first['rows'] + second['rows'], len(self.expected_rows('AAPL')))
+
+        # 已是最新时不再下载
+        provider = ScriptedProvider(self.replay)
+        self.assertEqual(self.backfill(provider).run(verbose=False)['rows'], 0)
+        self.assertEqual(provider.calls, [])
+
+    def test_out_of_order_chunks_are_written_in_date_order(self):
+        chunks = self.backfill(self.replay).plan()['AAPL'][2]
+        # 越早的块完成得越晚
+        delays = {start.isoformat(): 0.03 * (len(chunks) - index) for index, (start, _) in enumerate(chunks)}
+        provider = ScriptedProvider(self.replay, delays=delays)
+
+        summary = self.backfill(provider, symbols=('AAPL', 'MSFT'), workers=len(chunks) * 2).run(verbose=False)
+
+        aapl_finished = [start for symbol, start in provider.finished if symbol == 'AAPL']
+        self.assertNotEqual(aapl_finished, sorted(aapl_finished))
+        for symbol in ('AAPL', 'MSFT'):
+            self.assertEqual(self.stored_rows(symbol), self.expected_rows(symbol))
+        self.assertEqual(summary['failed'], {})
+        self.assertEqual(summary['chunks'], len(chunks) * 2)
+
+    def test_failed_chunk_stops_without_gaps_or_duplicates(self):
+        chunks = self.backfill(self.replay).plan()['AAPL'][2]
+        failed_start = chunks[2][0]
+        # 失败先于之前的块返回，之前的块仍应写入
+        delays = {start.isoformat(): 0.05 for start, _ in chunks[:2]}
+        provider = ScriptedProvider(self.replay, delays=delays, failures={failed_start.isoformat()})
+
+        summary = self.backfill(provider).run(verbose=False)
+
+        self.assertIn('AAPL', summary['failed'])
+        # 失败块之前的数据完整写入，之后已下载的块不写入
+        self.assertEqual(self.stored_rows('AAPL'), self.expected_rows('AAPL', end=failed_start))
+
+        self.backfill(self.replay).run(verbose=False)
+        rows = self.stored_rows('AAPL')
+        dates = [row[0] for row in rows]
+        self.assertEqual(dates, sorted(set(dates)))
+        self.assertEqual(rows, self.expected_rows('AAPL'))
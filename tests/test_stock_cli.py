@@ -0,0 +1,58 @@
+import csv
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import unittest
+from datetime import datetime
+
+from benchmarks.startup import HEAVY_MODULES, ROOT_DIR
+from stock_data_logger import StockDataLogger
+from tests.test_stock_ticks import make_record
+
+# 在子进程中执行命令，结束后把已导入的模块名写入文件
+RUN_AND_LIST_MODULES = '''
+import json, sys
+import stock_cli
+try:
+    stock_cli.main(sys.argv[2:])
+except SystemExit:
+    pass
+finally:
+    with open(sys.argv[1], 'w') as file:
+        json.dump(sorted(sys.modules), file)
+'''
+
+
+class OfflineCommandImportTests(unittest.TestCase):
+    def setUp(self):
+        temp = tempfile.TemporaryDirectory()
+        self.addCleanup(temp.cleanup)
+        self.temp_dir = temp.name
+        self.data_dir = os.path.join(temp.name, 'stock_data')
+        logger = StockDataLogger('AAPL', data_dir=self.data_dir)
+        records = [make_record(datetime(2024, 1, 2, 9, 30 + minute), 10.5 + minute, 1000, 0.25) for minute in range(3)]
+        with open(logger.csv_file, 'a', newline='', encoding='utf-8') as file:
+            writer = csv.DictWriter(file, fieldnames=list(records[0]))
+            writer.writerows(records)
+
+    def imported_modules(self, *args):
+        modules_path = os.path.join(self.temp_dir, 'modules.json')
+        result = subprocess.run(
+            [sys.executable, '-c', RUN_AND_LIST_MODULES, modules_path, *args],
+            cwd=ROOT_DIR, capture_output=True, text=True, timeout=60,
+        )
+        self.assertEqual(result.returncode, 0, result.stderr)
+        with open(modules_path, encoding='utf-8') as file:
+            return {module.split('.')[0] for module in json.load(file)}, result.stdout
+
+    def test_offline_commands_do_not_import_heavy_modules(self):
+        for args in (['--help'], ['stats', '--symbol', 'AAPL', '--data-dir', self.data_dir],
+                     ['latest', '--symbol', 'AAPL', '--data-dir', self.data_dir]):
+            with self.subTest(command=args[0]):
+                modules, output = self.imported_modules(*args)
+                self.assertTrue(output.strip())
+                self.assertEqual(modules & set(HEAVY_MODULES), set())
+                if args[0] != '--help':
+                    self.assertIn('stock_data_logger', modules)
@@ -0,0 +1,62 @@
+import os
+import tempfile
+import unittest
+
+from stock_history import iter_lines_reverse, read_header, records_since, tail_records
+
+HEADER = 'timestamp,close\n'
+
+
+class TailReaderTests(unittest.TestCase):
+    def setUp(self):
+        temp = tempfile.TemporaryDirectory()
+        self.addCleanup(temp.cleanup)
+        self.path = os.path.join(temp.name, 'history.csv')
+
+    def write(self, text):
+        with open(self.path, 'w', encoding='utf-8', newline='') as file:
+            file.write(text)
+
+    def test_file_smaller_than_one_block(self):
+        self.write(HEADER + '2024-01-01T09:30:00,10.0\n2024-01-01T09:35:00,10.5\n')
+
+        self.assertEqual(tail_records(self.path, 5), [
+            {'timestamp': '2024-01-01T09:30:00', 'close': '10.0'},
+            {'timestamp': '2024-01-01T09:35:00', 'close': '10.5'},
+        ])
+        self.assertEqual(tail_records(self.path, 1)[0]['close'], '10.5')
+
+    def test_missing_trailing_newline_and_crlf(self):
+        self.write(HEADER + '2024-01-01T09:30:00,10.0\r\n2024-01-01T09:35:00,10.5')
+
+        self.assertEqual([record['close'] for record in tail_records(self.path, 2)], ['10.0', '10.5'])
+
+    def test_header_only_and_missing_file(self):
+        self.write(HEADER)
+        self.assertEqual(tail_records(self.path, 3), [])
+        self.assertEqual(tail_records(self.path + '.missing', 3), [])
+
+    def test_record_spanning_block_boundary(self):
+        rows = [f'2024-01-01T09:{minute:02d}:00,{minute}.5' for minute in range(60)]
+        self.write(HEADER + '\n'.join(rows) + '\n')
+        _, header_size = read_header(self.path)
+
+        # 每个块大小都会让若干行跨越块边界
+        for block_size in (7, 16, 33, 64 * 1024):
+            lines = list(iter_lines_reverse(self.path, stop=header_size, block_size=block_size))
+            self.assertEqual(lines, rows[::-1], block_size)
+
+    def test_record_spanning_default_block_boundary(self):
+        # 第二条记录跨越文件末尾向前 64 KiB 的位置
+        padding = 'x' * (64 * 1024 - 20)
+        self.write(HEADER + '2024-01-01T09:30:00,1.0\n' + f'2024-01-01T09:35:00,{padding}\n' + '2024-01-01T09:40:00,3.0\n')
+
+        records = tail_records(self.path, 3)
+
+        self.assertEqual([record['timestamp'][-8:] for record in records], ['09:30:00', '09:35:00', '09:40:00'])
+        self.assertEqual(records[1]['close'], padding)
+
+    def test_records_since_stops_at_older_records(self):
+        self.write(HEADER + ''.join(f'2024-01-0{day}T15:00:00,{day}\n' for day in range(1, 6)))
+
+        self.assertEqual([record['close'] for record in records_since(self.path, '2024-01-04')], ['4', '5'])
@@ -0,0 +1,132 @@
+import http.client
+import json
+import unittest
+
+from stock_quotes import QuoteClient, parse_spark
+
+
+class StubResponse:
+    def __init__(self, body, status=200, will_close=False):
+        self.body = body
+        self.status = status
+        self.will_close = will_close
+
+    def read(self):
+        return self.body
+
+
+class StubConnection:
+    """按预设结果应答的连接：结果为异常时在 getresponse() 中抛出"""
+
+    def __init__(self, outcomes):
+        self.outcomes = list(outcomes)
+        self.requests = []
+        self.closed = False
+
+    def request(self, method, path, headers=None):
+        self.requests.append(path)
+
+    def getresponse(self):
+        outcome = self.outcomes.pop(0)
+        if isinstance(outcome, Exception):
+            raise outcome
+        return outcome
+
+    def close(self):
+        self.closed = True
+
+
+def spark_body(symbol, price, previous_close=None):
+    meta = {'symbol': symbol, 'regularMarketPrice': price, 'regularMarketTime': 1700000000}
+    if previous_close is not None:
+        meta['previousClose'] = previous_close
+    return json.dumps({'spark': {'result': [{'symbol': symbol, 'response': [{'meta': meta}]}]}}).encode()
+
+
+class ParseSparkTests(unittest.TestCase):
+    def test_spark_result_format(self):
+        payload = json.dumps({'spark': {'result': [
+            {'symbol': 'AAPL', 'response': [{'meta': {
+                'symbol': 'AAPL', 'regularMarketPrice': 190.5, 'previousClose': 188.0, 'regularMarketTime': 1700000000,
+            }}]},
+            # 没有 regularMarketPrice 时取最后一个非空收盘价
+            {'symbol': 'MSFT', 'response': [{
+                'meta': {'symbol': 'MSFT', 'chartPreviousClose': 370.0},
+                'indicators': {'quote': [{'close': [371.0, 372.5, None]}]},
+            }]},
+        ]}})
+
+        quotes = parse_spark(payload)
+
+        self.assertEqual(set(quotes), {'AAPL', 'MSFT'})
+        self.assertEqual((quotes['AAPL'].price, quotes['AAPL'].previous_close), (190.5, 188.0))
+        self.assertEqual(quotes['AAPL'].timestamp, 1700000000)
+        self.assertAlmostEqual(quotes['AAPL'].change, 2.5)
+        self.assertEqual((quotes['MSFT'].price, quotes['MSFT'].previous_close), (372.5, 370.0))
+
+    def test_keyed_by_symbol_format(self):
+        payload = json.dumps({
+            'AAPL': {'symbol': 'AAPL', 'close': [189.0, 190.0], 'timestamp': [1, 2], 'previousClose': 200.0},
+            'error': None,
+        })
+
+        [quote] = parse_spark(payload).values()
+
+        self.assertEqual((quote.symbol, quote.price, quote.timestamp), ('AAPL', 190.0, 2))
+        self.assertAlmostEqual(quote.change_percent, -5.0)
+
+    def test_symbols_without_price_are_skipped(self):
+        payload = json.dumps({'spark': {'result': [
+            {'symbol': 'GONE', 'response': [{'meta': {'symbol': 'GONE'}, 'indicators': {'quote': [{'close': [None]}]}}]},
+            {'symbol': 'EMPTY', 'response': []},
+        ]}})
+        self.assertEqual(parse_spark(payload), {})
+
+        keyed = json.dumps({'GONE': {'symbol': 'GONE', 'close': [None, None]}, 'NONE': {'symbol': 'NONE'}})
+        self.assertEqual(parse_spark(keyed), {})
+
+
+class QuoteClientTests(unittest.TestCase):
+    def client(self, *connections):
+        client = QuoteClient('http://quotes.test', pool_size=4)
+        pending = list(connections)
+        client._connection_class = lambda host, timeout: pending.pop(0)
+        return client
+
+    def test_connections_are_reused(self):
+        connection = StubConnection([StubResponse(spark_body('AAPL', 1.0)), StubResponse(spark_body('AAPL', 2.0))])
+        client = self.client(connection)
+
+        self.assertEqual(client.get_quote('aapl').price, 1.0)
+        self.assertEqual(client.get_quote('AAPL').price, 2.0)
+        self.assertEqual(client.connections_opened, 1)
+        self.assertIn('symbols=AAPL', connection.requests[0])
+
+    def test_stale_pooled_connection_is_replaced_by_a_fresh_one(self):
+        # 池中的两条空闲连接都已被服务端关闭，重试必须新建连接而不是取池中的下一条
+        stale = [StubConnection([http.client.RemoteDisconnected('closed')]) for _ in range(2)]
+        fresh = StubConnection([StubResponse(spark_body('AAPL', 3.0))])
+        client = self.client(fresh)
+        for connection in stale:
+            client._release(connection)
+
+        self.assertEqual(client.get_quote('AAPL').price, 3.0)
+        self.assertTrue(stale[1].closed)
+        self.assertEqual(len(stale[0].requests), 0)
+        self.assertEqual(client.connections_opened, 1)
+        # 新连接在成功后放回连接池
+        self.assertIs(client._acquire(), fresh)
+
+    def test_error_on_fresh_connection_is_raised(self):
+        broken = StubConnection([BrokenPipeError()])
+        also_broken = StubConnection([BrokenPipeError()])
+        client = self.client(broken, also_broken)
+
+        with self.assertRaises(BrokenPipeError):
+            client.get_quote('AAPL')
+        self.assertTrue(broken.closed and also_broken.closed)
+
+    def test_error_status_raises(self):
+        client = self.client(StubConnection([StubResponse(b'{}', status=503, will_close=True)]))
+        with self.assertRaises(http.client.HTTPException):
+            client.get_quote('AAPL')
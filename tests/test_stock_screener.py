@@ -0,0 +1,89 @@
+import csv
+import os
+import tempfile
+import time
+import unittest
+from datetime import date, timedelta
+
+from stock_screener import DAILY_SUFFIX, Screener, cache_path, load_bars
+
+
+def write_daily(data_dir, symbol, closes, volumes=None, lows=None):
+    """写入一份 backfill 格式的日线 CSV"""
+    path = os.path.join(data_dir, f'{symbol}{DAILY_SUFFIX}')
+    start = date(2023, 1, 2)
+    with open(path, 'w', newline='', encoding='utf-8') as file:
+        writer = csv.writer(file)
+        writer.writerow(['date', 'open', 'high', 'low', 'close', 'volume'])
+        for index, close in enumerate(closes):
+            low = lows[index] if lows else close - 1
+            volume = volumes[index] if volumes else 1000
+            writer.writerow([(start + timedelta(days=index)).isoformat(), close, close + 1, low, close, volume])
+    return path
+
+
+class ScreenerTests(unittest.TestCase):
+    def setUp(self):
+        self.temp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.temp.cleanup)
+        self.data_dir = self.temp.name
+
+    def screen(self, *criteria, **params):
+        return Screener(criteria, data_dir=self.data_dir, workers=1, params=params).run()['matches']
+
+    def test_above_ma200_ranks_by_distance_from_average(self):
+        write_daily(self.data_dir, 'UP', [10.0] * 199 + [20.0])
+        write_daily(self.data_dir, 'SLIGHT', [10.0] * 199 + [11.0])
+        write_daily(self.data_dir, 'DOWN', [10.0] * 199 + [5.0])
+        write_daily(self.data_dir, 'SHORT', [10.0] * 50 + [20.0])
+
+        matches = self.screen('above_ma200')
+
+        self.assertEqual([row['symbol'] for row in matches], ['UP', 'SLIGHT'])
+        self.assertAlmostEqual(matches[0]['above_ma200'], (20 / 10.05 - 1) * 100, places=2)
+        self.assertEqual(matches[0]['date'], (date(2023, 1, 2) + timedelta(days=199)).isoformat())
+
+    def test_volume_spike_uses_factor_parameter(self):
+        write_daily(self.data_dir, 'SPIKE', [10.0] * 21, volumes=[1000] * 20 + [3000])
+        write_daily(self.data_dir, 'FLAT', [10.0] * 21, volumes=[1000] * 21)
+
+        self.assertEqual([row['symbol'] for row in self.screen('volume_spike')], ['SPIKE'])
+        self.assertEqual(self.screen('volume_spike', volume_factor=4.0), [])
+
+    def test_new_52w_low_ranks_lowest_first_and_combines_criteria(self):
+        lows = [10.0] * 251
+        write_daily(self.data_dir, 'DEEP', [10.0] * 252, lows=lows + [8.0], volumes=[1000] * 251 + [5000])
+        write_daily(self.data_dir, 'EDGE', [10.0] * 252, lows=lows + [9.5], volumes=[1000] * 252)
+        write_daily(self.data_dir, 'ABOVE', [10.0] * 252, lows=lows + [11.0])
+
+        self.assertEqual([row['symbol'] for row in self.screen('new_52w_low')], ['DEEP', 'EDGE'])
+        self.assertEqual([row['symbol'] for row in self.screen('new_52w_low', 'volume_spike')], ['DEEP'])
+
+    def test_process_pool_matches_inline_result(self):
+        for index in range(6):
+            write_daily(self.data_dir, f'S{index}', [10.0] * 199 + [11.0 + index])
+
+        inline = Screener(['above_ma200'], data_dir=self.data_dir, workers=1).run()['matches']
+        pooled = Screener(['above_ma200'], data_dir=self.data_dir, workers=2).run()['matches']
+
+        self.assertEqual(pooled, inline)
+        self.assertEqual(inline[0]['symbol'], 'S5')
+
+    def test_cache_is_rebuilt_when_csv_is_newer(self):
+        path = write_daily(self.data_dir, 'AAPL', [10.0, 11.0])
+        self.assertEqual(list(load_bars(path)['close']), [10.0, 11.0])
+        self.assertTrue(os.path.exists(cache_path(path)))
+
+        write_daily(self.data_dir, 'AAPL', [10.0, 11.0, 12.0])
+        # 保证 CSV 的修改时间晚于缓存
+        later = time.time() + 10
+        os.utime(path, (later, later))
+
+        self.assertEqual(list(load_bars(path)['close']), [10.0, 11.0, 12.0])
+
+    def test_empty_directory_and_unknown_criteria(self):
+        report = Screener(['above_ma200'], data_dir=self.data_dir, workers=4).run()
+        self.assertEqual((report['matches'], report['symbols']), ([], 0))
+
+        with self.assertRaises(ValueError):
+            Screener(['missing'], data_dir=self.data_dir)
@@ -0,0 +1,139 @@
+import csv
+import io
+import os
+import tempfile
+import unittest
+from datetime import datetime, timedelta
+from unittest import mock
+
+import stock_ticks
+from stock_data_logger import StockDataLogger
+
+
+def make_record(moment, close, volume, change):
+    return {
+        'timestamp': moment.isoformat(),
+        'date': moment.strftime('%Y-%m-%d'),
+        'time': moment.strftime('%H:%M:%S'),
+        'open': str(round(close + 0.1, 2)),
+        'high': str(round(close + 0.25, 2)),
+        'low': str(round(close - 0.25, 2)),
+        'close': str(close),
+        'volume': str(volume),
+        'price_change': str(change),
+        'change_percentage': str(round(change / close * 100, 2)),
+    }
+
+
+class TickArchiveTests(unittest.TestCase):
+    def setUp(self):
+        temp = tempfile.TemporaryDirectory()
+        self.addCleanup(temp.cleanup)
+        self.data_dir = temp.name
+        self.path = os.path.join(temp.name, 'AAPL_archive.ticks')
+        start = datetime(2024, 1, 2, 9, 30, 0, 123456)
+        # 价格先涨后跌、涨跌额正负交替，覆盖负差值
+        closes = [12.5, 13.75, 11.0, 10.25, 15.5, 9.99, 9.99, 20.01]
+        self.records = [
+            make_record(start + timedelta(minutes=5 * index), close, 1000 * (8 - index), (-1) ** index * 0.35)
+            for index, close in enumerate(closes)
+        ]
+
+    def test_record_round_trip_matches_csv_text(self):
+        for record in self.records:
+            self.assertEqual(stock_ticks.tick_to_record(stock_ticks.record_to_tick(record)), record)
+
+    def test_varint_zigzag_round_trip_for_negative_and_large_deltas(self):
+        # 时间戳、收盘价和成交量写入块摘要，须为非负数；差值可正可负
+        ticks = [
+            (0, 0, 0, 0, 0, 0, 0, 0),
+            (2 ** 40, 5, -5, 2 ** 31, 2 ** 31, 2 ** 62, -1, 1),
+            (1, -(2 ** 40), 127, 128, 64, 0, 2 ** 14, -(2 ** 14)),
+        ]
+        data = stock_ticks.MAGIC + stock_ticks.encode_block(ticks)
+        [(summary, start, end)] = list(stock_ticks._iter_blocks(io.BytesIO(data)))
+
+        self.assertEqual(stock_ticks.decode_block(data, start, end), ticks)
+        self.assertEqual(end, len(data))
+
+    def test_blocks_round_trip_with_summaries(self):
+        ticks = [stock_ticks.record_to_tick(record) for record in self.records]
+
+        self.assertEqual(stock_ticks.append_ticks(self.path, iter(ticks[:5]), block_rows=3), 5)
+        self.assertEqual(stock_ticks.append_ticks(self.path, ticks[5:], block_rows=3), 3)
+
+        self.assertEqual(list(stock_ticks.iter_ticks(self.path)), ticks)
+        summaries = stock_ticks.read_summaries(self.path)
+        self.assertEqual([summary['count'] for summary in summaries], [3, 2, 3])
+        self.assertEqual(summaries[1], {
+            'count': 2, 'first_ts': ticks[3][0], 'last_ts': ticks[4][0],
+            'min_close': 1025, 'max_close': 1550, 'min_volume': 4000, 'max_volume': 5000,
+            'close_sum': 1025 + 1550, 'volume_sum': 9000, 'last_close': 1550,
+        })
+
+        total = stock_ticks.summarize(summaries)
+        closes = [tick[stock_ticks.CLOSE] for tick in ticks]
+        self.assertEqual(total['count'], len(ticks))
+        self.assertEqual((total['min_close'], total['max_close']), (min(closes), max(closes)))
+        self.assertEqual(total['close_sum'], sum(closes))
+        self.assertEqual(total['last_close'], 2001)
+        self.assertEqual(stock_ticks.timestamp_date(total['first_ts']), '2024-01-02')
+
+    def test_read_summaries_skips_payloads(self):
+        ticks = [stock_ticks.record_to_tick(record) for record in self.records] * 500
+        stock_ticks.append_ticks(self.path, ticks, block_rows=1000)
+        size = os.path.getsize(self.path)
+        read_sizes = []
+        real_open = open
+
+        def tracking_open(*args, **kwargs):
+            file = real_open(*args, **kwargs)
+            real_read = file.read
+            file.read = lambda n=-1: read_sizes.append(n) or real_read(n)
+            return file
+
+        with mock.patch('builtins.open', tracking_open):
+            summaries = stock_ticks.read_summaries(self.path)
+
+        self.assertEqual(sum(summary['count'] for summary in summaries), len(ticks))
+        # 只读入魔数和块头，未读入负载
+        self.assertNotIn(-1, read_sizes)
+        self.assertLess(sum(read_sizes), size // 100)
+
+    def test_truncated_archive_is_rejected(self):
+        ticks = [stock_ticks.record_to_tick(record) for record in self.records]
+        stock_ticks.append_ticks(self.path, ticks)
+        with open(self.path, 'r+b') as file:
+            file.truncate(os.path.getsize(self.path) - 1)
+
+        with self.assertRaises(ValueError):
+            stock_ticks.read_summaries(self.path)
+
+    def test_invalid_and_missing_archives(self):
+        with open(self.path, 'wb') as file:
+            file.write(b'NOPE')
+        with self.assertRaises(ValueError):
+            stock_ticks.read_summaries(self.path)
+
+        missing = os.path.join(self.data_dir, 'missing.ticks')
+        self.assertEqual(stock_ticks.read_summaries(missing), [])
+        self.assertEqual(list(stock_ticks.iter_ticks(missing)), [])
+        self.assertIsNone(stock_ticks.summarize([]))
+
+    def test_compact_archives_old_rows_and_keeps_statistics(self):
+        logger = StockDataLogger('AAPL', data_dir=self.data_dir)
+        with open(logger.csv_file, 'a', newline='', encoding='utf-8') as file:
+            writer = csv.DictWriter(file, fieldnames=list(self.records[0]))
+            writer.writerows(self.records)
+            # 休市期间重复的行情会被去除
+            writer.writerow({**self.records[-1], 'timestamp': '2024-01-03T09:30:00', 'date': '2024-01-03'})
+        before = logger.get_statistics()
+
+        result = logger.compact(archive_before='2024-01-03')
+
+        self.assertEqual((result['archived'], result['dropped']), (len(self.records), 1))
+        archived = [stock_ticks.tick_to_record(tick) for tick in stock_ticks.iter_ticks(logger.archive_file)]
+        self.assertEqual(archived, self.records)
+        after = logger.get_statistics()
+        self.assertEqual(after['total_records'], before['total_records'] - 1)
+        self.assertEqual((after['lowest_price'], after['highest_price']), (9.99, 20.01))
@@ -0,0 +1,107 @@
+import random
+import unittest
+
+from stock_window import TickWindow, TickWindows
+
+
+class BruteForceWindow:
+    """逐条保存记录、每次重新计算统计的参照实现"""
+
+    def __init__(self, window_seconds, capacity):
+        self.window_seconds = window_seconds
+        self.capacity = capacity
+        self.ticks = []
+
+    def append(self, timestamp, price, volume):
+        self.ticks.append((timestamp, price, volume))
+        self.ticks = self.ticks[-self.capacity:]
+        self.expire(timestamp)
+
+    def expire(self, now):
+        self.ticks = [tick for tick in self.ticks if tick[0] >= now - self.window_seconds]
+
+
+class TickWindowTests(unittest.TestCase):
+    def assertMatches(self, window, expected):
+        prices = [price for _, price, _ in expected.ticks]
+        self.assertEqual(len(window), len(prices))
+        self.assertEqual([(tick.timestamp, tick.price, tick.volume) for tick in window], expected.ticks)
+        if not prices:
+            self.assertIsNone(window.min())
+            self.assertIsNone(window.max())
+            self.assertEqual((window.sum(), window.volume_sum()), (0.0, 0))
+            return
+        self.assertEqual(window.min(), min(prices))
+        self.assertEqual(window.max(), max(prices))
+        self.assertAlmostEqual(window.sum(), sum(prices), places=6)
+        self.assertEqual(window.volume_sum(), sum(volume for _, _, volume in expected.ticks))
+
+    def run_random(self, seed, window_seconds, capacity, steps, max_gap):
+        rng = random.Random(seed)
+        window = TickWindow(window_seconds, capacity)
+        expected = BruteForceWindow(window_seconds, capacity)
+        timestamp = 1_700_000_000.0
+        for _ in range(steps):
+            timestamp += rng.choice((0, 0.5, 1, 2, max_gap))
+            # 价格取值较少，覆盖相等价格在单调队列中的处理
+            price = rng.choice((9.5, 10.0, 10.25, 11.0, 12.75, 8.0))
+            volume = rng.randrange(0, 1000)
+            window.append(timestamp, price, volume)
+            expected.append(timestamp, price, volume)
+            self.assertMatches(window, expected)
+        return window
+
+    def test_capacity_eviction_matches_brute_force(self):
+        # 时间窗口足够长，只有容量会移出记录
+        window = self.run_random(seed=1, window_seconds=10 ** 9, capacity=7, steps=500, max_gap=3)
+        self.assertEqual(len(window), 7)
+
+    def test_time_eviction_matches_brute_force(self):
+        # 容量足够大，只有时间会移出记录；偶尔的长间隔会清空整个窗口
+        self.run_random(seed=2, window_seconds=10, capacity=1000, steps=500, max_gap=30)
+
+    def test_mixed_eviction_and_ring_wrap_around(self):
+        # 追加数远大于容量，记录序号与单调队列下标多次绕回
+        window = self.run_random(seed=3, window_seconds=6, capacity=5, steps=2000, max_gap=8)
+        self.assertGreater(window._next_seq, window.capacity * 100)
+
+    def test_monotonic_prices_keep_queues_full_across_wrap(self):
+        # 价格单调递增时最小值队列保留全部记录，单调递减时最大值队列保留全部记录
+        for prices in (range(1, 40), range(40, 1, -1)):
+            window = TickWindow(window_seconds=10 ** 9, capacity=4)
+            expected = BruteForceWindow(10 ** 9, 4)
+            for timestamp, price in enumerate(prices):
+                window.append(timestamp, float(price), 1)
+                expected.append(timestamp, float(price), 1)
+                self.assertMatches(window, expected)
+
+    def test_expire_without_append(self):
+        window = TickWindow(window_seconds=10, capacity=8)
+        expected = BruteForceWindow(10, 8)
+        for timestamp, price in ((0, 5.0), (4, 3.0), (8, 7.0), (12, 4.0)):
+            window.append(timestamp, price, 1)
+            expected.append(timestamp, price, 1)
+
+        for now in (15, 19, 23, 100):
+            window.expire(now)
+            expected.expire(now)
+            self.assertMatches(window, expected)
+        self.assertEqual(window.summary(), {'count': 0})
+
+    def test_out_of_order_and_invalid_capacity(self):
+        window = TickWindow(capacity=2)
+        window.append(10, 1.0)
+        with self.assertRaises(ValueError):
+            window.append(9, 1.0)
+        with self.assertRaises(ValueError):
+            TickWindow(capacity=0)
+
+    def test_derived_statistics(self):
+        windows = TickWindows(['AAPL'], window_seconds=3600, capacity=16)
+        for timestamp, price in ((0, 100.0), (60, 110.0), (120, 99.0)):
+            window = windows.append('AAPL', timestamp, price)
+
+        self.assertAlmostEqual(window.change_percent(), -1.0)
+        self.assertAlmostEqual(window.drawdown_percent(), -10.0)
+        self.assertAlmostEqual(window.mean(), 103.0)
+        self.assertEqual(window.memory_bytes(), windows.memory_bytes())